@@ -20,6 +20,8 @@ from ui.pages import dashboard, lesson_viewer, diagnostic, profile
 from utils.database import Database
 from utils.auth_manager import AuthManager
 from utils.file_session_manager import FileSessionManager
+from utils.maintenance import start_maintenance
+from utils.session_store import get_session_store
 from models.user import UserProfile
 
 # Show debug info if enabled
@@ -102,7 +104,7 @@ def sync_url_to_session_state():
     if "lesson_id" in params and params.get("page") == "lesson":
         lesson_id = params["lesson_id"]
         if st.session_state.get("db"):
-            lesson = st.session_state.db.get_lesson(lesson_id)
+            lesson = st.session_state.db.get_lesson_header(lesson_id)
             if lesson:
                 st.session_state.current_lesson = lesson
                 st.session_state.current_page = "lesson"
@@ -172,6 +174,15 @@ def initialize_session_state():
         if config.debug:
             debug_print("Database connection initialized")
 
+        # Expired sessions, ANALYZE, checkpoints and VACUUM run on a
+        # background thread, once per server process
+        if config.maintenance_enabled:
+            start_maintenance(
+                st.session_state.db.db_path,
+                config.maintenance_intervals,
+                config.maintenance_budgets,
+            )
+
     # Initialize auth manager
     if "auth_manager" not in st.session_state:
         st.session_state.auth_manager = AuthManager(st.session_state.db)
@@ -180,13 +191,15 @@ def initialize_session_state():
 
     # Initialize file-based session manager (persists across refreshes)
     if "session_manager" not in st.session_state:
-        st.session_state.session_manager = FileSessionManager(st.session_state.db)
+        store = get_session_store(
+            st.session_state.db,
+            config.session_store_backend,
+            config.session_store_path,
+        )
+        st.session_state.session_manager = FileSessionManager(st.session_state.db, store)
         if config.debug:
             debug_print("File session manager initialized")
 
-    # Cleanup expired sessions periodically
-    st.session_state.auth_manager.cleanup_expired_sessions()
-
     # Check for valid session in this browser tab
     if "current_user" not in st.session_state or st.session_state.current_user is None:
         session_token = st.session_state.session_manager.get_current_session()
@@ -366,15 +379,14 @@ def render_sidebar():
             st.markdown("### 🔐 Login")
 
             # Get last username for quick login button
-            cursor = st.session_state.db.conn.cursor()
-            cursor.execute("""
-                SELECT username
-                FROM users
-                WHERE last_username IS NOT NULL AND last_username != ''
-                ORDER BY last_login DESC
-                LIMIT 1
-            """)
-            row = cursor.fetchone()
+            with st.session_state.db.reader() as conn:
+                row = conn.execute("""
+                    SELECT username
+                    FROM users
+                    WHERE last_username IS NOT NULL AND last_username != ''
+                    ORDER BY last_login DESC
+                    LIMIT 1
+                """).fetchone()
             default_username = row[0] if row else ''
 
             # Quick login button for last user
@@ -24,6 +24,27 @@ class Config:
         # Database settings
         self.db_echo = self.debug  # SQLAlchemy echo mode
 
+        # Browser session store (utils/session_store.py): "sqlite" (default,
+        # shared by all server processes), "memory" (one process only, lost
+        # on restart) or "file" (append-only log at session_store_path).
+        # scripts/benchmark_session_stores.py compares them.
+        self.session_store_backend = "sqlite"
+        self.session_store_path = self.base_dir / 'data' / 'browser_sessions.log'
+
+        # Background maintenance (utils/maintenance.py), started once per
+        # server process. Intervals/budgets in seconds by job name; an
+        # interval of 0 disables a job. Unlisted jobs keep their defaults.
+        self.maintenance_enabled = True
+        self.maintenance_intervals = {
+            "sessions": 3600,
+            "optimize": 6 * 3600,
+            "checkpoint": 15 * 60,
+            "vacuum": 24 * 3600,
+            "content": 15 * 60,
+            "leaderboards": 5 * 60,
+        }
+        self.maintenance_budgets = {}
+
         # Streamlit settings
         self.page_title = "CyberLearn - Adaptive Cyber Training"
         self.page_icon = "🛡️"
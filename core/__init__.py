@@ -4,5 +4,13 @@ Core logic modules for CyberLearn adaptive learning system.
 
 from .adaptive_engine import AdaptiveEngine
 from .gamification import GamificationEngine, Badge
+from .recommendation_index import RecommendationIndex, get_recommendation_index, get_next_lessons
 
-__all__ = ["AdaptiveEngine", "GamificationEngine", "Badge"]
+__all__ = [
+    "AdaptiveEngine",
+    "GamificationEngine",
+    "Badge",
+    "RecommendationIndex",
+    "get_recommendation_index",
+    "get_next_lessons",
+]
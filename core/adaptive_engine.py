@@ -3,7 +3,7 @@ Adaptive Learning Engine for CyberLearn.
 Implements intelligent lesson recommendation and difficulty adaptation.
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from uuid import UUID
 import random
 from datetime import datetime
@@ -11,6 +11,7 @@ from datetime import datetime
 from models.user import UserProfile, SkillLevels
 from models.lesson import Lesson, LessonMetadata
 from models.progress import LessonProgress, LessonStatus
+from core.recommendation_index import RecommendationIndex
 
 
 class AdaptiveEngine:
@@ -63,9 +64,10 @@ class AdaptiveEngine:
         domain: str,
         difficulties: List[int],
         user_progress: List[LessonProgress],
+        open_lessons: Optional[Set[UUID]] = None,
     ) -> List[LessonMetadata]:
         """Return candidate lessons for a domain with graceful difficulty fallback"""
-        candidates = self._filter_lessons(lessons, domain, difficulties, user_progress)
+        candidates = self._filter_lessons(lessons, domain, difficulties, user_progress, open_lessons)
         if candidates:
             return candidates
 
@@ -76,7 +78,7 @@ class AdaptiveEngine:
         if not domain_difficulties or set(domain_difficulties) == set(difficulties):
             return []
 
-        return self._filter_lessons(lessons, domain, domain_difficulties, user_progress)
+        return self._filter_lessons(lessons, domain, domain_difficulties, user_progress, open_lessons)
 
     def get_recommended_lesson(
         self,
@@ -84,6 +86,9 @@ class AdaptiveEngine:
         available_lessons: List[LessonMetadata],
         user_progress: List[LessonProgress],
         domain: Optional[str] = None,
+        due_reviews: Optional[List[LessonProgress]] = None,
+        index: Optional[RecommendationIndex] = None,
+        open_lessons: Optional[Set[UUID]] = None,
     ) -> Optional[UUID]:
         """
         Recommend next lesson based on adaptive algorithm.
@@ -94,10 +99,25 @@ class AdaptiveEngine:
         3. Spaced repetition needs
         4. Learning preferences
         5. Minimum effective dose (core concepts first)
+
+        due_reviews is Database.get_due_reviews(user_id), most overdue first;
+        without it user_progress is scanned for due reviews.
+
+        index is a RecommendationIndex over available_lessons; with it each
+        domain is a few bucket lookups instead of a scan of every lesson.
+
+        open_lessons is Database.get_open_lesson_ids(user_id): the lessons
+        the user has unlocked and not completed, kept current by the
+        prerequisite graph's unlock triggers. With it candidates are looked
+        up in that set instead of re-checking every lesson's prerequisites
+        against user_progress.
         """
 
         # Check for lessons needing review (spaced repetition)
-        review_lesson = self._check_review_needed(user_progress)
+        if due_reviews is not None:
+            review_lesson = due_reviews[0].lesson_id if due_reviews else None
+        else:
+            review_lesson = self._check_review_needed(user_progress)
         if review_lesson:
             return review_lesson
 
@@ -108,6 +128,13 @@ class AdaptiveEngine:
         ordered_domains = self._ordered_domains()
         search_domains = [domain] + [d for d in ordered_domains if d != domain]
 
+        completed, open_mask = 0, None
+        if index is not None:
+            if open_lessons is not None:
+                open_mask = index.lesson_mask(open_lessons)
+            else:
+                completed = index.completed_mask(user_progress)
+
         candidates: List[LessonMetadata] = []
         for candidate_domain in search_domains:
             if not self._prerequisites_met(candidate_domain, user):
@@ -116,11 +143,18 @@ class AdaptiveEngine:
             skill_level = getattr(user.skill_levels, candidate_domain, 0)
             target_difficulties = self._get_target_difficulties(skill_level)
 
+            if index is not None:
+                selected = index.select(candidate_domain, target_difficulties, completed, open_mask)
+                if selected:
+                    return selected.lesson_id
+                continue
+
             candidates = self._get_candidates_for_domain(
                 available_lessons,
                 candidate_domain,
                 target_difficulties,
                 user_progress,
+                open_lessons,
             )
 
             if candidates:
@@ -139,6 +173,38 @@ class AdaptiveEngine:
 
         return selected.lesson_id if selected else None
 
+    def get_next_lessons_by_domain(
+        self,
+        user: UserProfile,
+        index: RecommendationIndex,
+        user_progress: List[LessonProgress],
+        domains: Optional[List[str]] = None,
+        open_lessons: Optional[Set[UUID]] = None,
+    ) -> Dict[str, Optional[LessonMetadata]]:
+        """
+        Next lesson in every domain (or the given ones), in one pass over
+        user_progress.
+
+        Per domain this is the lesson get_recommended_lesson() picks there:
+        difficulty matched to the domain skill, core concepts first, then
+        curriculum order. Domain skill prerequisites and due reviews are
+        left out, so every domain tab gets its own answer. None means the
+        domain has nothing left to take. open_lessons is as for
+        get_recommended_lesson().
+        """
+        completed, open_mask = 0, None
+        if open_lessons is not None:
+            open_mask = index.lesson_mask(open_lessons)
+        else:
+            completed = index.completed_mask(user_progress)
+        next_lessons = {}
+        for domain in domains if domains is not None else index.domains:
+            skill_level = getattr(user.skill_levels, domain, 0)
+            next_lessons[domain] = index.select(
+                domain, self._get_target_difficulties(skill_level), completed, open_mask
+            )
+        return next_lessons
+
     def _check_review_needed(
         self, user_progress: List[LessonProgress]
     ) -> Optional[UUID]:
@@ -194,9 +260,19 @@ class AdaptiveEngine:
         domain: str,
         difficulties: List[int],
         user_progress: List[LessonProgress],
+        open_lessons: Optional[Set[UUID]] = None,
     ) -> List[LessonMetadata]:
         """Filter lessons by domain, difficulty, and prerequisites"""
 
+        if open_lessons is not None:
+            # Unlocked and not completed, straight from user_unlocked_lessons
+            return [
+                lesson for lesson in lessons
+                if lesson.domain == domain
+                and lesson.difficulty in difficulties
+                and lesson.lesson_id in open_lessons
+            ]
+
         completed_ids = {p.lesson_id for p in user_progress if p.status in [
             LessonStatus.COMPLETED, LessonStatus.MASTERED
         ]}
@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 from uuid import UUID
 
 from models.user import UserProfile
-from models.progress import LessonProgress, LessonStatus
+from models.progress import LessonProgress
 
 
 class Badge:
@@ -215,10 +215,16 @@ class GamificationEngine:
         user: UserProfile,
         user_progress: List[LessonProgress],
         recent_lesson: Optional[LessonProgress] = None,
+        *,
+        domain_stats: Dict[str, Dict],
     ) -> List[Badge]:
         """
         Check for newly earned badges.
 
+        domain_stats is Database.get_lesson_stats_by_domain(user_id), read
+        after the progress write; a domain is complete when every lesson
+        the learner can see in it is completed.
+
         Returns list of badges earned (not already owned).
         """
 
@@ -245,17 +251,16 @@ class GamificationEngine:
         ]
 
         for domain in domains:
-            domain_progress = [p for p in user_progress if self._get_lesson_domain(p) == domain]
-            completed = [
-                p for p in domain_progress
-                if p.status in [LessonStatus.COMPLETED, LessonStatus.MASTERED]
-            ]
-            mastered = [p for p in domain_progress if p.status == LessonStatus.MASTERED]
-
-            # Domain completion badge (assuming we know total lessons per domain)
-            # This would need actual lesson count from database in real implementation
+            stats = domain_stats.get(domain)
+
+            # Domain completion badge: every visible lesson in the domain completed
             badge_id = f"{domain}_complete"
-            if len(completed) >= 10 and badge_id not in user.badges:  # Placeholder threshold
+            if (
+                stats
+                and stats["visible"] > 0
+                and stats["completed"] >= stats["visible"]
+                and badge_id not in user.badges
+            ):
                 newly_earned.append(self.badges[badge_id])
 
             # Domain mastery badge
@@ -285,19 +290,22 @@ class GamificationEngine:
 
         return newly_earned
 
-    def _get_lesson_domain(self, progress: LessonProgress) -> str:
-        """Helper to get domain from lesson (would query lesson in real implementation)"""
-        # Placeholder - would actually look up lesson metadata
-        return "fundamentals"
-
     def get_user_rank(self, user_xp: int, all_users_xp: List[int]) -> Dict:
-        """Calculate user's rank among all users"""
+        """
+        Calculate user's rank among the given XP values.
+
+        For the site-wide leaderboard use Database.get_leaderboard_rank(),
+        which ranks in SQL without loading every user.
+        """
 
         if not all_users_xp:
             return {"rank": 1, "total_users": 1, "percentile": 100}
 
-        all_users_xp.sort(reverse=True)
-        rank = all_users_xp.index(user_xp) + 1 if user_xp in all_users_xp else len(all_users_xp)
+        # Ties share the best rank; one pass instead of sort + list.index
+        if user_xp in all_users_xp:
+            rank = 1 + sum(1 for xp in all_users_xp if xp > user_xp)
+        else:
+            rank = len(all_users_xp)
 
         percentile = ((len(all_users_xp) - rank + 1) / len(all_users_xp)) * 100
 
@@ -399,31 +407,28 @@ class GamificationEngine:
     def get_leaderboard_position(
         self, user_id: UUID, all_users: List[UserProfile]
     ) -> Dict:
-        """Get user's position on various leaderboards"""
+        """
+        Get user's position on various leaderboards among the given users.
 
-        # Sort by XP
-        xp_sorted = sorted(all_users, key=lambda u: u.total_xp, reverse=True)
-        xp_rank = next(
-            (i + 1 for i, u in enumerate(xp_sorted) if u.user_id == user_id), None
-        )
+        For the site-wide leaderboards use Database.get_leaderboard_rank() /
+        get_leaderboard_around(), which rank in SQL.
+        """
 
-        # Sort by streak
-        streak_sorted = sorted(all_users, key=lambda u: u.streak_days, reverse=True)
-        streak_rank = next(
-            (i + 1 for i, u in enumerate(streak_sorted) if u.user_id == user_id), None
-        )
+        index = next((i for i, u in enumerate(all_users) if u.user_id == user_id), None)
 
-        # Sort by lessons completed
-        lessons_sorted = sorted(
-            all_users, key=lambda u: u.total_lessons_completed, reverse=True
-        )
-        lessons_rank = next(
-            (i + 1 for i, u in enumerate(lessons_sorted) if u.user_id == user_id), None
-        )
+        def position(key) -> Optional[int]:
+            # 1-based index in a stable descending sort, without sorting:
+            # earlier users rank ahead on ties, later ones only if higher
+            if index is None:
+                return None
+            value = key(all_users[index])
+            ahead = sum(1 for u in all_users[:index] if key(u) >= value)
+            ahead += sum(1 for u in all_users[index + 1:] if key(u) > value)
+            return ahead + 1
 
         return {
-            "xp_rank": xp_rank,
-            "streak_rank": streak_rank,
-            "lessons_rank": lessons_rank,
+            "xp_rank": position(lambda u: u.total_xp),
+            "streak_rank": position(lambda u: u.streak_days),
+            "lessons_rank": position(lambda u: u.total_lessons_completed),
             "total_users": len(all_users),
         }
@@ -0,0 +1,212 @@
+"""
+Precomputed lesson lookup for AdaptiveEngine recommendations.
+
+get_recommended_lesson() used to walk the domains and, for each, scan the
+whole lesson list, rebuild the completed set and re-check every lesson's
+prerequisites (twice when the difficulty range had to be widened).
+
+RecommendationIndex is built once per lesson catalog version. It buckets
+lessons by (domain, difficulty, core concept) in the order the engine picks
+them (order_index, then list position) and gives every lesson a bit
+position, so a learner's completed lessons are one int bitset and a
+lesson's prerequisites are one mask test. A recommendation is then a few
+bucket lookups.
+
+Given the learner's open lessons (unlocked and not completed, from
+Database.get_open_lesson_ids()), select() tests one bit of that set
+instead of the completed and prerequisite masks.
+
+select() returns exactly what AdaptiveEngine._get_candidates_for_domain()
+followed by the core-concept filter and _score_and_select_lesson() return;
+scripts/check_recommendation_index.py checks that over synthetic users.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from models.lesson import LessonMetadata
+from models.progress import LessonProgress, LessonStatus
+
+
+_COMPLETED_STATUSES = (LessonStatus.COMPLETED, LessonStatus.MASTERED)
+
+# (order_index, list position, lesson bit, prerequisite mask, lesson)
+_Entry = Tuple[int, int, int, int, LessonMetadata]
+
+
+class RecommendationIndex:
+    """Lessons bucketed for recommendation, with bitset completion checks"""
+
+    def __init__(self, lessons: Sequence[LessonMetadata], version: int = 0):
+        self.version = version
+        self.lessons = lessons
+        self._bits: Dict[UUID, int] = {}
+
+        # Prerequisites may name lessons outside the list (completed lessons
+        # that were since removed still count), so they get bits too
+        for lesson in lessons:
+            self._bit(lesson.lesson_id)
+
+        buckets: Dict[Tuple[str, int, bool], List[_Entry]] = {}
+        self.domain_difficulties: Dict[str, Tuple[int, ...]] = {}
+        for position, lesson in enumerate(lessons):
+            prereq_mask = 0
+            for prereq in lesson.prerequisites:
+                prereq_mask |= 1 << self._bit(prereq)
+            buckets.setdefault(
+                (lesson.domain, lesson.difficulty, lesson.is_core_concept), []
+            ).append((lesson.order_index, position, self._bits[lesson.lesson_id], prereq_mask, lesson))
+
+        difficulties: Dict[str, set] = {}
+        for domain, difficulty, _ in buckets:
+            difficulties.setdefault(domain, set()).add(difficulty)
+        for domain, values in difficulties.items():
+            self.domain_difficulties[domain] = tuple(sorted(values))
+
+        for entries in buckets.values():
+            entries.sort(key=lambda entry: entry[:2])
+        self._buckets = buckets
+
+    @property
+    def domains(self) -> List[str]:
+        """Domains with at least one lesson, sorted"""
+        return sorted(self.domain_difficulties)
+
+    def _bit(self, lesson_id: UUID) -> int:
+        bit = self._bits.get(lesson_id)
+        if bit is None:
+            bit = self._bits[lesson_id] = len(self._bits)
+        return bit
+
+    def completed_mask(self, user_progress: Iterable[LessonProgress]) -> int:
+        """Bitset of the completed (or mastered) lessons in user_progress"""
+        mask = 0
+        bits = self._bits
+        for progress in user_progress:
+            if progress.status in _COMPLETED_STATUSES:
+                bit = bits.get(progress.lesson_id)
+                if bit is not None:
+                    mask |= 1 << bit
+        return mask
+
+    def lesson_mask(self, lesson_ids: Set[UUID]) -> int:
+        """Bitset of the given lessons (ids outside the index are ignored)"""
+        mask = 0
+        bits = self._bits
+        for lesson_id in lesson_ids:
+            bit = bits.get(lesson_id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def _first_open(
+        self, domain: str, difficulties: Iterable[int], core: bool, completed: int, open_mask: Optional[int]
+    ) -> Optional[_Entry]:
+        """Earliest not-completed, unlocked lesson across the buckets"""
+        best = None
+        for difficulty in difficulties:
+            for entry in self._buckets.get((domain, difficulty, core), ()):
+                if best is not None and entry[:2] >= best[:2]:
+                    break
+                if open_mask is not None:
+                    is_open = (open_mask >> entry[2]) & 1
+                else:
+                    is_open = not (completed >> entry[2]) & 1 and completed & entry[3] == entry[3]
+                if is_open:
+                    best = entry
+                    break
+        return best
+
+    def _select(
+        self, domain: str, difficulties: Iterable[int], completed: int, open_mask: Optional[int]
+    ) -> Optional[LessonMetadata]:
+        # Core concepts first (Minimum Effective Dose), else any candidate
+        best = self._first_open(domain, difficulties, True, completed, open_mask)
+        if best is None:
+            best = self._first_open(domain, difficulties, False, completed, open_mask)
+        return best[4] if best else None
+
+    def select(
+        self, domain: str, difficulties: List[int], completed: int = 0, open_mask: Optional[int] = None
+    ) -> Optional[LessonMetadata]:
+        """
+        Lesson the engine recommends in a domain for the target difficulties.
+
+        completed is completed_mask(); open_mask, when given, is
+        lesson_mask() of the learner's open lessons and replaces it.
+        Like the engine, widens to every difficulty the domain has when the
+        target range has no candidates.
+        """
+        selected = self._select(domain, difficulties, completed, open_mask)
+        if selected is not None:
+            return selected
+
+        domain_difficulties = self.domain_difficulties.get(domain, ())
+        if not domain_difficulties or set(domain_difficulties) == set(difficulties):
+            return None
+        return self._select(domain, domain_difficulties, completed, open_mask)
+
+
+_index_lock = threading.Lock()
+_indexes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_recommendation_index(catalog) -> RecommendationIndex:
+    """Shared index for a LessonCatalog (built once per catalog version)"""
+    index = _indexes.get(catalog)
+    if index is None:
+        with _index_lock:
+            index = _indexes.get(catalog)
+            if index is None:
+                index = _indexes[catalog] = RecommendationIndex(catalog.lessons, catalog.version)
+    return index
+
+
+# Per (database, user): (stamp, next lesson per domain)
+NEXT_LESSON_CACHE_SIZE = 1024
+_next_lessons_lock = threading.Lock()
+_next_lessons: "OrderedDict[Tuple[str, str], Tuple[tuple, Dict[str, Optional[LessonMetadata]]]]" = OrderedDict()
+
+
+def get_next_lessons(db, user, engine=None) -> Dict[str, Optional[LessonMetadata]]:
+    """
+    Next lesson in every domain for a user (AdaptiveEngine.get_next_lessons_by_domain),
+    cached until the user's progress, skill levels or the lesson catalog change.
+
+    db is a utils.database.Database. A cache hit costs no progress query;
+    a miss reads the user's open lessons rather than their progress.
+    """
+    catalog = db.get_lesson_catalog()
+    key = (db.db_path, str(user.user_id))
+    stamp = (
+        catalog.version,
+        db.get_progress_version(user.user_id),
+        tuple(user.skill_levels.model_dump().values()),
+    )
+
+    with _next_lessons_lock:
+        cached = _next_lessons.get(key)
+        if cached is not None and cached[0] == stamp:
+            _next_lessons.move_to_end(key)
+            return dict(cached[1])
+
+    if engine is None:
+        # Imported here: adaptive_engine imports this module
+        from core.adaptive_engine import AdaptiveEngine
+        engine = AdaptiveEngine()
+    next_lessons = engine.get_next_lessons_by_domain(
+        user,
+        get_recommendation_index(catalog),
+        [],
+        open_lessons=db.get_open_lesson_ids(user.user_id),
+    )
+
+    with _next_lessons_lock:
+        _next_lessons[key] = (stamp, next_lessons)
+        _next_lessons.move_to_end(key)
+        while len(_next_lessons) > NEXT_LESSON_CACHE_SIZE:
+            _next_lessons.popitem(last=False)
+    return dict(next_lessons)
@@ -0,0 +1,17 @@
+"""
+Database schema migrations for CyberLearn.
+
+Database() applies pending migrations automatically on open; see
+migrations/steps.py for the list of steps.
+"""
+
+from .runner import Migration, run_migrations, get_applied_versions, get_pending_migrations
+from .steps import MIGRATIONS
+
+__all__ = [
+    "Migration",
+    "MIGRATIONS",
+    "run_migrations",
+    "get_applied_versions",
+    "get_pending_migrations",
+]
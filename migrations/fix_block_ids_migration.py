@@ -9,23 +9,16 @@ import sqlite3
 import json
 import uuid
 import sys
+from datetime import datetime
 from pathlib import Path
 
-def fix_block_ids():
-    """Fix invalid block IDs in the database."""
+def fix_block_ids_in_connection(conn: sqlite3.Connection, verbose: bool = False):
+    """
+    Fix invalid block IDs using an open connection (does not commit).
 
-    # Try to find the database
-    db_path = Path('cyberlearn.db')
-    if not db_path.exists():
-        db_path = Path('/opt/cyberlearn/cyberlearn.db')
-    if not db_path.exists():
-        print("ERROR: Could not find cyberlearn.db")
-        sys.exit(1)
-
-    print(f"Using database: {db_path}")
-
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
+    Also used by the versioned migration runner (migrations/steps.py).
+    Returns (lessons fixed, blocks fixed).
+    """
     cursor = conn.cursor()
 
     # Find lessons with invalid block IDs
@@ -34,16 +27,12 @@ def fix_block_ids():
     fixed_count = 0
     total_blocks_fixed = 0
 
-    for row in cursor.fetchall():
-        lesson_id = row['lesson_id']
-        title = row['title']
-        domain = row['domain']
-        content_blocks_json = row['content_blocks']
-
+    for lesson_id, title, domain, content_blocks_json in cursor.fetchall():
         try:
             content_blocks = json.loads(content_blocks_json)
         except:
-            print(f"[ERROR] Could not parse JSON for lesson: {title}")
+            if verbose:
+                print(f"[ERROR] Could not parse JSON for lesson: {title}")
             continue
 
         changed = False
@@ -57,23 +46,42 @@ def fix_block_ids():
                     uuid.UUID(block_id)
                 except (ValueError, AttributeError):
                     # Invalid UUID, generate a new one
-                    old_id = block_id
-                    new_id = str(uuid.uuid4())
-                    block['block_id'] = new_id
+                    block['block_id'] = str(uuid.uuid4())
                     changed = True
                     blocks_fixed += 1
 
         if changed:
             # Update the database
             new_json = json.dumps(content_blocks, ensure_ascii=False)
+            # Bump updated_at: the app re-splits and re-indexes lessons whose
+            # updated_at differs from lesson_blocks / the search index
             cursor.execute(
-                "UPDATE lessons SET content_blocks = ? WHERE lesson_id = ?",
-                (new_json, lesson_id)
+                "UPDATE lessons SET content_blocks = ?, updated_at = ? WHERE lesson_id = ?",
+                (new_json, datetime.utcnow().isoformat(), lesson_id)
             )
             fixed_count += 1
             total_blocks_fixed += blocks_fixed
-            print(f"[FIXED] {domain} - {title} ({blocks_fixed} blocks)")
+            if verbose:
+                print(f"[FIXED] {domain} - {title} ({blocks_fixed} blocks)")
+
+    return fixed_count, total_blocks_fixed
 
+
+def fix_block_ids():
+    """Fix invalid block IDs in the database."""
+
+    # Try to find the database
+    db_path = Path('cyberlearn.db')
+    if not db_path.exists():
+        db_path = Path('/opt/cyberlearn/cyberlearn.db')
+    if not db_path.exists():
+        print("ERROR: Could not find cyberlearn.db")
+        sys.exit(1)
+
+    print(f"Using database: {db_path}")
+
+    conn = sqlite3.connect(str(db_path))
+    fixed_count, total_blocks_fixed = fix_block_ids_in_connection(conn, verbose=True)
     conn.commit()
     conn.close()
 
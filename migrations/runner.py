@@ -0,0 +1,83 @@
+"""
+Versioned schema migration runner for CyberLearn.
+
+Each migration has an integer version. Applied versions are recorded in the
+schema_version table, and all pending migrations run inside a single
+transaction when the database is opened, so a database is either fully
+migrated or left untouched.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Set
+
+
+class Migration(NamedTuple):
+    """A single schema change"""
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _ensure_version_table(conn: sqlite3.Connection):
+    """Create the schema_version bookkeeping table"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """
+    )
+
+
+def get_applied_versions(conn: sqlite3.Connection) -> Set[int]:
+    """Versions already recorded in schema_version"""
+    _ensure_version_table(conn)
+    return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+
+
+def get_pending_migrations(conn: sqlite3.Connection, migrations: List[Migration]) -> List[Migration]:
+    """Migrations not yet applied, in version order"""
+    applied = get_applied_versions(conn)
+    return sorted(
+        (m for m in migrations if m.version not in applied),
+        key=lambda m: m.version,
+    )
+
+
+def run_migrations(conn: sqlite3.Connection, migrations: List[Migration] = None) -> List[Migration]:
+    """
+    Apply all pending migrations in one transaction.
+
+    Returns the migrations that were applied (empty if already up to date).
+    Raises the original error after rolling back if any step fails.
+    """
+    if migrations is None:
+        from migrations.steps import MIGRATIONS
+        migrations = MIGRATIONS
+
+    # Start from a clean transaction state
+    conn.commit()
+    pending = get_pending_migrations(conn, migrations)
+    conn.commit()
+    if not pending:
+        return []
+
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        # Re-check under the write lock in case another process just migrated
+        pending = get_pending_migrations(conn, migrations)
+        for migration in pending:
+            migration.apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                (migration.version, migration.name, datetime.utcnow().isoformat()),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return pending
@@ -0,0 +1,183 @@
+"""
+Schema migration steps for CyberLearn.
+
+Steps must be idempotent: databases that already had the old standalone
+migration scripts run against them have no schema_version rows yet, so every
+step checks for existing columns/tables before changing anything.
+
+To add a migration, append a Migration with the next version number.
+"""
+
+import sqlite3
+from typing import List
+
+from migrations.runner import Migration
+from migrations.fix_block_ids_migration import fix_block_ids_in_connection
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Column names of a table"""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def add_user_profile_columns(conn: sqlite3.Connection):
+    """Add last_username, preferred_tag_filters and last active lesson fields"""
+    columns = _columns(conn, "users")
+    new_columns = [
+        ("last_username", "TEXT"),
+        ("preferred_tag_filters", "TEXT DEFAULT '[]'"),
+        ("last_active_lesson_id", "TEXT"),
+        ("last_active_at", "TEXT"),
+    ]
+    for name, definition in new_columns:
+        if name not in columns:
+            conn.execute(f"ALTER TABLE users ADD COLUMN {name} {definition}")
+
+
+def add_lesson_hidden_column(conn: sqlite3.Connection):
+    """Add the hidden flag to lessons"""
+    if "hidden" not in _columns(conn, "lessons"):
+        conn.execute("ALTER TABLE lessons ADD COLUMN hidden INTEGER DEFAULT 0")
+
+
+def create_user_sessions_table(conn: sqlite3.Connection):
+    """Create the cookie session table used by AuthManager"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            session_token TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            last_accessed TEXT NOT NULL,
+            user_agent TEXT,
+            ip_address TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_sessions_user_id ON user_sessions(user_id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_sessions_expires_at ON user_sessions(expires_at)"
+    )
+
+
+def fix_invalid_block_ids(conn: sqlite3.Connection):
+    """Replace non-UUID content block ids"""
+    fix_block_ids_in_connection(conn)
+
+
+def add_covering_indexes(conn: sqlite3.Connection):
+    """Indexes for the dashboard, domain lists and lesson notes lookups"""
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_progress_user_status ON progress(user_id, status)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lessons_domain_hidden_order "
+        "ON lessons(domain, hidden, order_index)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lesson_notes_user_lesson_block "
+        "ON lesson_notes(user_id, lesson_id, content_block_index)"
+    )
+    # user_sessions(session_token) is the primary key, which already has an index
+
+
+def create_content_manifest_table(conn: sqlite3.Connection):
+    """Track which content file each lesson was synced from"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS content_manifest (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            content_hash TEXT NOT NULL,
+            lesson_id TEXT,
+            synced_at TEXT NOT NULL
+        )
+    """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_content_manifest_lesson ON content_manifest(lesson_id)"
+    )
+
+
+def add_lesson_content_hash(conn: sqlite3.Connection):
+    """Add lessons.content_hash, used by Database.upsert_lessons"""
+    # Left NULL for existing rows: the hash covers the source lesson's fields,
+    # which can't be recovered from the stored row, so each lesson is
+    # rewritten once on its next upsert
+    if "content_hash" not in _columns(conn, "lessons"):
+        conn.execute("ALTER TABLE lessons ADD COLUMN content_hash TEXT")
+
+
+def create_lesson_blocks_table(conn: sqlite3.Connection):
+    """Split lesson content into per-block rows for on-demand block fetching"""
+    # Imported here: utils.database imports this package at module load
+    from utils.lesson_blocks import ensure_lesson_blocks_table, refresh_lesson_blocks
+
+    ensure_lesson_blocks_table(conn)
+    refresh_lesson_blocks(conn)
+
+
+def create_domain_stats(conn: sqlite3.Connection):
+    """Maintain per-domain lesson and progress counts with triggers"""
+    # Imported here: utils.database imports this package at module load
+    from utils.domain_stats import ensure_domain_stats, rebuild_domain_stats
+
+    ensure_domain_stats(conn)
+    rebuild_domain_stats(conn)
+
+
+def add_review_queue_index(conn: sqlite3.Connection):
+    """Index the spaced-repetition due queue (Database.get_due_reviews)"""
+    # next_review_date is an ISO string, so index order is date order; status
+    # rides along so due counts don't need the table rows
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_progress_user_review "
+        "ON progress(user_id, next_review_date, status)"
+    )
+
+
+def create_prerequisite_graph(conn: sqlite3.Connection):
+    """Store resolved lesson prerequisites and per-user unlocked lessons"""
+    # Imported here: utils.database imports this package at module load
+    from utils.prerequisite_graph import ensure_prerequisite_tables, refresh_prerequisite_graph
+
+    ensure_prerequisite_tables(conn)
+    refresh_prerequisite_graph(conn)
+
+
+def create_leaderboard_tables(conn: sqlite3.Connection):
+    """Index the leaderboard columns and add the leaderboard snapshot tables"""
+    # Imported here: utils.database imports this package at module load
+    from utils.leaderboard import ensure_leaderboard_tables
+
+    ensure_leaderboard_tables(conn)
+
+
+def create_browser_sessions_table(conn: sqlite3.Connection):
+    """Add the browser session store (replaces data/browser_sessions.json)"""
+    # Imported here: utils.database imports this package at module load
+    from utils.session_store import ensure_session_store_table
+
+    ensure_session_store_table(conn)
+
+
+MIGRATIONS = [
+    Migration(1, "add_user_profile_columns", add_user_profile_columns),
+    Migration(2, "add_lesson_hidden_column", add_lesson_hidden_column),
+    Migration(3, "create_user_sessions_table", create_user_sessions_table),
+    Migration(4, "fix_invalid_block_ids", fix_invalid_block_ids),
+    Migration(5, "add_covering_indexes", add_covering_indexes),
+    Migration(6, "create_content_manifest_table", create_content_manifest_table),
+    Migration(7, "add_lesson_content_hash", add_lesson_content_hash),
+    Migration(8, "create_lesson_blocks_table", create_lesson_blocks_table),
+    Migration(9, "create_domain_stats", create_domain_stats),
+    Migration(10, "add_review_queue_index", add_review_queue_index),
+    Migration(11, "create_prerequisite_graph", create_prerequisite_graph),
+    Migration(12, "create_leaderboard_tables", create_leaderboard_tables),
+    Migration(13, "create_browser_sessions_table", create_browser_sessions_table),
+]
@@ -6,6 +6,9 @@ from .user import UserProfile, SkillLevels, LearningPreferences
 from .lesson import (
     Lesson,
     LessonMetadata,
+    LessonSummary,
+    LessonCard,
+    LessonHeader,
     ContentBlock,
     Question,
     ContentType,
@@ -25,6 +28,9 @@ __all__ = [
     "LearningPreferences",
     "Lesson",
     "LessonMetadata",
+    "LessonSummary",
+    "LessonCard",
+    "LessonHeader",
     "ContentBlock",
     "Question",
     "ContentType",
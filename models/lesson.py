@@ -190,3 +190,70 @@ class LessonMetadata(BaseModel):
 
     class Config:
         json_encoders = {UUID: lambda v: str(v)}
+
+
+class LessonSummary(BaseModel):
+    """Fields and helpers shared by the lesson projections (LessonCard, LessonHeader)"""
+    lesson_id: UUID
+    domain: str
+    title: str
+    subtitle: Optional[str] = None
+    difficulty: int
+    estimated_time: int
+    order_index: int
+    is_core_concept: bool = False
+    base_xp_reward: int = 100
+    learning_objectives: List[str] = Field(default_factory=list)
+    tags: List[str] = Field(default_factory=list)  # Tag IDs
+
+    def get_difficulty_name(self) -> str:
+        """Human-readable difficulty"""
+        return {1: "Beginner", 2: "Intermediate", 3: "Advanced", 4: "Expert"}.get(
+            self.difficulty, "Unknown"
+        )
+
+    def get_short_id(self) -> str:
+        """Generate short lesson ID like 'dfir23' or 'malware04'"""
+        return f"{self.domain}{self.order_index:02d}"
+
+    class Config:
+        json_encoders = {UUID: lambda v: str(v)}
+
+
+class LessonCard(LessonSummary):
+    """Display projection of a lesson for list views (no content/assessment payload)"""
+
+    def get_objectives_summary(self, max_length: int = 120) -> str:
+        """First learning objective, truncated, with a count of the rest"""
+        if not self.learning_objectives:
+            return ""
+        summary = self.learning_objectives[0]
+        if len(summary) > max_length:
+            summary = summary[:max_length - 1].rstrip() + "…"
+        remaining = len(self.learning_objectives) - 1
+        if remaining > 0:
+            summary += f" (+{remaining} more)"
+        return summary
+
+
+class LessonHeader(LessonSummary):
+    """Everything about a lesson except its content blocks (fetched one at a time)"""
+    difficulty: int = Field(ge=1, le=4)
+    prerequisites: List[str] = Field(default_factory=list)
+    block_count: int = 0
+    pre_assessment: Optional[List[Question]] = None
+    post_assessment: List[Question] = Field(default_factory=list)
+    mastery_threshold: int = Field(default=80, ge=0, le=100)
+    jim_kwik_principles: List[JimKwikPrinciple] = Field(default_factory=list)
+    badge_unlock: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+    author: Optional[str] = None
+    version: str = Field(default="1.0")
+
+    class Config:
+        use_enum_values = True
+        json_encoders = {
+            datetime: lambda v: v.isoformat(),
+            UUID: lambda v: str(v)
+        }
@@ -182,6 +182,7 @@ class DomainProgress(BaseModel):
     user_id: UUID
     domain: str
     skill_level: int = Field(default=0, ge=0, le=100)
+    lessons_in_progress: int = Field(default=0)
     lessons_completed: int = Field(default=0)
     lessons_mastered: int = Field(default=0)
     total_lessons: int = Field(default=0)
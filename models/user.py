@@ -4,8 +4,8 @@ Implements learner profiles with skill tracking and preferences.
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, PrivateAttr
 from uuid import UUID, uuid4
 
 
@@ -116,6 +116,10 @@ class UserProfile(BaseModel):
     last_active_lesson_id: Optional[UUID] = None  # Last lesson viewed
     last_active_at: Optional[datetime] = None  # When user last viewed a lesson
 
+    # Column values as last read from / written to the database, so
+    # Database.update_user only writes what changed (None = unknown)
+    _stored_row: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+
     def calculate_level(self) -> int:
         """Calculate user level based on total XP"""
         if self.total_xp < 1000:
@@ -6,44 +6,30 @@ This migration adds two new fields to track the user's last active lesson:
 - last_active_at: Timestamp of when they were last viewing that lesson
 
 This enables "Continue Learning" functionality across devices.
+
+The columns are now added by the versioned migration runner (migrations/),
+which Database() runs automatically on open. This script remains as a
+convenience wrapper that applies all pending migrations.
 """
 
 import sqlite3
 from pathlib import Path
 
+from migrations import run_migrations
+
+
 def migrate_database(db_path: str = "cyberlearn.db"):
-    """Add last_active_lesson fields to users table"""
+    """Apply pending schema migrations (including last_active_lesson fields)"""
 
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Check if columns already exist
-    cursor.execute("PRAGMA table_info(users)")
-    columns = [row[1] for row in cursor.fetchall()]
-
-    if 'last_active_lesson_id' not in columns:
-        print("Adding last_active_lesson_id column...")
-        cursor.execute("""
-            ALTER TABLE users
-            ADD COLUMN last_active_lesson_id TEXT
-        """)
-        print("[OK] Added last_active_lesson_id column")
-    else:
-        print("[OK] last_active_lesson_id column already exists")
-
-    if 'last_active_at' not in columns:
-        print("Adding last_active_at column...")
-        cursor.execute("""
-            ALTER TABLE users
-            ADD COLUMN last_active_at TEXT
-        """)
-        print("[OK] Added last_active_at column")
-    else:
-        print("[OK] last_active_at column already exists")
-
-    conn.commit()
+    applied = run_migrations(conn)
     conn.close()
 
+    for migration in applied:
+        print(f"[OK] Applied migration {migration.version}: {migration.name}")
+    if not applied:
+        print("[OK] Database schema already up to date")
+
     print("\n[SUCCESS] Migration completed successfully!")
     print("\nNext steps:")
     print("1. Update cyberlearn_template.db with: python update_template_database.py")
@@ -0,0 +1,106 @@
+"""
+Benchmark leaderboard queries on a scratch database with many users.
+
+Times rebuilding the snapshot, snapshot rank lookups, "around me" pages,
+top pages and exact live ranks, and checks snapshot ranks against
+GamificationEngine.get_user_rank() for a sample of users.
+
+Usage:
+    python scripts/benchmark_leaderboard.py
+    python scripts/benchmark_leaderboard.py --users 100000 --lookups 2000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Allow running as `python scripts/benchmark_leaderboard.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.gamification import GamificationEngine
+from models.user import UserProfile
+from utils.codec import user_to_row
+from utils.database import Database
+from utils.leaderboard import live_rank
+
+
+def populate(db: Database, count: int, rng: random.Random):
+    """count users with random XP, streaks and lesson counts"""
+    rows = []
+    for i in range(count):
+        user = UserProfile(
+            username=f"bench_{i:06d}",
+            total_xp=int(rng.paretovariate(1.5) * 100),
+            streak_days=rng.randint(0, 120),
+            total_lessons_completed=rng.randint(0, 300),
+        )
+        rows.append(user_to_row(user))
+
+    columns = list(rows[0])
+    with db.transaction() as conn:
+        conn.executemany(
+            f"INSERT INTO users ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [list(values.values()) for values in rows],
+        )
+    return [values["user_id"] for values in rows]
+
+
+def per_call(func, args_list) -> float:
+    """Mean milliseconds per call"""
+    start = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite leaderboards")
+    parser.add_argument("--users", type=int, default=100000, help="Users to create (default: 100000)")
+    parser.add_argument("--lookups", type=int, default=1000, help="Lookups per measurement (default: 1000)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(str(Path(tmp) / "benchmark.db"))
+        try:
+            start = time.perf_counter()
+            user_ids = populate(db, args.users, rng)
+            print(f"[DATA] {args.users} users in {time.perf_counter() - start:.1f}s")
+
+            start = time.perf_counter()
+            db.refresh_leaderboards()
+            print(f"[SNAPSHOT] all boards rebuilt in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+            sample = [(rng.choice(user_ids),) for _ in range(args.lookups)]
+            print("=" * 60)
+            print(f"{'rank (snapshot)':<22}{per_call(db.get_leaderboard_rank, sample):>10.3f}ms")
+            print(f"{'around me (+-5)':<22}{per_call(db.get_leaderboard_around, sample):>10.3f}ms")
+            pages = [("xp", 20, rng.randrange(0, args.users - 20)) for _ in range(args.lookups)]
+            print(f"{'page of 20':<22}{per_call(db.get_leaderboard, pages):>10.3f}ms")
+            with db.reader() as conn:
+                live = [(conn, "xp", user_id) for (user_id,) in sample[:100]]
+                print(f"{'rank (live count)':<22}{per_call(live_rank, live):>10.3f}ms")
+            print("=" * 60)
+
+            with db.reader() as conn:
+                all_xp = [row[0] for row in conn.execute("SELECT total_xp FROM users")]
+            engine = GamificationEngine()
+            mismatches = 0
+            for (user_id,) in sample[:50]:
+                rank = db.get_leaderboard_rank(user_id)
+                expected = engine.get_user_rank(rank["value"], list(all_xp))
+                if rank["rank"] != expected["rank"]:
+                    mismatches += 1
+            print("[CHECK] snapshot == get_user_rank" if not mismatches else f"[CHECK] FAILED ({mismatches})")
+        finally:
+            db.close()
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
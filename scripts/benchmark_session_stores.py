@@ -0,0 +1,161 @@
+"""
+Benchmark the browser session store backends under concurrent threads.
+
+The stores hold only the browser key -> auth token records FileSessionManager
+uses to remember a login across refreshes. Auth sessions themselves
+(AuthManager and the user_sessions table) are not measured here.
+
+Each thread puts, looks up (get and compare the token) and deletes (then
+checks it is gone) its own browser keys. Reports
+throughput and p50/p99 latency per operation for every backend in
+utils/session_store.py, plus the old whole-file JSON store for comparison,
+and counts wrong results (lost writes, stale reads) so a fast but
+incorrect backend stands out.
+
+Usage:
+    python scripts/benchmark_session_stores.py
+    python scripts/benchmark_session_stores.py --threads 16 --sessions 500
+"""
+
+import argparse
+import json
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Allow running as `python scripts/benchmark_session_stores.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.database import Database
+from utils.session_store import BACKENDS, create_session_store
+
+
+class LegacyJsonStore:
+    """What FileSessionManager did before SessionStore: rewrite one JSON file"""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, sessions: dict):
+        with open(self.path, "w") as f:
+            json.dump(sessions, f, indent=2)
+
+    def put(self, key, token, user_id):
+        sessions = self._load()
+        sessions[key] = {"token": token, "user_id": str(user_id)}
+        self._save(sessions)
+
+    def get(self, key):
+        return self._load().get(key)
+
+    def delete(self, key):
+        sessions = self._load()
+        if sessions.pop(key, None) is None:
+            return False
+        self._save(sessions)
+        return True
+
+
+def percentile(values, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def run(store, threads: int, sessions: int):
+    """{op: (latencies, wall seconds)} and the number of wrong results"""
+    latencies = {op: [[] for _ in range(threads)] for op in ("put", "lookup", "delete")}
+    errors = [0] * threads
+    walls = {}
+
+    def phase(op, work):
+        barrier = threading.Barrier(threads)
+
+        def worker(t):
+            barrier.wait()
+            times = latencies[op][t]
+            for i in range(sessions):
+                start = time.perf_counter()
+                ok = work(t, i)
+                times.append(time.perf_counter() - start)
+                if not ok:
+                    errors[t] += 1
+
+        workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        walls[op] = time.perf_counter() - start
+
+    tokens = [[secrets.token_urlsafe(32) for _ in range(sessions)] for _ in range(threads)]
+
+    def put(t, i):
+        store.put(f"browser-{t}-{i}", tokens[t][i], f"user-{t}")
+        return True
+
+    def lookup(t, i):
+        record = store.get(f"browser-{t}-{i}")
+        return record is not None and record["token"] == tokens[t][i]
+
+    def delete(t, i):
+        store.delete(f"browser-{t}-{i}")
+        return store.get(f"browser-{t}-{i}") is None
+
+    phase("put", put)
+    phase("lookup", lookup)
+    phase("delete", delete)
+
+    results = {op: ([x for per_thread in lat for x in per_thread], walls[op]) for op, lat in latencies.items()}
+    return results, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark session store backends")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent threads (default: 8)")
+    parser.add_argument("--sessions", type=int, default=250, help="Sessions per thread (default: 250)")
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the old JSON file store")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(str(Path(tmp) / "benchmark.db"))
+        try:
+            stores = [(backend, create_session_store(db, backend, Path(tmp) / "sessions.log")) for backend in BACKENDS]
+            if not args.skip_legacy:
+                stores.append(("json (old)", LegacyJsonStore(Path(tmp) / "browser_sessions.json")))
+
+            print(f"[DATA] {args.threads} threads x {args.sessions} sessions")
+            print("=" * 62)
+            print(f"{'backend':<12}{'op':<10}{'ops/s':>12}{'p50 ms':>14}{'p99 ms':>14}")
+            print("-" * 62)
+            for name, store in stores:
+                results, errors = run(store, args.threads, args.sessions)
+                for op, (latencies, wall) in results.items():
+                    print(
+                        f"{name:<12}{op:<10}{len(latencies) / wall:>12.0f}"
+                        f"{percentile(latencies, 0.5) * 1000:>14.3f}{percentile(latencies, 0.99) * 1000:>14.3f}"
+                    )
+                if errors:
+                    print(f"[ERRORS] {name}: {errors} wrong results (lost writes or stale reads)")
+                    failed = failed or name in BACKENDS
+            print("=" * 62)
+        finally:
+            db.close()
+
+    print("[CHECK] all backends correct" if not failed else "[CHECK] FAILED: a backend returned wrong results")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,169 @@
+"""
+Check that AdaptiveEngine recommends the same lesson with and without the
+RecommendationIndex, and given the user's open lessons (what
+Database.get_open_lesson_ids() returns) instead of their progress, and time
+each path.
+
+Lesson metadata comes from content/ (loaded into a scratch database). Most
+content prerequisites are titles, which the catalog drops, so a share of
+lessons get synthetic prerequisites (earlier lessons of the same domain, and
+now and then an id that matches no lesson). Synthetic users get random skill
+levels and random completed / in-progress lessons.
+
+Usage:
+    python scripts/check_recommendation_index.py
+    python scripts/check_recommendation_index.py --users 2000 --seed 7
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Allow running as `python scripts/check_recommendation_index.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.adaptive_engine import AdaptiveEngine
+from core.recommendation_index import RecommendationIndex
+from models.progress import LessonProgress, LessonStatus
+from models.user import UserProfile, SkillLevels
+from utils.content_sync import CONTENT_DIR, LESSON_GLOB, parse_lesson_file
+from utils.database import Database
+
+
+def load_metadata(content_dir: Path):
+    """Lesson metadata for every valid lesson in content_dir"""
+    lessons = []
+    for path in sorted(content_dir.glob(LESSON_GLOB)):
+        lesson, error = parse_lesson_file(path)
+        if lesson:
+            lessons.append(lesson)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(str(Path(tmp) / "check.db"))
+        try:
+            db.upsert_lessons(lessons)
+            return db.get_all_lessons_metadata()
+        finally:
+            db.close()
+
+
+def add_prerequisites(lessons, rng: random.Random, share: float):
+    """Copies of lessons, a share of them given synthetic prerequisites"""
+    result = []
+    by_domain = {}
+    for lesson in lessons:
+        earlier = by_domain.setdefault(lesson.domain, [])
+        if earlier and rng.random() < share:
+            prereqs = [l.lesson_id for l in rng.sample(earlier, min(len(earlier), rng.randint(1, 2)))]
+            if rng.random() < 0.1:
+                prereqs.append(uuid4())
+            lesson = lesson.model_copy(update={"prerequisites": prereqs})
+        earlier.append(lesson)
+        result.append(lesson)
+    return result
+
+
+def make_user(lessons, rng: random.Random):
+    """A user with random skills and (user, progress) on random lessons"""
+    skills = {name: rng.choice([0, 10, 30, 45, 60, 80, 100]) for name in SkillLevels.model_fields}
+    user = UserProfile(
+        username=f"synthetic_{rng.randrange(10**9)}",
+        skill_levels=SkillLevels(**skills),
+        diagnostic_completed=rng.random() < 0.8,
+    )
+
+    progress = []
+    share = rng.choice([0.0, 0.05, 0.3, 0.7, 0.95])
+    for lesson in lessons:
+        if rng.random() >= share:
+            continue
+        status = rng.choice(
+            [LessonStatus.COMPLETED, LessonStatus.MASTERED, LessonStatus.IN_PROGRESS, LessonStatus.NEEDS_REVIEW]
+        )
+        progress.append(LessonProgress(user_id=user.user_id, lesson_id=lesson.lesson_id, status=status))
+    # Progress on lessons that no longer exist
+    if rng.random() < 0.2:
+        progress.append(LessonProgress(user_id=user.user_id, lesson_id=uuid4(), status=LessonStatus.COMPLETED))
+    return user, progress
+
+
+def open_lessons(lessons, progress):
+    """Ids of the lessons unlocked and not completed, as user_unlocked_lessons gives them"""
+    completed = {p.lesson_id for p in progress if p.status in (LessonStatus.COMPLETED, LessonStatus.MASTERED)}
+    return {
+        lesson.lesson_id for lesson in lessons
+        if lesson.lesson_id not in completed and all(prereq in completed for prereq in lesson.prerequisites)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check RecommendationIndex against the engine's scan")
+    parser.add_argument("--content-dir", default=str(CONTENT_DIR), help="Lesson directory (default: content)")
+    parser.add_argument("--users", type=int, default=1000, help="Synthetic users (default: 1000)")
+    parser.add_argument("--prereq-share", type=float, default=0.3, help="Share of lessons given prerequisites (default: 0.3)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lessons = load_metadata(Path(args.content_dir))
+    if not lessons:
+        print(f"[ERROR] No valid lessons in {args.content_dir}")
+        return 1
+    lessons = add_prerequisites(lessons, rng, args.prereq_share)
+
+    engine = AdaptiveEngine()
+    start = time.perf_counter()
+    index = RecommendationIndex(lessons)
+    build_time = time.perf_counter() - start
+
+    domains = [None] + engine._ordered_domains()
+    cases = []
+    for _ in range(args.users):
+        user, progress = make_user(lessons, rng)
+        cases.append((user, progress, rng.choice(domains)))
+
+    scan_time = index_time = open_time = 0.0
+    mismatches = 0
+    for user, progress, domain in cases:
+        open_ids = open_lessons(lessons, progress)
+
+        start = time.perf_counter()
+        expected = engine.get_recommended_lesson(user, lessons, progress, domain, due_reviews=[])
+        scan_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = engine.get_recommended_lesson(user, lessons, progress, domain, due_reviews=[], index=index)
+        index_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        from_open = engine.get_recommended_lesson(
+            user, lessons, progress, domain, due_reviews=[], index=index, open_lessons=open_ids
+        )
+        open_time += time.perf_counter() - start
+
+        scan_open = engine.get_recommended_lesson(user, lessons, progress, domain, due_reviews=[], open_lessons=open_ids)
+
+        if not expected == actual == from_open == scan_open:
+            mismatches += 1
+            print(
+                f"[MISMATCH] {user.username} domain={domain}: scan={expected} index={actual} "
+                f"open={from_open} scan+open={scan_open}"
+            )
+
+    print(f"[DATA] {len(lessons)} lessons, {len(cases)} users")
+    print(f"[BUILD] index built in {build_time * 1000:.1f}ms")
+    print("=" * 60)
+    print(f"{'scan':<10}{scan_time / len(cases) * 1000:>10.3f}ms per recommendation")
+    print(f"{'index':<10}{index_time / len(cases) * 1000:>10.3f}ms per recommendation")
+    print(f"{'open':<10}{open_time / len(cases) * 1000:>10.3f}ms per recommendation")
+    print("=" * 60)
+    print("[CHECK] index == open == scan" if not mismatches else f"[CHECK] FAILED ({mismatches} mismatches)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,6 +7,13 @@ import sqlite3
 import json
 import uuid
 import sys
+from datetime import datetime
+from pathlib import Path
+
+# Allow running as `python scripts/fix_database_block_ids.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.lesson_blocks import refresh_lesson_blocks
 
 def fix_block_ids_in_database(db_path="cyberlearn.db"):
     """Fix all invalid block_ids in the database"""
@@ -21,6 +28,7 @@ def fix_block_ids_in_database(db_path="cyberlearn.db"):
     lessons = cursor.fetchall()
 
     fixed_count = 0
+    fixed_ids = []
 
     for lesson_id, title, content_blocks_json in lessons:
         if not content_blocks_json:
@@ -47,10 +55,13 @@ def fix_block_ids_in_database(db_path="cyberlearn.db"):
             # Update lesson if modified
             if modified:
                 updated_json = json.dumps(content_blocks, ensure_ascii=False)
+                # Bump updated_at: the app re-indexes lessons whose updated_at
+                # differs from its search index (utils/lesson_search.py)
                 cursor.execute(
-                    "UPDATE lessons SET content_blocks = ? WHERE lesson_id = ?",
-                    (updated_json, lesson_id)
+                    "UPDATE lessons SET content_blocks = ?, updated_at = ? WHERE lesson_id = ?",
+                    (updated_json, datetime.utcnow().isoformat(), lesson_id)
                 )
+                fixed_ids.append(lesson_id)
                 fixed_count += 1
                 print(f"    [FIXED] Updated in database\n")
 
@@ -58,6 +69,13 @@ def fix_block_ids_in_database(db_path="cyberlearn.db"):
             print(f"  ERROR: Could not parse content_blocks for lesson: {title}")
             continue
 
+    # Re-split the per-block rows the lesson viewer reads
+    has_blocks_table = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lesson_blocks'"
+    ).fetchone()
+    if fixed_ids and has_blocks_table:
+        refresh_lesson_blocks(conn, fixed_ids)
+
     conn.commit()
     conn.close()
 
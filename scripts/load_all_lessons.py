@@ -2,14 +2,20 @@
 Load all lessons from content directory into database
 """
 
+import argparse
 import json
 import os
 import sqlite3
-from uuid import UUID
+import sys
 from pathlib import Path
 from datetime import datetime
-from utils.database import Database
-from models.lesson import Lesson
+
+# Allow running as `python scripts/load_all_lessons.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.database import Database, LESSON_INSERTED, LESSON_UPDATED
+from utils.content_sync import parse_lesson_file
+from utils.parallel import parallel_map, add_jobs_argument
 
 def auto_tag_lessons(db_path="cyberlearn.db"):
     """Automatically tag lessons with appropriate package tags after loading"""
@@ -67,81 +73,13 @@ def auto_tag_lessons(db_path="cyberlearn.db"):
     finally:
         conn.close()
 
-def is_lesson_outdated(db, lesson: Lesson) -> bool:
-    """Check if lesson in database is outdated compared to file"""
-    cursor = db.conn.cursor()
-    cursor.execute(
-        "SELECT updated_at FROM lessons WHERE lesson_id = ?",
-        (str(lesson.lesson_id),)
-    )
-    row = cursor.fetchone()
-
-    if not row:
-        return False  # Lesson doesn't exist
-
-    db_updated_at = row[0]
-    file_updated_at = lesson.updated_at.isoformat()
-
-    return file_updated_at > db_updated_at
-
-
-def update_lesson(db, lesson: Lesson) -> bool:
-    """Update existing lesson in database"""
-    try:
-        cursor = db.conn.cursor()
-        cursor.execute(
-            """
-            UPDATE lessons SET
-                domain = ?, title = ?, subtitle = ?, difficulty = ?,
-                estimated_time = ?, order_index = ?, prerequisites = ?,
-                learning_objectives = ?, content_blocks = ?,
-                pre_assessment = ?, post_assessment = ?,
-                mastery_threshold = ?, jim_kwik_principles = ?,
-                base_xp_reward = ?, badge_unlock = ?, is_core_concept = ?,
-                updated_at = ?, author = ?, version = ?
-            WHERE lesson_id = ?
-            """,
-            (
-                lesson.domain,
-                lesson.title,
-                lesson.subtitle,
-                lesson.difficulty,
-                lesson.estimated_time,
-                lesson.order_index,
-                json.dumps([str(p) for p in lesson.prerequisites]),
-                json.dumps(lesson.learning_objectives),
-                json.dumps([json.loads(block.model_dump_json()) for block in lesson.content_blocks]),
-                (
-                    json.dumps([json.loads(q.model_dump_json()) for q in lesson.pre_assessment])
-                    if lesson.pre_assessment
-                    else None
-                ),
-                json.dumps([json.loads(q.model_dump_json()) for q in lesson.post_assessment]),
-                lesson.mastery_threshold,
-                json.dumps(lesson.jim_kwik_principles),
-                lesson.base_xp_reward,
-                lesson.badge_unlock,
-                int(lesson.is_core_concept),
-                lesson.updated_at.isoformat(),
-                lesson.author,
-                lesson.version,
-                str(lesson.lesson_id),
-            ),
-        )
-        db.conn.commit()
-        return True
-    except Exception as e:
-        print(f"[ERROR] Failed to update lesson: {e}")
-        return False
-
-
-def load_all_lessons():
+def load_all_lessons(jobs: int = 0):
     """Load all lesson JSON files from content directory"""
 
     db = Database()
     content_dir = Path("content")
 
-    lesson_files = list(content_dir.glob("lesson_*.json"))
+    lesson_files = sorted(content_dir.glob("lesson_*.json"))
 
     if not lesson_files:
         print("[ERROR] No lesson files found in content/ directory")
@@ -155,41 +93,49 @@ def load_all_lessons():
     updated = 0
     skipped = 0
     errors = 0
-
-    for lesson_file in sorted(lesson_files):
-        try:
-            with open(lesson_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # Convert lesson_id to UUID, but keep prerequisites as strings
-            data['lesson_id'] = UUID(data['lesson_id'])
-            # Prerequisites should remain as strings (as per model definition)
-            data['prerequisites'] = [str(p) for p in data['prerequisites']]
-
-            # Create lesson
-            lesson = Lesson(**data)
-
-            # Try to create lesson first
-            if db.create_lesson(lesson):
-                print(f"[NEW] Loaded: {lesson.title}")
-                loaded += 1
-            else:
-                # Lesson exists - check if outdated
-                if is_lesson_outdated(db, lesson):
-                    if update_lesson(db, lesson):
-                        print(f"[UPDATE] Updated: {lesson.title}")
-                        updated += 1
-                    else:
-                        print(f"[ERROR] Failed to update: {lesson.title}")
-                        errors += 1
-                else:
-                    print(f"[SKIP] Up to date: {lesson.title}")
-                    skipped += 1
-
-        except Exception as e:
-            print(f"[ERROR] Loading {lesson_file.name}: {e}")
+    duplicates = 0
+
+    # Parse and validate across worker processes; this process is the only writer
+    parsed = parallel_map(parse_lesson_file, lesson_files, jobs)
+
+    # One lesson per lesson_id: upserting a duplicate would overwrite the
+    # earlier file's lesson and report both as loaded. The later file wins,
+    # as it did when each file was written in turn.
+    by_id = {}
+    files_by_id = {}
+    for lesson_file, (lesson, error) in zip(lesson_files, parsed):
+        if error:
+            print(f"[ERROR] Loading {lesson_file.name}: {error}")
             errors += 1
-
+            continue
+        lesson_id = str(lesson.lesson_id)
+        if lesson_id in by_id:
+            print(
+                f"[WARN] Duplicate lesson_id {lesson_id}: {files_by_id[lesson_id]} "
+                f"is replaced by {lesson_file.name}"
+            )
+            duplicates += 1
+        by_id[lesson_id] = lesson
+        files_by_id[lesson_id] = lesson_file.name
+    lessons = list(by_id.values())
+
+    # One transaction; lessons whose content hash matches are left untouched
+    outcomes = db.upsert_lessons(lessons)
+
+    for lesson in lessons:
+        outcome = outcomes[str(lesson.lesson_id)]
+        if outcome == LESSON_INSERTED:
+            print(f"[NEW] Loaded: {lesson.title}")
+            loaded += 1
+        elif outcome == LESSON_UPDATED:
+            print(f"[UPDATE] Updated: {lesson.title}")
+            updated += 1
+        else:
+            print(f"[SKIP] Up to date: {lesson.title}")
+            skipped += 1
+
+    with db.reader() as conn:
+        total = conn.execute("SELECT COUNT(*) FROM lessons").fetchone()[0]
     db.close()
 
     print("=" * 60)
@@ -197,7 +143,9 @@ def load_all_lessons():
     print(f"[UPDATED] {updated} lessons")
     print(f"[SKIPPED] {skipped} lessons")
     print(f"[ERRORS] {errors} lessons")
-    print(f"[TOTAL] {loaded + updated + skipped} lessons in database")
+    if duplicates:
+        print(f"[DUPLICATES] {duplicates} files share a lesson_id with another file")
+    print(f"[TOTAL] {total} lessons in database")
 
     # Auto-tag lessons with package tags
     if loaded > 0 or updated > 0 or skipped > 0:
@@ -205,4 +153,7 @@ def load_all_lessons():
 
 
 if __name__ == "__main__":
-    load_all_lessons()
+    parser = argparse.ArgumentParser(description="Load all lessons from content/ into the database")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+    load_all_lessons(args.jobs)
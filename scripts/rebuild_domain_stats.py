@@ -0,0 +1,64 @@
+"""
+Rebuild the per-domain lesson and progress counters.
+
+domain_lesson_counts and the domain_progress counters are kept current by
+triggers (see utils/domain_stats.py). This recomputes them from the lessons
+and progress tables, e.g. after restoring a backup or editing rows with
+triggers dropped.
+
+Usage:
+    python scripts/rebuild_domain_stats.py            # Rebuild cyberlearn.db
+    python scripts/rebuild_domain_stats.py --check    # Only report drift
+    python scripts/rebuild_domain_stats.py --db cyberlearn_template.db
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Allow running as `python scripts/rebuild_domain_stats.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.database import Database
+from utils.domain_stats import find_domain_stats_drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild per-domain lesson statistics")
+    parser.add_argument("--db", default="cyberlearn.db", help="Database path (default: cyberlearn.db)")
+    parser.add_argument("--check", action="store_true", help="Report drift without rebuilding")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"[ERROR] Database not found: {args.db}")
+        return 1
+
+    start = time.perf_counter()
+    db = Database(args.db)
+    try:
+        with db.reader() as conn:
+            drift = find_domain_stats_drift(conn)
+        if not args.check:
+            db.rebuild_domain_stats()
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+
+    for user_id, domain in drift:
+        if user_id is None:
+            print(f"[DRIFT] {domain}: lesson counts")
+        else:
+            print(f"[DRIFT] {domain}: user {user_id}")
+
+    print("=" * 60)
+    print(f"[DRIFT] {len(drift)} rows")
+    if not args.check:
+        print("[REBUILT] domain_lesson_counts, domain_progress")
+    print(f"[TIME] {elapsed:.2f}s")
+
+    return 1 if args.check and drift else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
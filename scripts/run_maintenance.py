@@ -0,0 +1,65 @@
+"""
+Run database maintenance jobs on demand.
+
+The app runs the same jobs on a background thread (see utils/maintenance.py);
+this is for cron, after bulk imports, or on databases no server has open.
+
+Jobs:
+    sessions      Delete expired sessions and browser records
+    optimize      PRAGMA optimize (ANALYZE on first run)
+    checkpoint    Checkpoint and truncate the WAL file
+    vacuum        VACUUM when enough of the file is free pages
+    content       Re-index and re-split lessons written directly by scripts
+    leaderboards  Rebuild stale leaderboard snapshots
+
+Usage:
+    python scripts/run_maintenance.py                       # All jobs on cyberlearn.db
+    python scripts/run_maintenance.py optimize vacuum
+    python scripts/run_maintenance.py vacuum --budget 300 --db cyberlearn_template.db
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Allow running as `python scripts/run_maintenance.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.database import Database
+from utils.maintenance import JOBS, run_maintenance
+
+
+def main():
+    names = [job.name for job in JOBS]
+    parser = argparse.ArgumentParser(description="Run CyberLearn database maintenance")
+    parser.add_argument("jobs", nargs="*", metavar="JOB", help=f"Jobs to run: {', '.join(names)} (default: all)")
+    parser.add_argument("--db", default="cyberlearn.db", help="Database path (default: cyberlearn.db)")
+    parser.add_argument("--budget", type=float, help="Time budget per job in seconds (default: per job)")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.jobs if name not in names]
+    if unknown:
+        parser.error(f"unknown job: {', '.join(unknown)}")
+
+    if not Path(args.db).exists():
+        print(f"[ERROR] Database not found: {args.db}")
+        return 1
+
+    jobs = JOBS
+    if args.budget is not None:
+        jobs = [job._replace(budget=args.budget) for job in JOBS]
+
+    db = Database(args.db)
+    try:
+        results = run_maintenance(db, args.jobs, jobs)
+    finally:
+        db.close()
+
+    failed = [result for result in results if not result.ok]
+    print("=" * 60)
+    print(f"[DONE] {len(results) - len(failed)}/{len(results)} jobs succeeded")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,84 @@
+"""
+Sync lessons from content/ into the database.
+
+Only lesson files that changed since the last sync (by size/mtime, then
+content hash) are parsed; changed lessons are upserted, lessons whose file
+was deleted are removed, and the content manifest is updated in a single
+transaction. User data (progress, notes, hidden flags) is preserved.
+
+Usage:
+    python scripts/sync_content.py                 # Sync cyberlearn.db
+    python scripts/sync_content.py --dry-run       # Show what would change
+    python scripts/sync_content.py --db cyberlearn_template.db
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Allow running as `python scripts/sync_content.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.database import Database
+from utils.content_sync import sync_content, CONTENT_DIR
+from utils.parallel import add_jobs_argument
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync lesson files into the database")
+    parser.add_argument("--db", default="cyberlearn.db", help="Database path (default: cyberlearn.db)")
+    parser.add_argument("--content-dir", default=str(CONTENT_DIR), help="Lesson directory (default: content)")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    parser.add_argument("--keep-orphans", action="store_true", help="Do not remove lessons whose file was deleted")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    content_dir = Path(args.content_dir)
+    if not content_dir.is_dir():
+        print(f"[ERROR] Content directory not found: {content_dir}")
+        return 1
+
+    start = time.perf_counter()
+    db = Database(args.db)
+    try:
+        result = sync_content(
+            db,
+            content_dir,
+            dry_run=args.dry_run,
+            remove_orphans=not args.keep_orphans,
+            jobs=args.jobs,
+        )
+        graph = db.check_prerequisites()
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+
+    prefix = "[DRY RUN] " if args.dry_run else ""
+    for lesson_id in result.new:
+        print(f"{prefix}[NEW] {lesson_id}")
+    for lesson_id in result.updated:
+        print(f"{prefix}[UPDATE] {lesson_id}")
+    for lesson_id in result.removed:
+        print(f"{prefix}[REMOVE] {lesson_id}")
+    for name, error in result.errors:
+        print(f"[ERROR] {name}: {error}")
+
+    print("=" * 60)
+    print(f"[SCANNED] {result.scanned} files")
+    print(f"[UNCHANGED] {result.unchanged}")
+    print(f"[NEW] {len(result.new)}  [UPDATED] {len(result.updated)}  [REMOVED] {len(result.removed)}")
+    print(f"[ERRORS] {len(result.errors)}")
+    print(
+        f"[PREREQS] {graph.edge_count} edges, {len(graph.dangling)} unresolved references, "
+        f"{len(graph.cycles)} cycles"
+    )
+    for cycle in graph.cycles:
+        print(f"[CYCLE] {' -> '.join(cycle)}")
+    print(f"[TIME] {elapsed:.2f}s")
+
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
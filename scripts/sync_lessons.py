@@ -15,10 +15,17 @@ Usage:
 
 import json
 import sqlite3
+import sys
 import argparse
 from pathlib import Path
 from datetime import datetime
 
+# Allow running as `python scripts/sync_lessons.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.codec import LESSON_UPDATE_SQL, lesson_update_params
+from utils.content_sync import load_lesson_file
+
 CONTENT_DIR = Path(__file__).parent / 'content'
 DB_PATH = "cyberlearn_template.db"  # Use template database
 
@@ -92,10 +99,10 @@ def find_modified_lessons(conn, lesson_files):
 
         file_info = lesson_files[lesson_id]
 
-        # Parse database timestamp (format: "2025-10-31 12:34:56")
+        # Parse database timestamp ("2025-10-31 12:34:56" or ISO format)
         if updated_at:
             try:
-                db_time = datetime.strptime(updated_at, "%Y-%m-%d %H:%M:%S").timestamp()
+                db_time = datetime.fromisoformat(updated_at).timestamp()
             except:
                 # If parsing fails, assume modified
                 db_time = 0
@@ -120,56 +127,12 @@ def find_modified_lessons(conn, lesson_files):
 def reload_lesson(conn, lesson_id, filepath):
     """Reload a lesson from JSON file into database"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            lesson = json.load(f)
-
-        cursor = conn.cursor()
+        lesson = load_lesson_file(filepath)
+        lesson.updated_at = datetime.utcnow()
 
         # Update lesson in database
-        cursor.execute("""
-            UPDATE lessons
-            SET
-                domain = ?,
-                title = ?,
-                subtitle = ?,
-                difficulty = ?,
-                order_index = ?,
-                estimated_time = ?,
-                prerequisites = ?,
-                learning_objectives = ?,
-                content_blocks = ?,
-                pre_assessment = ?,
-                post_assessment = ?,
-                mastery_threshold = ?,
-                jim_kwik_principles = ?,
-                base_xp_reward = ?,
-                badge_unlock = ?,
-                is_core_concept = ?,
-                author = ?,
-                version = ?,
-                updated_at = datetime('now')
-            WHERE lesson_id = ?
-        """, (
-            lesson.get('domain'),
-            lesson.get('title'),
-            lesson.get('subtitle', ''),
-            lesson.get('difficulty'),
-            lesson.get('order_index'),
-            lesson.get('estimated_time'),
-            json.dumps(lesson.get('prerequisites', [])),
-            json.dumps(lesson.get('learning_objectives', [])),
-            json.dumps(lesson.get('content_blocks', [])),
-            json.dumps(lesson.get('pre_assessment', [])),
-            json.dumps(lesson.get('post_assessment', [])),
-            lesson.get('mastery_threshold', 80),
-            json.dumps(lesson.get('jim_kwik_principles', [])),
-            lesson.get('base_xp_reward', 100),
-            lesson.get('badge_unlock'),
-            lesson.get('is_core_concept', 0),
-            lesson.get('author', ''),
-            lesson.get('version', '1.0'),
-            lesson_id
-        ))
+        cursor = conn.cursor()
+        cursor.execute(LESSON_UPDATE_SQL, lesson_update_params(lesson))
 
         return True
     except Exception as e:
@@ -12,10 +12,17 @@ Usage:
 
 import json
 import sqlite3
+import sys
 from pathlib import Path
 from typing import Dict, List
 from datetime import datetime
 
+# Allow running as `python scripts/update_outdated_lessons.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.codec import LESSON_UPDATE_SQL, lesson_update_params
+from utils.content_sync import lesson_from_data
+
 # Database configuration
 DB_PATH = "cyberlearn.db"  # Use working database, not template
 CONTENT_DIR = Path("content")
@@ -59,64 +66,14 @@ def update_lesson_in_db(conn: sqlite3.Connection, lesson_data: Dict) -> bool:
     Returns:
         True if updated successfully, False otherwise
     """
+    lesson_id = lesson_data.get('lesson_id')
     try:
-        cursor = conn.cursor()
+        lesson = lesson_from_data(lesson_data)
+        # Bump updated_at so the app re-indexes the lesson
+        lesson.updated_at = datetime.utcnow()
 
-        # Prepare data
-        lesson_id = lesson_data['lesson_id']
-        domain = lesson_data['domain']
-        title = lesson_data['title']
-        subtitle = lesson_data.get('subtitle')
-        difficulty = lesson_data['difficulty']
-        estimated_time = lesson_data['estimated_time']
-        order_index = lesson_data['order_index']
-        prerequisites = json.dumps([str(p) for p in lesson_data.get('prerequisites', [])])
-        learning_objectives = json.dumps(lesson_data['learning_objectives'])
-        content_blocks = json.dumps(lesson_data['content_blocks'])
-        pre_assessment = json.dumps(lesson_data['pre_assessment']) if lesson_data.get('pre_assessment') else None
-        post_assessment = json.dumps(lesson_data['post_assessment'])
-        mastery_threshold = lesson_data.get('mastery_threshold', 80)
-        jim_kwik_principles = json.dumps(lesson_data['jim_kwik_principles'])
-        base_xp_reward = lesson_data.get('base_xp_reward', 100)
-        badge_unlock = lesson_data.get('badge_unlock')
-        is_core_concept = int(lesson_data.get('is_core_concept', False))
-        author = lesson_data.get('author')
-        version = lesson_data.get('version', '1.0')
-
-        # Update updated_at timestamp
-        updated_at = datetime.utcnow().isoformat()
-
-        # Update the lesson
-        cursor.execute("""
-            UPDATE lessons SET
-                domain = ?,
-                title = ?,
-                subtitle = ?,
-                difficulty = ?,
-                estimated_time = ?,
-                order_index = ?,
-                prerequisites = ?,
-                learning_objectives = ?,
-                content_blocks = ?,
-                pre_assessment = ?,
-                post_assessment = ?,
-                mastery_threshold = ?,
-                jim_kwik_principles = ?,
-                base_xp_reward = ?,
-                badge_unlock = ?,
-                is_core_concept = ?,
-                updated_at = ?,
-                author = ?,
-                version = ?
-            WHERE lesson_id = ?
-        """, (
-            domain, title, subtitle, difficulty, estimated_time, order_index,
-            prerequisites, learning_objectives, content_blocks,
-            pre_assessment, post_assessment, mastery_threshold,
-            jim_kwik_principles, base_xp_reward, badge_unlock,
-            is_core_concept, updated_at, author, version,
-            lesson_id
-        ))
+        cursor = conn.cursor()
+        cursor.execute(LESSON_UPDATE_SQL, lesson_update_params(lesson))
 
         conn.commit()
         return True
@@ -60,6 +60,10 @@ def update_template_database():
     cursor.execute("SELECT COUNT(*) FROM lesson_tags")
     association_count = cursor.fetchone()[0]
 
+    # The app uses WAL mode: fold pending WAL pages into the main file so the
+    # copy below contains every committed change
+    cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     conn.close()
 
     print(f"\nWorking database verified:")
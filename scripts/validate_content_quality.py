@@ -15,14 +15,26 @@ Checks for:
 8. gamify_it: Challenges, progression, engagement
 9. learning_sprint: Structured flow, clear progression
 10. multiple_memory_pathways: Visual, auditory, kinesthetic variety
+
+Usage:
+    python scripts/validate_content_quality.py              # Two sample lessons, verbose
+    python scripts/validate_content_quality.py --all        # Every lesson in content/
+    python scripts/validate_content_quality.py --all -j 8   # ... across 8 worker processes
 """
 
+import argparse
 import json
 import os
 import re
+import sys
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
+# Allow running as `python scripts/validate_content_quality.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.parallel import parallel_map, add_jobs_argument
+
 # Jargon detection patterns
 JARGON_PATTERNS = [
     r'\bsynergize\b',
@@ -482,7 +494,7 @@ def validate_multiple_memory_pathways(lesson: dict) -> Tuple[bool, List[str], Li
         return True, evidence, issues
     else:
         issues.append(f"Only {len(pathways_used)} pathway(s) used (recommended: 2+)")
-        issues.append("Missing: " + ', '.join(['visual', 'auditory', 'kinesthetic'] - set(pathways_used)))
+        issues.append("Missing: " + ', '.join(sorted({'visual', 'auditory', 'kinesthetic'} - set(pathways_used))))
         return False, evidence, issues
 
 
@@ -531,26 +543,47 @@ def validate_lesson_content_quality(lesson_file: str, verbose: bool = False) ->
     return result
 
 
+def validate_all_content_quality(content_dir: Path = Path('content'), jobs: int = 0) -> List[ContentQualityResult]:
+    """
+    Validate every lesson file across `jobs` worker processes (0 = one per CPU).
+
+    Results are returned in file order, so reports are identical for any job count.
+    """
+    lesson_files = [str(path) for path in sorted(content_dir.glob('lesson_*.json'))]
+    return parallel_map(validate_lesson_content_quality, lesson_files, jobs)
+
+
 def main():
-    """Validate content quality for sample lessons."""
+    """Validate content quality for sample lessons (or every lesson with --all)."""
+    parser = argparse.ArgumentParser(description="Validate Jim Kwik principle implementation in lesson content")
+    parser.add_argument('--all', action='store_true', help="Validate every lesson in content/")
+    parser.add_argument('--verbose', '-v', action='store_true', help="Show per-principle evidence with --all")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
     print("="*80)
     print("CONTENT QUALITY VALIDATION")
     print("="*80)
     print("\nThis script validates that Jim Kwik principles are ACTUALLY")
     print("implemented in lesson content, not just listed in metadata.\n")
 
-    # Test on a few representative lessons
-    test_lessons = [
-        "content/lesson_fundamentals_01_authentication_vs_authorization_RICH.json",
-        "content/lesson_dfir_168_common_attacks_against_azure_and_m365_RICH.json",
-    ]
-
-    results = []
-    for lesson_file in test_lessons:
-        if os.path.exists(lesson_file):
-            result = validate_lesson_content_quality(lesson_file, verbose=True)
-            results.append(result)
-            result.print_report(verbose=True)
+    if args.all:
+        results = validate_all_content_quality(jobs=args.jobs)
+        for result in results:
+            result.print_report(verbose=args.verbose)
+    else:
+        # Test on a few representative lessons
+        test_lessons = [
+            "content/lesson_fundamentals_01_authentication_vs_authorization_RICH.json",
+            "content/lesson_dfir_168_common_attacks_against_azure_and_m365_RICH.json",
+        ]
+
+        results = []
+        for lesson_file in test_lessons:
+            if os.path.exists(lesson_file):
+                result = validate_lesson_content_quality(lesson_file, verbose=True)
+                results.append(result)
+                result.print_report(verbose=True)
 
     # Summary
     print("\n" + "="*80)
@@ -13,6 +13,7 @@ Usage:
     python validate_lesson_compliance.py              # Print to console
     python validate_lesson_compliance.py --save-report # Save to timestamped file
     python validate_lesson_compliance.py -s            # Short form
+    python validate_lesson_compliance.py --jobs 4      # Use 4 worker processes (default: all CPUs)
 
 Validates:
 ✓ Required fields (lesson_id, domain, title, etc.)
@@ -38,10 +39,16 @@ Output:
 """
 
 import json
+import sys
 from pathlib import Path
 from collections import defaultdict
 from typing import Dict, List, Tuple
 
+# Allow running as `python scripts/validate_lesson_compliance.py` from the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.parallel import parallel_map
+
 # Valid content block types from ContentType enum
 VALID_CONTENT_TYPES = {
     'explanation', 'video', 'diagram', 'quiz', 'simulation',
@@ -485,10 +492,39 @@ class LessonValidator:
                 seen_content[normalized] = i
 
 
-def validate_all_lessons(content_dir: Path = Path('content')) -> Dict:
+def validate_lesson_file(lesson_file: Path) -> Dict:
+    """
+    Validate one lesson file (process-pool worker)
+
+    Returns the lesson's domain/title and validation outcome, or an error
+    message if the file could not be loaded
+    """
+    try:
+        with open(lesson_file, 'r', encoding='utf-8') as f:
+            lesson = json.load(f)
+
+        is_compliant, issues, warnings = LessonValidator().validate_lesson(
+            lesson, lesson_file.name
+        )
+        return {
+            'domain': lesson.get('domain', 'unknown'),
+            'title': lesson.get('title', 'N/A'),
+            'is_compliant': is_compliant,
+            'issues': issues,
+            'warnings': warnings,
+            'error': None,
+        }
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def validate_all_lessons(content_dir: Path = Path('content'), jobs: int = 0) -> Dict:
     """
     Validate all lessons in content directory
 
+    Files are validated across `jobs` worker processes (0 = one per CPU);
+    the report is printed in file order regardless.
+
     Returns summary statistics
     """
 
@@ -498,8 +534,6 @@ def validate_all_lessons(content_dir: Path = Path('content')) -> Dict:
     print(f"Found {len(lesson_files)} lesson files\n")
     print("=" * 80)
 
-    validator = LessonValidator()
-
     stats = {
         'total': len(lesson_files),
         'compliant': 0,
@@ -511,56 +545,53 @@ def validate_all_lessons(content_dir: Path = Path('content')) -> Dict:
 
     non_compliant_lessons = []
 
-    for lesson_file in lesson_files:
-        try:
-            with open(lesson_file, 'r', encoding='utf-8') as f:
-                lesson = json.load(f)
-
-            is_compliant, issues, warnings = validator.validate_lesson(
-                lesson, lesson_file.name
-            )
-
-            domain = lesson.get('domain', 'unknown')
-
-            if is_compliant:
-                stats['compliant'] += 1
-                stats['by_domain'][domain]['compliant'] += 1
-                if warnings:
-                    print(f"\n[OK] {lesson_file.name}")
-                    print(f"    Title: {lesson.get('title', 'N/A')}")
-                    print(f"    Warnings: {len(warnings)}")
-                    for warning in warnings:
-                        print(f"      [!] {warning}")
-            else:
-                stats['non_compliant'] += 1
-                stats['by_domain'][domain]['non_compliant'] += 1
-                stats['total_issues'] += len(issues)
-
-                non_compliant_lessons.append({
-                    'filename': lesson_file.name,
-                    'title': lesson.get('title', 'N/A'),
-                    'domain': domain,
-                    'issues': issues,
-                    'warnings': warnings
-                })
-
-                print(f"\n[FAIL] {lesson_file.name}")
-                print(f"       Title: {lesson.get('title', 'N/A')}")
-                print(f"       Domain: {domain}")
-                print(f"       Issues: {len(issues)}")
-                for issue in issues:
-                    print(f"         [X] {issue}")
-                if warnings:
-                    print(f"       Warnings: {len(warnings)}")
-                    for warning in warnings:
-                        print(f"         [!] {warning}")
-
-            stats['total_warnings'] += len(warnings)
+    results = parallel_map(validate_lesson_file, lesson_files, jobs)
 
-        except Exception as e:
-            print(f"\n[ERROR] {lesson_file.name}: {e}")
+    for lesson_file, result in zip(lesson_files, results):
+        if result['error']:
+            print(f"\n[ERROR] {lesson_file.name}: {result['error']}")
             stats['non_compliant'] += 1
             stats['total_issues'] += 1
+            continue
+
+        issues = result['issues']
+        warnings = result['warnings']
+        domain = result['domain']
+
+        if result['is_compliant']:
+            stats['compliant'] += 1
+            stats['by_domain'][domain]['compliant'] += 1
+            if warnings:
+                print(f"\n[OK] {lesson_file.name}")
+                print(f"    Title: {result['title']}")
+                print(f"    Warnings: {len(warnings)}")
+                for warning in warnings:
+                    print(f"      [!] {warning}")
+        else:
+            stats['non_compliant'] += 1
+            stats['by_domain'][domain]['non_compliant'] += 1
+            stats['total_issues'] += len(issues)
+
+            non_compliant_lessons.append({
+                'filename': lesson_file.name,
+                'title': result['title'],
+                'domain': domain,
+                'issues': issues,
+                'warnings': warnings
+            })
+
+            print(f"\n[FAIL] {lesson_file.name}")
+            print(f"       Title: {result['title']}")
+            print(f"       Domain: {domain}")
+            print(f"       Issues: {len(issues)}")
+            for issue in issues:
+                print(f"         [X] {issue}")
+            if warnings:
+                print(f"       Warnings: {len(warnings)}")
+                for warning in warnings:
+                    print(f"         [!] {warning}")
+
+        stats['total_warnings'] += len(warnings)
 
     # Print summary
     print("\n" + "=" * 80)
@@ -598,10 +629,13 @@ def validate_all_lessons(content_dir: Path = Path('content')) -> Dict:
 
 
 if __name__ == "__main__":
-    import sys
 
     # Check for command line arguments
     save_report = '--save-report' in sys.argv or '-s' in sys.argv
+    jobs = 0
+    for flag in ('--jobs', '-j'):
+        if flag in sys.argv:
+            jobs = int(sys.argv[sys.argv.index(flag) + 1])
 
     if save_report:
         # Redirect output to file
@@ -613,7 +647,7 @@ if __name__ == "__main__":
         sys.stdout = output
 
         try:
-            stats = validate_all_lessons()
+            stats = validate_all_lessons(jobs=jobs)
 
             # Restore stdout
             sys.stdout = old_stdout
@@ -635,5 +669,5 @@ if __name__ == "__main__":
             sys.stdout = old_stdout
             print(f"Error generating report: {e}")
     else:
-        validate_all_lessons()
+        validate_all_lessons(jobs=jobs)
         print("\nTip: Use --save-report or -s to save this report to a file")
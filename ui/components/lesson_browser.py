@@ -4,7 +4,8 @@ Displays lessons with colored tag badges and filter options
 """
 
 import streamlit as st
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
+from uuid import UUID
 from models.lesson import LessonMetadata
 from models.tag import TagFilter
 from models.user import UserProfile
@@ -31,11 +32,27 @@ def render_tag_badge(tag_name: str, tag_color: str, tag_icon: Optional[str] = No
     """
 
 
-def render_lesson_card_with_tags(lesson: LessonMetadata, tags: List, db: Database, user: UserProfile):
-    """Render a lesson card with colored tag badges"""
+def render_lesson_card_with_tags(
+    lesson: LessonMetadata,
+    tags: List,
+    db: Database,
+    user: UserProfile,
+    lesson_tags: Optional[List] = None,
+    progress_map: Optional[Dict] = None,
+    open_lessons: Optional[Set[UUID]] = None,
+):
+    """Render a lesson card with colored tag badges
+
+    List views should pass lesson_tags, progress_map and open_lessons from the
+    batch lookups (get_tags_for_lessons / get_progress_for_lessons /
+    get_open_lesson_ids); they are only queried here when rendering a single
+    card. Lessons not yet started whose prerequisites are incomplete are
+    shown locked.
+    """
 
     # Get lesson tags
-    lesson_tags = db.get_lesson_tags(str(lesson.lesson_id))
+    if lesson_tags is None:
+        lesson_tags = db.get_lesson_tags(str(lesson.lesson_id))
 
     # Build tag badges HTML
     tags_html = ""
@@ -43,17 +60,28 @@ def render_lesson_card_with_tags(lesson: LessonMetadata, tags: List, db: Databas
         tags_html += render_tag_badge(tag.name, tag.color, tag.icon)
 
     # Get progress status
-    progress = db.get_lesson_progress(user.user_id, lesson.lesson_id)
+    if progress_map is not None:
+        progress = progress_map.get(str(lesson.lesson_id))
+    else:
+        progress = db.get_lesson_progress(user.user_id, lesson.lesson_id)
     status_emoji = "🔵"  # Not started
     status_text = "Not Started"
+    locked = False
 
-    if progress:
-        if progress.status == "completed" or progress.status == "mastered":
-            status_emoji = "✅"
-            status_text = "Completed"
-        elif progress.status == "in_progress":
-            status_emoji = "🟡"
-            status_text = "In Progress"
+    if progress and (progress.status == "completed" or progress.status == "mastered"):
+        status_emoji = "✅"
+        status_text = "Completed"
+    elif progress and progress.status == "in_progress":
+        status_emoji = "🟡"
+        status_text = "In Progress"
+    else:
+        if open_lessons is not None:
+            locked = lesson.lesson_id not in open_lessons
+        else:
+            locked = not db.is_lesson_unlocked(user.user_id, lesson.lesson_id)
+        if locked:
+            status_emoji = "🔒"
+            status_text = "Locked"
 
     # Render lesson card
     st.markdown(
@@ -88,14 +116,17 @@ def render_lesson_card_with_tags(lesson: LessonMetadata, tags: List, db: Databas
     elif progress and progress.status == "in_progress":
         button_text = "▶️ Continue Lesson"
         button_key = f"continue_{lesson.lesson_id}"
+    elif locked:
+        button_text = "🔒 Complete prerequisites first"
+        button_key = f"locked_{lesson.lesson_id}"
     else:
         button_text = "🚀 Start Lesson"
         button_key = f"start_{lesson.lesson_id}"
 
-    if st.button(button_text, key=button_key, use_container_width=True):
-        full_lesson = db.get_lesson(lesson.lesson_id)
-        if full_lesson:
-            st.session_state.current_lesson = full_lesson
+    if st.button(button_text, key=button_key, use_container_width=True, disabled=locked):
+        lesson_header = db.get_lesson_header(lesson.lesson_id)
+        if lesson_header:
+            st.session_state.current_lesson = lesson_header
             st.session_state.current_page = "lesson"
             st.rerun()
 
@@ -175,6 +206,12 @@ def render_lesson_browser(user: UserProfile, db: Database):
     else:
         st.markdown(f"**Found {len(filtered_lessons)} lesson{'s' if len(filtered_lessons) != 1 else ''}**")
 
+        # One query each for all cards' tags, progress and unlocked lessons
+        lesson_ids = [str(lesson.lesson_id) for lesson in filtered_lessons]
+        tags_by_lesson = db.get_tags_for_lessons(lesson_ids)
+        progress_by_lesson = db.get_progress_for_lessons(user.user_id, lesson_ids)
+        open_lessons = db.get_open_lesson_ids(user.user_id, include_hidden=True)
+
         # Display by domain
         for domain, lessons in sorted(lessons_by_domain.items()):
             with st.expander(f"📂 {domain.replace('_', ' ').title()} ({len(lessons)} lessons)", expanded=True):
@@ -182,7 +219,16 @@ def render_lesson_browser(user: UserProfile, db: Database):
                 lessons_sorted = sorted(lessons, key=lambda x: x.order_index)
 
                 for lesson in lessons_sorted:
-                    render_lesson_card_with_tags(lesson, all_tags, db, user)
+                    lesson_id = str(lesson.lesson_id)
+                    render_lesson_card_with_tags(
+                        lesson,
+                        all_tags,
+                        db,
+                        user,
+                        lesson_tags=tags_by_lesson.get(lesson_id, []),
+                        progress_map=progress_by_lesson,
+                        open_lessons=open_lessons,
+                    )
                     st.markdown("<br>", unsafe_allow_html=True)
 
 
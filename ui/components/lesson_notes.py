@@ -124,18 +124,17 @@ def render_add_note_form(lesson_id: str, user_id: str, db, content_block_index:
                     "path": str(image_path)
                 })
 
-            cursor = db.conn.cursor()
-            cursor.execute("""
-                INSERT INTO lesson_notes (
+            with db.transaction() as conn:
+                conn.execute("""
+                    INSERT INTO lesson_notes (
+                        note_id, user_id, lesson_id, content_block_index,
+                        note_text, note_type, attachments, is_pinned, created_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
                     note_id, user_id, lesson_id, content_block_index,
-                    note_text, note_type, attachments, is_pinned, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                note_id, user_id, lesson_id, content_block_index,
-                note_text, 'text', json.dumps(attachments) if attachments else None,
-                1 if is_pinned else 0, now, now
-            ))
-            db.conn.commit()
+                    note_text, 'text', json.dumps(attachments) if attachments else None,
+                    1 if is_pinned else 0, now, now
+                ))
 
             st.success("Note saved!" + (" (with image)" if attachments else ""))
             st.rerun()
@@ -223,30 +222,31 @@ def render_note_card(note: Dict, db):
 def get_notes(lesson_id: str, user_id: str, db, content_block_index: Optional[int] = None) -> List[Dict]:
     """Get all notes for a lesson or content block"""
 
-    cursor = db.conn.cursor()
-
-    if content_block_index is not None:
-        # Get notes for specific block + general notes
-        cursor.execute("""
-            SELECT note_id, user_id, lesson_id, content_block_index, note_text,
-                   note_type, attachments, is_pinned, created_at, updated_at
-            FROM lesson_notes
-            WHERE user_id = ? AND lesson_id = ?
-              AND (content_block_index = ? OR content_block_index IS NULL)
-            ORDER BY is_pinned DESC, created_at DESC
-        """, (user_id, lesson_id, content_block_index))
-    else:
-        # Get all notes for lesson
-        cursor.execute("""
-            SELECT note_id, user_id, lesson_id, content_block_index, note_text,
-                   note_type, attachments, is_pinned, created_at, updated_at
-            FROM lesson_notes
-            WHERE user_id = ? AND lesson_id = ?
-            ORDER BY is_pinned DESC, created_at DESC
-        """, (user_id, lesson_id))
-
-    columns = [desc[0] for desc in cursor.description]
-    rows = cursor.fetchall()
+    with db.reader() as conn:
+        cursor = conn.cursor()
+
+        if content_block_index is not None:
+            # Get notes for specific block + general notes
+            cursor.execute("""
+                SELECT note_id, user_id, lesson_id, content_block_index, note_text,
+                       note_type, attachments, is_pinned, created_at, updated_at
+                FROM lesson_notes
+                WHERE user_id = ? AND lesson_id = ?
+                  AND (content_block_index = ? OR content_block_index IS NULL)
+                ORDER BY is_pinned DESC, created_at DESC
+            """, (user_id, lesson_id, content_block_index))
+        else:
+            # Get all notes for lesson
+            cursor.execute("""
+                SELECT note_id, user_id, lesson_id, content_block_index, note_text,
+                       note_type, attachments, is_pinned, created_at, updated_at
+                FROM lesson_notes
+                WHERE user_id = ? AND lesson_id = ?
+                ORDER BY is_pinned DESC, created_at DESC
+            """, (user_id, lesson_id))
+
+        columns = [desc[0] for desc in cursor.description]
+        rows = cursor.fetchall()
 
     notes = []
     for row in rows:
@@ -259,18 +259,16 @@ def get_notes(lesson_id: str, user_id: str, db, content_block_index: Optional[in
 def update_note(note_id: str, note_text: str, is_pinned: bool, db):
     """Update an existing note"""
 
-    cursor = db.conn.cursor()
-    cursor.execute("""
-        UPDATE lesson_notes
-        SET note_text = ?, is_pinned = ?, updated_at = ?
-        WHERE note_id = ?
-    """, (note_text, 1 if is_pinned else 0, datetime.now().isoformat(), note_id))
-    db.conn.commit()
+    with db.transaction() as conn:
+        conn.execute("""
+            UPDATE lesson_notes
+            SET note_text = ?, is_pinned = ?, updated_at = ?
+            WHERE note_id = ?
+        """, (note_text, 1 if is_pinned else 0, datetime.now().isoformat(), note_id))
 
 
 def delete_note(note_id: str, db):
     """Delete a note"""
 
-    cursor = db.conn.cursor()
-    cursor.execute("DELETE FROM lesson_notes WHERE note_id = ?", (note_id,))
-    db.conn.commit()
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM lesson_notes WHERE note_id = ?", (note_id,))
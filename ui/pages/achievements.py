@@ -9,6 +9,63 @@ from utils.database import Database
 from core.gamification import GamificationEngine
 
 
+LEADERBOARD_LABELS = {
+    "xp": "Total XP",
+    "streak": "Streak",
+    "lessons": "Lessons Completed",
+}
+
+
+def render_leaderboard(user: UserProfile, db: Database):
+    """Top learners and the learners around this user on a leaderboard"""
+
+    st.markdown("## 📊 Leaderboard")
+
+    board = st.radio(
+        "Rank by",
+        list(LEADERBOARD_LABELS),
+        format_func=LEADERBOARD_LABELS.get,
+        horizontal=True,
+        key="leaderboard_board",
+    )
+
+    top = db.get_leaderboard(board, limit=10)
+    if not top:
+        st.info("The leaderboard is being built. Check back in a minute.")
+        return
+
+    rank = db.get_leaderboard_rank(user.user_id, board)
+    if rank:
+        st.metric(
+            "Your Rank",
+            f"#{rank['rank']:,} of {rank['total_users']:,}",
+            help=f"Ahead of or level with {rank['percentile']}% of learners",
+        )
+
+    def render_entries(entries):
+        for entry in entries:
+            line = f"**#{entry['rank']}** {entry['username']} - {entry['value']:,}"
+            if entry["user_id"] == str(user.user_id):
+                line = f"👉 {line} (you)"
+            st.markdown(line)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("### 🥇 Top 10")
+        render_entries(top)
+
+    with col2:
+        st.markdown("### 🎯 Around You")
+        around = db.get_leaderboard_around(user.user_id, board, radius=3)
+        if around:
+            render_entries(around)
+        else:
+            st.caption("You'll appear here after the next leaderboard update.")
+
+    st.caption("Rankings update every few minutes.")
+
+
 def render(user: UserProfile, db: Database):
     """Render achievements page"""
 
@@ -84,6 +141,10 @@ def render(user: UserProfile, db: Database):
 
     st.markdown("---")
 
+    render_leaderboard(user, db)
+
+    st.markdown("---")
+
     # Progress to next milestone
     st.markdown("## 🎯 Next Milestone")
 
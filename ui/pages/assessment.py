@@ -30,15 +30,7 @@ def render_assessment_page():
         st.session_state.domain_responses = {}
 
     # Get all assessment questions grouped by domain
-    cursor = db.conn.cursor()
-    cursor.execute("""
-        SELECT domain, COUNT(*) as question_count
-        FROM assessment_questions
-        GROUP BY domain
-        ORDER BY domain
-    """)
-
-    domains_data = cursor.fetchall()
+    domains_data = db.get_assessment_domains()
 
     if not domains_data:
         st.error("No assessment questions found in database. Please run populate_assessment_questions.py")
@@ -146,15 +138,13 @@ def render_domain_assessment(domain: str, all_domains: List[str]):
     st.markdown("---")
 
     # Get questions for this domain
-    cursor = db.conn.cursor()
-    cursor.execute("""
-        SELECT question_id, question_text, options, correct_answer, difficulty, explanation
-        FROM assessment_questions
-        WHERE domain = ?
-        ORDER BY difficulty
-    """, (domain,))
-
-    questions = cursor.fetchall()
+    with db.reader() as conn:
+        questions = conn.execute("""
+            SELECT question_id, question_text, options, correct_answer, difficulty, explanation
+            FROM assessment_questions
+            WHERE domain = ?
+            ORDER BY difficulty
+        """, (domain,)).fetchall()
 
     if not questions:
         st.warning(f"No questions found for {domain}")
@@ -346,28 +336,25 @@ def render_assessment_results(all_domains: List[str]):
             setattr(user.skill_levels, domain, score)
 
         # Save user assessment record
-        cursor = db.conn.cursor()
         assessment_id = str(uuid4())
 
-        cursor.execute("""
-            INSERT INTO user_assessments (
-                assessment_id, user_id, assessment_date, domain_scores, total_score, total_questions
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            assessment_id,
-            str(user.user_id),
-            datetime.now().isoformat(),
-            json.dumps(domain_scores),
-            overall_percentage,
-            total_questions
-        ))
-
-        db.conn.commit()
-        db.update_user(user)
-
         # Mark diagnostic complete
         user.diagnostic_completed = True
-        db.update_user(user)
+
+        with db.transaction() as conn:
+            conn.execute("""
+                INSERT INTO user_assessments (
+                    assessment_id, user_id, assessment_date, domain_scores, total_score, total_questions
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                assessment_id,
+                str(user.user_id),
+                datetime.now().isoformat(),
+                json.dumps(domain_scores),
+                overall_percentage,
+                total_questions
+            ))
+            db.update_user(user)
 
         st.success("✅ Results saved! Your skill levels have been updated.")
 
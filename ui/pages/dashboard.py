@@ -9,8 +9,10 @@ import plotly.express as px
 
 from models.user import UserProfile
 from models.progress import LessonStatus
+from utils.activity import save_user_activity
 from utils.database import Database
 from core.adaptive_engine import AdaptiveEngine
+from core.recommendation_index import get_next_lessons, get_recommendation_index
 from core.gamification import GamificationEngine
 from datetime import datetime, timedelta
 
@@ -21,7 +23,7 @@ def render_continue_learning(user: UserProfile, db: Database):
     # Check if user has a last active lesson
     if user.last_active_lesson_id and user.last_active_at:
         # Get the lesson
-        lesson = db.get_lesson(user.last_active_lesson_id)
+        lesson = db.get_lesson_header(user.last_active_lesson_id)
 
         if lesson:
             # Calculate time since last active
@@ -71,9 +73,10 @@ def render_continue_learning(user: UserProfile, db: Database):
 def render(user: UserProfile, db: Database):
     """Render main dashboard"""
 
-    # Update streak on login
+    # Update streak on login (a changed streak is written at once, the
+    # last_login timestamp alone only every HEARTBEAT_INTERVAL)
     streak_info = user.update_streak()
-    db.update_user(user)
+    save_user_activity(db, user)
 
     # Header
     st.markdown('<h1 class="main-header">🏠 Dashboard</h1>', unsafe_allow_html=True)
@@ -159,15 +162,18 @@ def render_recommended_lessons(user: UserProfile, db: Database):
 
     adaptive = AdaptiveEngine()
     user_progress = db.get_user_progress(user.user_id)
-    all_lessons = db.get_all_lessons_metadata()
+    catalog = db.get_lesson_catalog()
 
     # Get recommendation
     recommended_id = adaptive.get_recommended_lesson(
-        user, all_lessons, user_progress
+        user, catalog.lessons, user_progress,
+        due_reviews=db.get_due_reviews(user.user_id, limit=1),
+        index=get_recommendation_index(catalog),
+        open_lessons=db.get_open_lesson_ids(user.user_id),
     )
 
     if recommended_id:
-        lesson = db.get_lesson(recommended_id)
+        lesson = db.get_lesson_header(recommended_id)
 
         # Double-check the lesson isn't already completed (defensive check)
         lesson_progress = db.get_lesson_progress(user.user_id, recommended_id)
@@ -362,6 +368,8 @@ def render_lesson_stats(user: UserProfile, db: Database):
 
     # Get lesson stats
     stats = db.get_lesson_stats_by_domain(user.user_id)
+    # Next lesson in every domain, one cached computation for all rows
+    next_lessons = get_next_lessons(db, user)
 
     if stats:
         # Create a compact table view
@@ -387,6 +395,9 @@ def render_lesson_stats(user: UserProfile, db: Database):
                 }
                 domain_short = domain_abbrev.get(domain, domain.replace('_', ' ').title())
                 st.markdown(f"**{domain_short}**")
+                next_lesson = next_lessons.get(domain)
+                if next_lesson:
+                    st.caption(f"Next up: {next_lesson.title}")
 
             with col2:
                 # Completed / Total
@@ -14,17 +14,14 @@ def render_hidden_lessons_page():
     st.title("🙈 Hidden Lessons")
 
     db = st.session_state.db
-    cursor = db.conn.cursor()
-
     # Get all hidden lessons
-    cursor.execute('''
-        SELECT lesson_id, title, domain, difficulty, order_index
-        FROM lessons
-        WHERE hidden = 1
-        ORDER BY domain, order_index
-    ''')
-
-    hidden_lessons = cursor.fetchall()
+    with db.reader() as conn:
+        hidden_lessons = conn.execute('''
+            SELECT lesson_id, title, domain, difficulty, order_index
+            FROM lessons
+            WHERE hidden = 1
+            ORDER BY domain, order_index
+        ''').fetchall()
 
     if not hidden_lessons:
         st.info("📭 No hidden lessons")
@@ -54,8 +51,7 @@ def render_hidden_lessons_page():
 
     with col2:
         if st.button("🔓 Unhide All", use_container_width=True):
-            cursor.execute("UPDATE lessons SET hidden = 0")
-            db.conn.commit()
+            db.unhide_all_lessons()
             st.success("All lessons unhidden!")
             st.rerun()
 
@@ -86,8 +82,7 @@ def render_hidden_lessons_page():
 
             with col_action:
                 if st.button("🔓 Unhide", key=f"unhide_{lesson_id}"):
-                    cursor.execute("UPDATE lessons SET hidden = 0 WHERE lesson_id = ?", (lesson_id,))
-                    db.conn.commit()
+                    db.set_lesson_hidden(lesson_id, False)
                     st.success(f"Unhidden!")
                     st.rerun()
 
@@ -12,10 +12,11 @@ import json
 import zipfile
 import io
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
 from uuid import uuid4
 from models.lesson import Lesson
+from utils.database import LESSON_INSERTED
 from pydantic import ValidationError
 
 def render_lesson_packages_page():
@@ -339,6 +340,10 @@ def import_package(uploaded_zip: Any, package_name: str, db, user, additional_ta
                 'duplicates': []
             }
 
+            # Valid lessons are imported together in one transaction after validation
+            pending = []
+            seen_ids = set()
+
             for json_filename in json_files:
                 st.markdown(f"#### 📄 {json_filename}")
 
@@ -367,43 +372,19 @@ def import_package(uploaded_zip: Any, package_name: str, db, user, additional_ta
                             st.caption(f"  - {detail}")
                         continue
 
-                    # Check duplicate
-                    existing = db.get_lesson(lesson.lesson_id)
-                    if existing:
+                    # Check duplicate within the package
+                    if str(lesson.lesson_id) in seen_ids:
                         results['duplicates'].append({
                             'file': json_filename,
                             'lesson_id': str(lesson.lesson_id),
                             'title': lesson.title
                         })
-                        st.warning(f"⚠️ Duplicate: {lesson.title}")
+                        st.warning(f"⚠️ Duplicate in package: {lesson.title}")
                         continue
 
-                    # Import lesson
-                    success = db.create_lesson(lesson)
-
-                    if success:
-                        # Tag with package and user content
-                        db.add_tag_to_lesson(str(lesson.lesson_id), package_tag.tag_id)
-                        db.add_tag_to_lesson(str(lesson.lesson_id), user_content_tag.tag_id)
-
-                        # Tag with additional tag if provided
-                        if additional_tag:
-                            db.add_tag_to_lesson(str(lesson.lesson_id), additional_tag.tag_id)
-
-                        results['success'].append({
-                            'file': json_filename,
-                            'lesson_id': str(lesson.lesson_id),
-                            'title': lesson.title,
-                            'domain': lesson.domain
-                        })
-
-                        st.success(f"✅ Imported: {lesson.title}")
-                    else:
-                        results['errors'].append({
-                            'file': json_filename,
-                            'error': 'Database insert failed'
-                        })
-                        st.error(f"❌ Database insert failed")
+                    seen_ids.add(str(lesson.lesson_id))
+                    pending.append((json_filename, lesson))
+                    st.info(f"🔍 Valid: {lesson.title}")
 
                 except Exception as e:
                     results['errors'].append({
@@ -412,6 +393,13 @@ def import_package(uploaded_zip: Any, package_name: str, db, user, additional_ta
                     })
                     st.error(f"❌ Error: {str(e)}")
 
+            if pending:
+                # Tag with package and user content (and the additional tag if provided)
+                tag_ids = [package_tag.tag_id, user_content_tag.tag_id]
+                if additional_tag:
+                    tag_ids.append(additional_tag.tag_id)
+                import_pending_lessons(pending, db, tag_ids, results)
+
             st.markdown("---")
 
             # Display summary
@@ -477,6 +465,42 @@ def export_package(lesson_ids: List[str], package_name: str, db):
         st.error(f"❌ Error creating package: {str(e)}")
 
 
+def import_pending_lessons(pending: List[Tuple[str, Lesson]], db, tag_ids: List[str], results: Dict[str, List]):
+    """Insert validated package lessons in one batch, skipping lesson_ids that already exist"""
+
+    try:
+        outcomes = db.upsert_lessons(
+            (lesson for _, lesson in pending),
+            tag_ids=tag_ids,
+            overwrite=False,
+        )
+    except Exception as e:
+        for json_filename, _ in pending:
+            results['errors'].append({
+                'file': json_filename,
+                'error': f'Database insert failed: {str(e)}'
+            })
+        st.error(f"❌ Database insert failed: {str(e)}")
+        return
+
+    for json_filename, lesson in pending:
+        if outcomes[str(lesson.lesson_id)] == LESSON_INSERTED:
+            results['success'].append({
+                'file': json_filename,
+                'lesson_id': str(lesson.lesson_id),
+                'title': lesson.title,
+                'domain': lesson.domain
+            })
+            st.success(f"✅ Imported: {lesson.title}")
+        else:
+            results['duplicates'].append({
+                'file': json_filename,
+                'lesson_id': str(lesson.lesson_id),
+                'title': lesson.title
+            })
+            st.warning(f"⚠️ Duplicate: {lesson.title}")
+
+
 def display_import_summary(results: Dict[str, List], package_name: str):
     """Display import summary"""
 
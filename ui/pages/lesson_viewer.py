@@ -6,11 +6,13 @@ import streamlit as st
 import json
 import time
 from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
 from models.user import UserProfile
-from models.lesson import Lesson, ContentType
+from models.lesson import LessonHeader, ContentType
 from models.progress import LessonProgress, LessonStatus
+from utils.activity import flush_user_activity, save_user_activity
 from utils.database import Database
 from core.gamification import GamificationEngine
 
@@ -87,8 +89,9 @@ def render(user: UserProfile, db: Database):
         # Store selected tags in session state for domain tabs
         if selected_tag_names:
             selected_tag_ids = []
+            tags_by_name = {tag.name: tag for tag in all_tags}
             for tag_name in selected_tag_names:
-                tag = db.get_tag_by_name(tag_name)
+                tag = tags_by_name.get(tag_name)
                 if tag:
                     selected_tag_ids.append(tag.tag_id)
             st.session_state['selected_tag_filter'] = {
@@ -99,7 +102,7 @@ def render(user: UserProfile, db: Database):
             # Show active filters
             filter_html = ""
             for tag_name in selected_tag_names:
-                tag = db.get_tag_by_name(tag_name)
+                tag = tags_by_name.get(tag_name)
                 if tag:
                     filter_html += f"""<span style="
                         display: inline-block;
@@ -141,15 +144,16 @@ def render(user: UserProfile, db: Database):
 
     for idx, (domain_key, domain_name) in enumerate(domains):
         with tabs[idx]:
-            render_domain_lessons(user, db, domain_key)
+            render_domain_lessons(user, db, domain_key, all_tags)
 
     _maybe_scroll_to_top()
 
 
-def render_domain_lessons(user: UserProfile, db: Database, domain: str):
-    """Show lessons for specific domain"""
+def render_domain_lessons(user: UserProfile, db: Database, domain: str, all_tags: Optional[List] = None):
+    """Show lessons for specific domain (all_tags: the user's filterable tags, if already loaded)"""
 
-    lessons = db.get_lessons_by_domain(domain)
+    # Cards carry only display fields; the full lesson is loaded on Start/Continue
+    lessons = db.get_lesson_cards(domain)
     user_progress = db.get_user_progress(user.user_id)
 
     # Apply tag filter if active
@@ -178,15 +182,14 @@ def render_domain_lessons(user: UserProfile, db: Database, domain: str):
 
     st.markdown("---")
 
-    for lesson_meta in lessons:
-        lesson = db.get_lesson(lesson_meta.lesson_id)
-        if not lesson:
-            continue
+    # Tags for every card in one query
+    tags_by_lesson = db.get_tags_for_lessons([str(l.lesson_id) for l in lessons])
 
-        progress = progress_map.get(lesson_meta.lesson_id)
+    for lesson in lessons:
+        progress = progress_map.get(lesson.lesson_id)
 
         # Get lesson tags (filter out system-generated Custom and Content tags)
-        lesson_tags = db.get_lesson_tags(str(lesson.lesson_id))
+        lesson_tags = tags_by_lesson[str(lesson.lesson_id)]
         lesson_tags = [tag for tag in lesson_tags if
                       tag.category in ('Career Path', 'Course', 'Package') or not tag.is_system]
 
@@ -238,6 +241,10 @@ def render_domain_lessons(user: UserProfile, db: Database, domain: str):
                 if lesson.is_core_concept:
                     st.caption("🔥 Core Concept (Essential)")
 
+                objectives_summary = lesson.get_objectives_summary()
+                if objectives_summary:
+                    st.caption(f"📋 {objectives_summary}")
+
                 # Show tag badges inline with manage button
                 manage_tags_key = f"manage_tags_{lesson.lesson_id}"
                 editor_key = f"show_tag_editor_{lesson.lesson_id}"
@@ -275,7 +282,8 @@ def render_domain_lessons(user: UserProfile, db: Database, domain: str):
                 if is_editing:
                     st.markdown('<div style="background-color: #f8f9fa; padding: 8px; border-radius: 5px; margin: 5px 0;">', unsafe_allow_html=True)
 
-                    all_tags = db.get_filterable_tags(str(user.user_id))
+                    if all_tags is None:
+                        all_tags = db.get_filterable_tags(str(user.user_id))
                     current_tag_ids = {tag.tag_id for tag in lesson_tags}
 
                     # Current tags - compact
@@ -313,7 +321,12 @@ def render_domain_lessons(user: UserProfile, db: Database, domain: str):
                     key=f"lesson_{lesson.lesson_id}",
                     use_container_width=True,
                 ):
-                    st.session_state.current_lesson = lesson
+                    lesson_header = db.get_lesson_header(lesson.lesson_id)
+                    if not lesson_header:
+                        st.error("Lesson could not be loaded.")
+                        st.stop()
+
+                    st.session_state.current_lesson = lesson_header
                     st.session_state.current_page = "lesson"
                     st.session_state.current_block_index = 0  # Start from beginning
                     st.session_state.scroll_to_top = True
@@ -579,16 +592,42 @@ def _add_floating_top_button():
     )
 
 
-def render_lesson(user: UserProfile, lesson: Lesson, db: Database):
+def _get_content_block(db: Database, lesson: LessonHeader, block_index: int):
+    """
+    Get the block being displayed, prefetching the one after it.
+
+    Only the current and next blocks are kept in session state, so Next is
+    served from memory and Prev costs one small indexed read.
+    """
+    cache = st.session_state.get("lesson_block_cache")
+    if not cache or cache.get("lesson_id") != str(lesson.lesson_id):
+        cache = {"lesson_id": str(lesson.lesson_id), "blocks": {}}
+
+    blocks = cache["blocks"]
+    wanted = [i for i in (block_index, block_index + 1) if i < lesson.block_count]
+    missing = [i for i in wanted if i not in blocks]
+    if missing:
+        # Current + next are adjacent, so this is a single range read
+        fetched = db.get_lesson_blocks(lesson.lesson_id, missing[0], missing[-1] - missing[0] + 1)
+        for offset, block in enumerate(fetched):
+            blocks[missing[0] + offset] = block
+
+    cache["blocks"] = {i: blocks[i] for i in wanted if i in blocks}
+    st.session_state.lesson_block_cache = cache
+    return cache["blocks"].get(block_index)
+
+
+def render_lesson(user: UserProfile, lesson: LessonHeader, db: Database):
     """Render interactive lesson content"""
 
     # Add floating "Back to Top" button
     _add_floating_top_button()
 
-    # Track last active lesson (for "Continue Learning" feature)
+    # Track last active lesson (for "Continue Learning" feature); the
+    # timestamp alone is only written every HEARTBEAT_INTERVAL
     user.last_active_lesson_id = lesson.lesson_id
     user.last_active_at = datetime.now()
-    db.update_user(user)
+    save_user_activity(db, user)
 
     # Initialize lesson state
     if "lesson_start_time" not in st.session_state:
@@ -621,7 +660,7 @@ def render_lesson(user: UserProfile, lesson: Lesson, db: Database):
             st.rerun()
 
     # Progress bar for lesson
-    total_blocks = len(lesson.content_blocks)
+    total_blocks = lesson.block_count
     current_idx = st.session_state.current_block_index
 
     # Calculate progress (clamp between 0 and 1)
@@ -636,8 +675,8 @@ def render_lesson(user: UserProfile, lesson: Lesson, db: Database):
     st.markdown("---")
 
     # Render current content block
-    if current_idx < total_blocks:
-        block = lesson.content_blocks[current_idx]
+    block = _get_content_block(db, lesson, current_idx) if current_idx < total_blocks else None
+    if block:
 
         # Check notes position preference (default: bottom)
         notes_position = st.session_state.get('notes_position', 'bottom')
@@ -678,7 +717,7 @@ def render_lesson(user: UserProfile, lesson: Lesson, db: Database):
 
         with col_back:
             if st.button("🔙 Back", use_container_width=True, key="back_content"):
-                cleanup_lesson_state()
+                cleanup_lesson_state(user, db)
                 st.session_state.current_page = "learning"
                 st.session_state.scroll_to_top = True
                 # Update URL to remove lesson
@@ -726,12 +765,10 @@ def render_lesson(user: UserProfile, lesson: Lesson, db: Database):
         with col_hide:
             if st.button("🙈 Hide", use_container_width=True, key="hide_content"):
                 # Hide the lesson
-                cursor = db.conn.cursor()
-                cursor.execute("UPDATE lessons SET hidden = 1 WHERE lesson_id = ?", (str(lesson.lesson_id),))
-                db.conn.commit()
+                db.set_lesson_hidden(str(lesson.lesson_id), True)
 
                 # Clean up and go back
-                cleanup_lesson_state()
+                cleanup_lesson_state(user, db)
                 st.session_state.current_page = "learning"
                 st.session_state.scroll_to_top = True
                 # Update URL to remove lesson
@@ -748,7 +785,7 @@ def render_lesson(user: UserProfile, lesson: Lesson, db: Database):
 
         with col_back_quiz:
             if st.button("🔙 Back to Lessons", use_container_width=True, key="back_quiz"):
-                cleanup_lesson_state()
+                cleanup_lesson_state(user, db)
                 st.session_state.current_page = "learning"
                 st.session_state.scroll_to_top = True
                 # Update URL to remove lesson
@@ -758,12 +795,10 @@ def render_lesson(user: UserProfile, lesson: Lesson, db: Database):
         with col_hide_quiz:
             if st.button("🙈 Hide Lesson", use_container_width=True, key="hide_quiz"):
                 # Hide the lesson
-                cursor = db.conn.cursor()
-                cursor.execute("UPDATE lessons SET hidden = 1 WHERE lesson_id = ?", (str(lesson.lesson_id),))
-                db.conn.commit()
+                db.set_lesson_hidden(str(lesson.lesson_id), True)
 
                 # Clean up and go back
-                cleanup_lesson_state()
+                cleanup_lesson_state(user, db)
                 st.session_state.current_page = "learning"
                 st.session_state.scroll_to_top = True
                 # Update URL to remove lesson
@@ -774,7 +809,7 @@ def render_lesson(user: UserProfile, lesson: Lesson, db: Database):
     _maybe_scroll_to_top()
 
 
-def render_content_block(block, lesson: Lesson, user: UserProfile, db: Database):
+def render_content_block(block, lesson: LessonHeader, user: UserProfile, db: Database):
     """Render individual content block based on type"""
 
     content_type = ContentType(block.type)
@@ -916,7 +951,7 @@ def render_simulation_block(block):
         st.markdown("---")
 
 
-def render_reflection_block(block, user: UserProfile, lesson: Lesson, db: Database):
+def render_reflection_block(block, user: UserProfile, lesson: LessonHeader, db: Database):
     """Render reflection prompt with text input"""
     st.markdown("### 💭 Reflection Time")
 
@@ -1025,7 +1060,7 @@ def render_real_world_block(block):
                 st.markdown(case)
 
 
-def render_quiz(lesson: Lesson, user: UserProfile, db: Database):
+def render_quiz(lesson: LessonHeader, user: UserProfile, db: Database):
     """Render final assessment quiz"""
 
     st.markdown("## 📝 Final Assessment")
@@ -1085,7 +1120,7 @@ def calculate_quiz_score(questions, user_answers) -> int:
 
 
 def complete_lesson(
-    user: UserProfile, lesson: Lesson, score: int, time_spent: int, db: Database
+    user: UserProfile, lesson: LessonHeader, score: int, time_spent: int, db: Database
 ):
     """Mark lesson as completed and award XP"""
 
@@ -1158,13 +1193,6 @@ def complete_lesson(
         user.total_lessons_completed += 1
         user.total_time_spent += time_spent
 
-        # Check for badges (only on first completion)
-        user_progress_list = db.get_user_progress(user.user_id)
-        new_badges = gamification.check_badge_unlocks(user, user_progress_list, progress)
-
-        for badge in new_badges:
-            user.add_badge(badge.badge_id)
-
         encouragement = gamification.generate_encouragement(
             "perfect_score" if score == 100 else "level_up" if level_info["level_up"] else "streak_maintained",
             user,
@@ -1177,13 +1205,25 @@ def complete_lesson(
             user,
         )
 
-    # Save to database
-    if progress_exists_in_db:
-        db.update_progress(progress)
-    else:
-        db.create_progress(progress)
+    # Save to database (progress, XP, skills and badges commit together)
+    with db.transaction():
+        if progress_exists_in_db:
+            db.update_progress(progress)
+        else:
+            db.create_progress(progress)
+
+        # Check for badges (only on first completion), after the progress
+        # write so the domain counters include this lesson
+        if is_first_completion:
+            user_progress_list = db.get_user_progress(user.user_id)
+            new_badges = gamification.check_badge_unlocks(
+                user, user_progress_list, progress,
+                domain_stats=db.get_lesson_stats_by_domain(user.user_id),
+            )
+            for badge in new_badges:
+                user.add_badge(badge.badge_id)
 
-    db.update_user(user)
+        db.update_user(user)
 
     badge_payload = [
         {"id": badge.badge_id, "name": badge.name, "description": badge.description}
@@ -1247,13 +1287,17 @@ def complete_lesson(
 
 
 
-def cleanup_lesson_state():
-    """Clean up lesson session state"""
+def cleanup_lesson_state(user: Optional[UserProfile] = None, db: Optional[Database] = None):
+    """Clean up lesson session state (and write pending activity if user/db given)"""
+    if user is not None and db is not None:
+        flush_user_activity(db, user)
+
     keys_to_remove = [
         "lesson_start_time",
         "current_block_index",
         "quiz_answers",
         "current_lesson",
+        "lesson_block_cache",
     ]
 
     for key in keys_to_remove:
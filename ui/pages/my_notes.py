@@ -24,19 +24,20 @@ def render_my_notes_page():
     user = st.session_state.current_user
 
     # Get all notes for user
-    cursor = db.conn.cursor()
-    cursor.execute("""
-        SELECT n.note_id, n.lesson_id, n.content_block_index, n.note_text,
-               n.attachments, n.is_pinned, n.created_at, n.updated_at,
-               l.title as lesson_title, l.domain
-        FROM lesson_notes n
-        JOIN lessons l ON n.lesson_id = l.lesson_id
-        WHERE n.user_id = ?
-        ORDER BY n.is_pinned DESC, n.created_at DESC
-    """, (str(user.user_id),))
-
-    columns = [desc[0] for desc in cursor.description]
-    rows = cursor.fetchall()
+    with db.reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT n.note_id, n.lesson_id, n.content_block_index, n.note_text,
+                   n.attachments, n.is_pinned, n.created_at, n.updated_at,
+                   l.title as lesson_title, l.domain
+            FROM lesson_notes n
+            JOIN lessons l ON n.lesson_id = l.lesson_id
+            WHERE n.user_id = ?
+            ORDER BY n.is_pinned DESC, n.created_at DESC
+        """, (str(user.user_id),))
+
+        columns = [desc[0] for desc in cursor.description]
+        rows = cursor.fetchall()
 
     all_notes = []
     for row in rows:
@@ -150,7 +151,7 @@ def render_note_card_full(note: Dict, db):
             # Go to lesson button
             if st.button("➡️", key=f"goto_{note['note_id']}", help="Go to lesson"):
                 # Load lesson and navigate
-                lesson = db.get_lesson(note['lesson_id'])
+                lesson = db.get_lesson_header(note['lesson_id'])
                 if lesson:
                     st.session_state.current_lesson = lesson
                     st.session_state.current_page = "lesson"
@@ -274,28 +275,25 @@ def export_notes(notes: List[Dict], user):
 
 def update_note(note_id: str, note_text: str, db):
     """Update note text"""
-    cursor = db.conn.cursor()
-    cursor.execute("""
-        UPDATE lesson_notes
-        SET note_text = ?, updated_at = ?
-        WHERE note_id = ?
-    """, (note_text, datetime.now().isoformat(), note_id))
-    db.conn.commit()
+    with db.transaction() as conn:
+        conn.execute("""
+            UPDATE lesson_notes
+            SET note_text = ?, updated_at = ?
+            WHERE note_id = ?
+        """, (note_text, datetime.now().isoformat(), note_id))
 
 
 def toggle_pin(note_id: str, is_pinned: bool, db):
     """Toggle pin status"""
-    cursor = db.conn.cursor()
-    cursor.execute("""
-        UPDATE lesson_notes
-        SET is_pinned = ?, updated_at = ?
-        WHERE note_id = ?
-    """, (1 if is_pinned else 0, datetime.now().isoformat(), note_id))
-    db.conn.commit()
+    with db.transaction() as conn:
+        conn.execute("""
+            UPDATE lesson_notes
+            SET is_pinned = ?, updated_at = ?
+            WHERE note_id = ?
+        """, (1 if is_pinned else 0, datetime.now().isoformat(), note_id))
 
 
 def delete_note(note_id: str, db):
     """Delete a note"""
-    cursor = db.conn.cursor()
-    cursor.execute("DELETE FROM lesson_notes WHERE note_id = ?", (note_id,))
-    db.conn.commit()
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM lesson_notes WHERE note_id = ?", (note_id,))
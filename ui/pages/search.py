@@ -84,86 +84,40 @@ def render_search_page():
 
     # Perform search
     if search_query or selected_domain != "All Domains" or selected_tag != "All Tags":
-        # Build search query
-        cursor = db.conn.cursor()
-
-        # Base query (note: no concepts column in lessons table)
-        query = '''
-            SELECT DISTINCT l.lesson_id, l.title, l.domain, l.difficulty,
-                   l.order_index, l.learning_objectives
-            FROM lessons l
-            WHERE 1=1
-        '''
-        params = []
-
-        # Exclude hidden lessons by default
-        if not include_hidden:
-            # Check if hidden column exists
-            cursor.execute("PRAGMA table_info(lessons)")
-            columns = [row[1] for row in cursor.fetchall()]
-            if 'hidden' in columns:
-                query += ' AND (l.hidden = 0 OR l.hidden IS NULL)'
-
-        # Search term filter
-        if search_query:
-            query += '''
-                AND (
-                    l.title LIKE ?
-                    OR l.learning_objectives LIKE ?
-                )
-            '''
-            search_param = f"%{search_query}%"
-            params.extend([search_param, search_param])
-
-        # Domain filter
-        if selected_domain != "All Domains":
-            query += ' AND l.domain = ?'
-            params.append(selected_domain)
-
-        # Difficulty filter
-        if selected_difficulty != "All Difficulties":
-            diff_num = int(selected_difficulty.split('(')[1][0])
-            query += ' AND l.difficulty = ?'
-            params.append(diff_num)
-
-        # Tag filter
-        if selected_tag != "All Tags":
-            query += '''
-                AND EXISTS (
-                    SELECT 1 FROM lesson_tags lt
-                    JOIN tags t ON lt.tag_id = t.tag_id
-                    WHERE lt.lesson_id = l.lesson_id
-                    AND t.name = ?
-                )
-            '''
-            params.append(selected_tag)
-
-        # Sorting
-        if selected_sort == "Relevance":
-            # Prioritize title matches
-            query += '''
-                ORDER BY
-                    CASE WHEN l.title LIKE ? THEN 1 ELSE 2 END,
-                    l.order_index
-            '''
-            params.append(f"%{search_query}%") if search_query else params.append("%")
-        elif selected_sort == "Title (A-Z)":
-            query += ' ORDER BY l.title'
-        elif selected_sort == "Difficulty":
-            query += ' ORDER BY l.difficulty, l.order_index'
-        elif selected_sort == "Domain":
-            query += ' ORDER BY l.domain, l.order_index'
-
-        # Execute search
-        cursor.execute(query, params)
-        results = cursor.fetchall()
+        sort_keys = {
+            "Relevance": "relevance",
+            "Title (A-Z)": "title",
+            "Difficulty": "difficulty",
+            "Domain": "domain",
+        }
+
+        # Full-text search (BM25 ranked, prefix matching) with filters
+        results = db.search_lessons(
+            search_query,
+            domain=selected_domain if selected_domain != "All Domains" else None,
+            difficulty=(
+                int(selected_difficulty.split('(')[1][0])
+                if selected_difficulty != "All Difficulties"
+                else None
+            ),
+            tag_name=selected_tag if selected_tag != "All Tags" else None,
+            include_hidden=include_hidden,
+            sort=sort_keys[selected_sort],
+        )
 
         # Display results
         if results:
             st.success(f"Found {len(results)} lesson(s)")
 
+            # Tags for all results in one query
+            tags_by_lesson = db.get_tags_for_lessons([row['lesson_id'] for row in results])
+
             for row in results:
-                lesson_id, title, domain, difficulty, order_index, learning_objectives = row
+                lesson_id = row['lesson_id']
+                title = row['title']
+                domain = row['domain']
+                difficulty = row['difficulty']
+                learning_objectives = row['learning_objectives']
 
                 # Create lesson card
                 with st.container():
@@ -195,6 +149,10 @@ def render_search_page():
                             f"{difficulty_colors[difficulty]} {difficulty_names[difficulty]}"
                         )
 
+                        # Matching passage from the lesson text
+                        if row['snippet']:
+                            st.markdown(f"> {row['snippet']}")
+
                         # Show snippet of learning objectives
                         if learning_objectives:
                             import json
@@ -206,7 +164,7 @@ def render_search_page():
                                 pass
 
                         # Get and display tags
-                        lesson_tags = db.get_lesson_tags(lesson_id)
+                        lesson_tags = tags_by_lesson.get(lesson_id, [])
                         if lesson_tags:
                             tag_pills = " ".join([f"{tag.icon}" for tag in lesson_tags[:5]])
                             st.caption(f"**Tags**: {tag_pills}")
@@ -214,8 +172,8 @@ def render_search_page():
                     with col_right:
                         # View lesson button
                         if st.button("View Lesson", key=f"view_{lesson_id}"):
-                            # Load full lesson
-                            lesson = db.get_lesson(lesson_id)
+                            # Load lesson header (blocks are fetched by the viewer)
+                            lesson = db.get_lesson_header(lesson_id)
                             if lesson:
                                 st.session_state.current_lesson = lesson
                                 st.session_state.current_page = "lesson"
@@ -8,9 +8,10 @@ Validates lessons against Pydantic model and auto-tags with "User Content".
 import streamlit as st
 import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
 from models.lesson import Lesson
+from utils.database import LESSON_INSERTED
 from pydantic import ValidationError
 
 def render_upload_lessons_page():
@@ -127,6 +128,10 @@ def upload_lessons(uploaded_files: List[Any], db, user):
         st.error("❌ 'Package: User Content' tag not found in database. Please run add_all_tags.py")
         return
 
+    # Valid lessons are stored together in one transaction after validation
+    pending = []
+    seen_ids = set()
+
     for file in uploaded_files:
         st.markdown(f"#### 📄 {file.name}")
 
@@ -172,40 +177,19 @@ def upload_lessons(uploaded_files: List[Any], db, user):
                     st.markdown(detail)
                 continue
 
-            # Check for duplicate
-            existing = db.get_lesson(lesson.lesson_id)
-            if existing:
+            # Check for duplicate within this upload
+            if str(lesson.lesson_id) in seen_ids:
                 results['duplicates'].append({
                     'file': file.name,
                     'lesson_id': str(lesson.lesson_id),
                     'title': lesson.title
                 })
-                st.warning(f"⚠️ Duplicate: Lesson already exists (ID: {lesson.lesson_id})")
+                st.warning(f"⚠️ Duplicate: Lesson ID appears twice in this upload (ID: {lesson.lesson_id})")
                 continue
 
-            # Add to database
-            success = db.create_lesson(lesson)
-
-            if success:
-                # Tag with User Content
-                db.add_tag_to_lesson(str(lesson.lesson_id), user_content_tag.tag_id)
-
-                results['success'].append({
-                    'file': file.name,
-                    'lesson_id': str(lesson.lesson_id),
-                    'title': lesson.title,
-                    'domain': lesson.domain
-                })
-
-                st.success(f"✅ Uploaded successfully")
-                st.caption(f"📚 {lesson.title}")
-                st.caption(f"🏷️ Domain: {lesson.domain} | Difficulty: {lesson.difficulty}")
-            else:
-                results['errors'].append({
-                    'file': file.name,
-                    'error': 'Database insert failed'
-                })
-                st.error("❌ Database insert failed")
+            seen_ids.add(str(lesson.lesson_id))
+            pending.append((file.name, lesson))
+            st.info("🔍 Valid - queued for upload")
 
         except Exception as e:
             results['errors'].append({
@@ -216,10 +200,54 @@ def upload_lessons(uploaded_files: List[Any], db, user):
 
         st.markdown("---")
 
+    if pending:
+        store_uploaded_lessons(pending, db, user_content_tag, results)
+
     # Summary
     display_upload_summary(results)
 
 
+def store_uploaded_lessons(pending: List[Tuple[str, Lesson]], db, user_content_tag, results: Dict[str, List]):
+    """Insert validated lessons in one batch, skipping lesson_ids that already exist"""
+
+    st.markdown("### 💾 Upload Results")
+
+    try:
+        outcomes = db.upsert_lessons(
+            (lesson for _, lesson in pending),
+            tag_ids=[user_content_tag.tag_id],
+            overwrite=False,
+        )
+    except Exception as e:
+        for filename, _ in pending:
+            results['errors'].append({
+                'file': filename,
+                'error': f'Database insert failed: {str(e)}'
+            })
+        st.error(f"❌ Database insert failed: {str(e)}")
+        return
+
+    for filename, lesson in pending:
+        if outcomes[str(lesson.lesson_id)] == LESSON_INSERTED:
+            results['success'].append({
+                'file': filename,
+                'lesson_id': str(lesson.lesson_id),
+                'title': lesson.title,
+                'domain': lesson.domain
+            })
+
+            st.success(f"✅ {filename}: Uploaded successfully")
+            st.caption(f"📚 {lesson.title}")
+            st.caption(f"🏷️ Domain: {lesson.domain} | Difficulty: {lesson.difficulty}")
+        else:
+            results['duplicates'].append({
+                'file': filename,
+                'lesson_id': str(lesson.lesson_id),
+                'title': lesson.title
+            })
+            st.warning(f"⚠️ {filename}: Duplicate - lesson already exists (ID: {lesson.lesson_id})")
+
+
 def display_upload_summary(results: Dict[str, List]):
     """Display summary of upload results"""
 
@@ -56,8 +56,8 @@ if [ -f "cyberlearn.db" ]; then
 
                 if [[ $REPLY =~ ^[Yy]$ ]]; then
                     echo ""
-                    echo "Checking for outdated lessons..."
-                    python scripts/update_outdated_lessons.py
+                    echo "Syncing changed lesson files..."
+                    python scripts/sync_content.py
 
                     echo ""
                     echo "============================================================"
@@ -70,7 +70,7 @@ if [ -f "cyberlearn.db" ]; then
                     echo "Skipping lesson updates"
                     echo ""
                     echo "To update lessons later, run:"
-                    echo "  python scripts/update_outdated_lessons.py"
+                    echo "  python scripts/sync_content.py"
                     echo ""
                     echo "To recreate database from scratch, run:"
                     echo "  rm cyberlearn.db"
@@ -0,0 +1,62 @@
+"""
+Debounced user activity writes for CyberLearn.
+
+The lesson viewer and dashboard stamp last_active_at / last_login on every
+Streamlit rerun (each block navigation or button press). Writing those
+timestamps each time made every interaction a users UPDATE and a commit.
+
+save_user_activity() writes real changes (streaks, XP, a different lesson)
+right away, but when only the activity timestamps moved it waits until the
+stored value is HEARTBEAT_INTERVAL old. flush_user_activity() writes
+whatever is pending, e.g. when the learner leaves a lesson.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from models.user import UserProfile
+from utils.database import Database
+
+
+# Columns that change on every page view
+HEARTBEAT_COLUMNS = frozenset({"last_login", "last_active_at"})
+
+HEARTBEAT_INTERVAL = timedelta(seconds=60)
+
+
+def _stored_time(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def save_user_activity(
+    db: Database, user: UserProfile, interval: timedelta = HEARTBEAT_INTERVAL
+) -> bool:
+    """
+    Write the user's pending changes, debouncing timestamp-only updates.
+
+    Returns True if anything was written.
+    """
+    changes = db.get_user_changes(user)
+    if not changes:
+        return False
+
+    if changes.keys() <= HEARTBEAT_COLUMNS:
+        now = datetime.now()
+        recent = all(
+            stored is not None and now - stored < interval
+            for stored in (_stored_time(old) for old, _ in changes.values())
+        )
+        if recent:
+            return False
+
+    return db.update_user(user)
+
+
+def flush_user_activity(db: Database, user: UserProfile) -> bool:
+    """Write any pending activity now (e.g. on lesson exit)"""
+    if not db.get_user_changes(user):
+        return False
+    return db.update_user(user)
@@ -10,34 +10,30 @@ from typing import Optional
 from datetime import datetime, timedelta
 from uuid import UUID
 
+from utils.maintenance import cleanup_expired_sessions
+from utils.session_cache import flush_touches, get_token_cache
+
 
 class AuthManager:
     """Manages user authentication and browser sessions using cookies"""
 
     COOKIE_NAME = "cyberlearn_session"
     COOKIE_EXPIRY_DAYS = 30
+    # Write last_accessed at most this often per session
+    TOUCH_INTERVAL_SECONDS = 300
+
+    def __init__(self, db, touch_interval_seconds: Optional[int] = None):
+        """Initialize auth manager with database connection
 
-    def __init__(self, db):
-        """Initialize auth manager with database connection"""
+        The user_sessions table is created by the schema migrations that
+        Database runs on open. Validated tokens are cached process-wide
+        (utils/session_cache.py).
+        """
         self.db = db
-        self._ensure_session_table()
-
-    def _ensure_session_table(self):
-        """Create sessions table if it doesn't exist"""
-        cursor = self.db.conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_sessions (
-                session_token TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                expires_at TEXT NOT NULL,
-                last_accessed TEXT NOT NULL,
-                user_agent TEXT,
-                ip_address TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        """)
-        self.db.conn.commit()
+        if touch_interval_seconds is None:
+            touch_interval_seconds = self.TOUCH_INTERVAL_SECONDS
+        self.touch_interval = timedelta(seconds=touch_interval_seconds)
+        self._token_cache = get_token_cache(db.db_path)
 
     def _generate_session_token(self) -> str:
         """Generate a secure random session token"""
@@ -58,21 +54,20 @@ class AuthManager:
         now = datetime.utcnow()
         expires_at = now + timedelta(days=self.COOKIE_EXPIRY_DAYS)
 
-        cursor = self.db.conn.cursor()
-        cursor.execute("""
-            INSERT INTO user_sessions
-            (session_token, user_id, created_at, expires_at, last_accessed, user_agent, ip_address)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            hashed_token,
-            str(user_id),
-            now.isoformat(),
-            expires_at.isoformat(),
-            now.isoformat(),
-            user_agent,
-            ip_address
-        ))
-        self.db.conn.commit()
+        with self.db.transaction() as conn:
+            conn.execute("""
+                INSERT INTO user_sessions
+                (session_token, user_id, created_at, expires_at, last_accessed, user_agent, ip_address)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                hashed_token,
+                str(user_id),
+                now.isoformat(),
+                expires_at.isoformat(),
+                now.isoformat(),
+                user_agent,
+                ip_address
+            ))
 
         return token  # Return unhashed token for cookie
 
@@ -85,73 +80,79 @@ class AuthManager:
             return None
 
         hashed_token = self._hash_token(token)
+        now = datetime.utcnow()
 
-        cursor = self.db.conn.cursor()
-        cursor.execute("""
-            SELECT user_id, expires_at
-            FROM user_sessions
-            WHERE session_token = ?
-        """, (hashed_token,))
+        cached = self._token_cache.get(hashed_token, now)
+        if cached:
+            user_id, expires_dt = cached
+        else:
+            generation = self._token_cache.generation
+            with self.db.reader() as conn:
+                row = conn.execute("""
+                    SELECT user_id, expires_at
+                    FROM user_sessions
+                    WHERE session_token = ?
+                """, (hashed_token,)).fetchone()
 
-        row = cursor.fetchone()
-        if not row:
-            return None
+            if not row:
+                return None
 
-        user_id, expires_at = row
-        expires_dt = datetime.fromisoformat(expires_at)
+            user_id, expires_at = row
+            expires_dt = datetime.fromisoformat(expires_at)
 
         # Check if session expired
-        if datetime.utcnow() > expires_dt:
+        if now > expires_dt:
             self.revoke_session(token)
             return None
 
-        # Update last accessed time
-        cursor.execute("""
-            UPDATE user_sessions
-            SET last_accessed = ?
-            WHERE session_token = ?
-        """, (datetime.utcnow().isoformat(), hashed_token))
-        self.db.conn.commit()
+        if not cached:
+            self._token_cache.put(hashed_token, user_id, expires_dt, now, generation)
+
+        # Update last accessed time (throttled, written in batches)
+        if self._token_cache.touch(hashed_token, now, self.touch_interval):
+            self.flush_session_touches()
 
         return UUID(user_id)
 
+    def flush_session_touches(self) -> int:
+        """Write pending last_accessed updates. Returns the number written."""
+        return flush_touches(self.db)
+
     def revoke_session(self, token: str):
         """Revoke/delete a session"""
         if not token:
             return
 
         hashed_token = self._hash_token(token)
-        cursor = self.db.conn.cursor()
-        cursor.execute("""
-            DELETE FROM user_sessions
-            WHERE session_token = ?
-        """, (hashed_token,))
-        self.db.conn.commit()
+        with self.db.transaction() as conn:
+            conn.execute("""
+                DELETE FROM user_sessions
+                WHERE session_token = ?
+            """, (hashed_token,))
+        self._token_cache.invalidate(hashed_token)
 
     def revoke_all_user_sessions(self, user_id: UUID):
         """Revoke all sessions for a user (e.g., on password change)"""
-        cursor = self.db.conn.cursor()
-        cursor.execute("""
-            DELETE FROM user_sessions
-            WHERE user_id = ?
-        """, (str(user_id),))
-        self.db.conn.commit()
-
-    def cleanup_expired_sessions(self):
-        """Remove expired sessions from database"""
-        cursor = self.db.conn.cursor()
-        cursor.execute("""
-            DELETE FROM user_sessions
-            WHERE expires_at < ?
-        """, (datetime.utcnow().isoformat(),))
-        self.db.conn.commit()
+        with self.db.transaction() as conn:
+            conn.execute("""
+                DELETE FROM user_sessions
+                WHERE user_id = ?
+            """, (str(user_id),))
+        self._token_cache.invalidate_user(str(user_id))
+
+    def cleanup_expired_sessions(self) -> int:
+        """Remove expired sessions from database. Returns the number removed.
+
+        Runs on a schedule in utils/maintenance.py; there is no need to call
+        this per request.
+        """
+        return cleanup_expired_sessions(self.db)
 
     def get_active_sessions_count(self, user_id: UUID) -> int:
         """Get number of active sessions for a user"""
-        cursor = self.db.conn.cursor()
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM user_sessions
-            WHERE user_id = ? AND expires_at > ?
-        """, (str(user_id), datetime.utcnow().isoformat()))
-        return cursor.fetchone()[0]
+        with self.db.reader() as conn:
+            return conn.execute("""
+                SELECT COUNT(*)
+                FROM user_sessions
+                WHERE user_id = ? AND expires_at > ?
+            """, (str(user_id), datetime.utcnow().isoformat())).fetchone()[0]
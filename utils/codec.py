@@ -0,0 +1,262 @@
+"""
+Model <-> database column codec for CyberLearn.
+
+Lessons, progress and users are stored as one row each, with list and
+nested-model fields as JSON text. Encoding used to go through
+json.dumps([json.loads(block.model_dump_json()) ...]): every block and
+question was serialized, parsed back and serialized again. Here each JSON
+column is produced by a single pydantic-core dump_json() call.
+
+The *_from_row functions decode the JSON columns and validate the result,
+so rows written by scripts or older versions are checked too.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional
+from uuid import UUID
+
+from pydantic import TypeAdapter
+
+from models.lesson import Lesson, LessonHeader, ContentBlock, Question
+from models.progress import LessonProgress, RetentionCheck
+from models.user import UserProfile, SkillLevels, LearningPreferences
+
+
+# Lesson columns written from a Lesson model (hidden is user state, not content)
+LESSON_COLUMNS = (
+    "lesson_id", "domain", "title", "subtitle", "difficulty", "estimated_time",
+    "order_index", "prerequisites", "learning_objectives", "content_blocks",
+    "pre_assessment", "post_assessment", "mastery_threshold",
+    "jim_kwik_principles", "base_xp_reward", "badge_unlock", "is_core_concept",
+    "created_at", "updated_at", "author", "version",
+)
+
+# Columns a content update rewrites (identity and creation time are kept)
+LESSON_UPDATE_COLUMNS = tuple(
+    column for column in LESSON_COLUMNS if column not in ("lesson_id", "created_at")
+)
+
+LESSON_UPDATE_SQL = (
+    f"UPDATE lessons SET {', '.join(f'{column} = ?' for column in LESSON_UPDATE_COLUMNS)} "
+    "WHERE lesson_id = ?"
+)
+
+_content_blocks_adapter = TypeAdapter(List[ContentBlock])
+_questions_adapter = TypeAdapter(List[Question])
+_retention_checks_adapter = TypeAdapter(List[RetentionCheck])
+
+
+def _dump_json(adapter: TypeAdapter, value) -> str:
+    return adapter.dump_json(value).decode("utf-8")
+
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _load_list(raw) -> list:
+    """Decode a JSON list column (NULL and '' mean empty)"""
+    return json.loads(raw) if raw else []
+
+
+# LESSONS
+
+def lesson_to_row(lesson: Lesson) -> tuple:
+    """Values for LESSON_COLUMNS, with list fields serialized to JSON"""
+    return (
+        str(lesson.lesson_id),
+        lesson.domain,
+        lesson.title,
+        lesson.subtitle,
+        lesson.difficulty,
+        lesson.estimated_time,
+        lesson.order_index,
+        json.dumps([str(p) for p in lesson.prerequisites]),
+        json.dumps(lesson.learning_objectives),
+        _dump_json(_content_blocks_adapter, lesson.content_blocks),
+        _dump_json(_questions_adapter, lesson.pre_assessment) if lesson.pre_assessment else None,
+        _dump_json(_questions_adapter, lesson.post_assessment),
+        lesson.mastery_threshold,
+        json.dumps(lesson.jim_kwik_principles),
+        lesson.base_xp_reward,
+        lesson.badge_unlock,
+        int(lesson.is_core_concept),
+        lesson.created_at.isoformat(),
+        lesson.updated_at.isoformat(),
+        lesson.author,
+        lesson.version,
+    )
+
+
+def lesson_update_params(lesson: Lesson) -> list:
+    """Parameters for LESSON_UPDATE_SQL"""
+    values = dict(zip(LESSON_COLUMNS, lesson_to_row(lesson)))
+    return [values[column] for column in LESSON_UPDATE_COLUMNS] + [values["lesson_id"]]
+
+
+def _lesson_row_dict(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Row as a dict of model fields, with JSON columns decoded"""
+    data = dict(row)
+    for column in ("hidden", "content_hash"):
+        data.pop(column, None)
+    for column in ("prerequisites", "learning_objectives", "content_blocks",
+                   "post_assessment", "jim_kwik_principles"):
+        if column in data:
+            data[column] = json.loads(data[column])
+    if data.get("pre_assessment"):
+        data["pre_assessment"] = json.loads(data["pre_assessment"])
+    return data
+
+
+def lesson_from_row(row: Mapping[str, Any]) -> Lesson:
+    """Build a Lesson from a full lessons row"""
+    return Lesson(**_lesson_row_dict(row))
+
+
+def lesson_header_from_row(row: Mapping[str, Any], block_count: int) -> LessonHeader:
+    """Build a LessonHeader from a lessons row without content_blocks"""
+    data = _lesson_row_dict(row)
+    data["block_count"] = block_count
+    return LessonHeader(**data)
+
+
+# PROGRESS
+
+def progress_to_row(progress: LessonProgress) -> Dict[str, Any]:
+    """progress column -> value"""
+    return {
+        "progress_id": str(progress.progress_id),
+        "user_id": str(progress.user_id),
+        "lesson_id": str(progress.lesson_id),
+        "status": getattr(progress.status, "value", progress.status),
+        "started_at": _isoformat(progress.started_at),
+        "completed_at": _isoformat(progress.completed_at),
+        "attempts": progress.attempts,
+        "quiz_scores": json.dumps(progress.quiz_scores),
+        "best_score": progress.best_score,
+        "time_spent": progress.time_spent,
+        "retention_checks": _dump_json(_retention_checks_adapter, progress.retention_checks),
+        "next_review_date": _isoformat(progress.next_review_date),
+        "mastery_level": progress.mastery_level,
+        "interactive_blocks_completed": json.dumps(
+            [str(b) for b in progress.interactive_blocks_completed]
+        ),
+        "reflection_submitted": int(progress.reflection_submitted),
+        "notes": progress.notes,
+    }
+
+
+def progress_from_row(row: Mapping[str, Any]) -> LessonProgress:
+    """Build a LessonProgress from a progress row"""
+    data = dict(row)
+
+    data["progress_id"] = UUID(data["progress_id"])
+    data["user_id"] = UUID(data["user_id"])
+    data["lesson_id"] = UUID(data["lesson_id"])
+
+    data["started_at"] = _parse_datetime(data.get("started_at"))
+    data["completed_at"] = _parse_datetime(data.get("completed_at"))
+    data["next_review_date"] = _parse_datetime(data.get("next_review_date"))
+
+    data["quiz_scores"] = _load_list(data.get("quiz_scores"))
+    data["retention_checks"] = _load_list(data.get("retention_checks"))
+    data["interactive_blocks_completed"] = [
+        UUID(val) for val in _load_list(data.get("interactive_blocks_completed")) if val
+    ]
+
+    data["reflection_submitted"] = bool(data.get("reflection_submitted"))
+
+    return LessonProgress.model_validate(data)
+
+
+# USERS
+
+def user_to_row(user: UserProfile) -> Dict[str, Any]:
+    """users column -> value (includes columns added by migrations)"""
+    return {
+        "user_id": str(user.user_id),
+        "username": user.username,
+        "email": user.email,
+        "created_at": user.created_at.isoformat(),
+        "last_login": user.last_login.isoformat(),
+        "skill_levels": user.skill_levels.model_dump_json(),
+        "total_xp": user.total_xp,
+        "level": user.level,
+        "streak_days": user.streak_days,
+        "longest_streak": user.longest_streak,
+        "badges": json.dumps(user.badges),
+        "learning_preferences": user.learning_preferences.model_dump_json(),
+        "total_lessons_completed": user.total_lessons_completed,
+        "total_time_spent": user.total_time_spent,
+        "diagnostic_completed": int(user.diagnostic_completed),
+        "last_username": user.last_username,
+        "preferred_tag_filters": json.dumps(user.preferred_tag_filters),
+        "last_active_lesson_id": str(user.last_active_lesson_id) if user.last_active_lesson_id else None,
+        "last_active_at": _isoformat(user.last_active_at),
+    }
+
+
+def user_from_row(row: Mapping[str, Any]) -> UserProfile:
+    """Build a UserProfile from a users row"""
+    # Handle optional fields (may not exist before migration)
+    try:
+        last_username = row["last_username"]
+    except (IndexError, KeyError):
+        last_username = None
+
+    try:
+        preferred_tag_filters = json.loads(row["preferred_tag_filters"])
+    except (IndexError, KeyError):
+        preferred_tag_filters = []
+
+    try:
+        last_active_lesson_id = UUID(row["last_active_lesson_id"]) if row["last_active_lesson_id"] else None
+    except (IndexError, KeyError, ValueError):
+        last_active_lesson_id = None
+
+    try:
+        last_active_at = datetime.fromisoformat(row["last_active_at"]) if row["last_active_at"] else None
+    except (IndexError, KeyError, ValueError):
+        last_active_at = None
+
+    return UserProfile(
+        user_id=UUID(row["user_id"]),
+        username=row["username"],
+        email=row["email"],
+        created_at=datetime.fromisoformat(row["created_at"]),
+        last_login=datetime.fromisoformat(row["last_login"]),
+        skill_levels=SkillLevels.model_validate_json(row["skill_levels"]),
+        total_xp=row["total_xp"],
+        level=row["level"],
+        streak_days=row["streak_days"],
+        longest_streak=row["longest_streak"],
+        badges=json.loads(row["badges"]),
+        learning_preferences=LearningPreferences.model_validate_json(row["learning_preferences"]),
+        total_lessons_completed=row["total_lessons_completed"],
+        total_time_spent=row["total_time_spent"],
+        diagnostic_completed=bool(row["diagnostic_completed"]),
+        last_username=last_username,
+        preferred_tag_filters=preferred_tag_filters,
+        last_active_lesson_id=last_active_lesson_id,
+        last_active_at=last_active_at,
+    )
+
+
+__all__ = [
+    "LESSON_COLUMNS",
+    "LESSON_UPDATE_COLUMNS",
+    "LESSON_UPDATE_SQL",
+    "lesson_to_row",
+    "lesson_update_params",
+    "progress_to_row",
+    "user_to_row",
+    "lesson_from_row",
+    "lesson_header_from_row",
+    "progress_from_row",
+    "user_from_row",
+]
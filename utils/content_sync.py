@@ -0,0 +1,230 @@
+"""
+Incremental content sync for CyberLearn.
+
+The content_manifest table records, for every content/lesson_*.json file,
+its size, mtime, SHA-256 hash and the lesson_id it produced. A sync run:
+
+1. stats every file and skips those whose size and mtime match the manifest
+2. hashes the rest and skips those whose hash matches (e.g. a fresh checkout
+   or a template database copied to another machine only changes mtimes)
+3. parses and validates only files whose content actually changed
+4. upserts those lessons (Database.upsert_lessons), removes lessons whose
+   file was deleted and updates the manifest, all in one transaction
+
+Lessons that never came from a content file (uploads, package imports) are
+not in the manifest and are never removed by a sync.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from models.lesson import Lesson
+from utils.database import (
+    Database,
+    LESSON_INSERTED,
+    LESSON_UNCHANGED,
+    LESSON_UPDATED,
+    _chunked,
+)
+from utils.lesson_catalog import bump_catalog_version
+from utils.lesson_blocks import refresh_lesson_blocks
+from utils.lesson_search import refresh_search_index
+from utils.prerequisite_graph import refresh_prerequisite_graph
+from utils.parallel import parallel_map
+
+
+CONTENT_DIR = Path("content")
+LESSON_GLOB = "lesson_*.json"
+
+class SyncResult:
+    """What a sync run changed (or would change, for a dry run)"""
+
+    def __init__(self):
+        self.scanned = 0
+        self.unchanged = 0
+        self.new: List[str] = []
+        self.updated: List[str] = []
+        self.removed: List[str] = []
+        self.errors: List[Tuple[str, str]] = []
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.new or self.updated or self.removed)
+
+
+def _hash_file(path: Path) -> str:
+    """SHA-256 of a file's bytes"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def scan_content_dir(content_dir: Path = CONTENT_DIR) -> Dict[str, Tuple[int, float]]:
+    """Map lesson file name to (size, mtime) without reading the files"""
+    files = {}
+    with os.scandir(content_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and Path(entry.name).match(LESSON_GLOB):
+                stat = entry.stat()
+                files[entry.name] = (stat.st_size, stat.st_mtime)
+    return files
+
+
+def lesson_from_data(data: Dict) -> Lesson:
+    """Validate a lesson file's parsed JSON"""
+    data = dict(data)
+    # Prerequisites are stored as strings (as per model definition)
+    data["prerequisites"] = [str(p) for p in data.get("prerequisites", [])]
+    return Lesson(**data)
+
+
+def load_lesson_file(path: Path) -> Lesson:
+    """Parse and validate a lesson JSON file"""
+    with open(path, "r", encoding="utf-8") as f:
+        return lesson_from_data(json.load(f))
+
+
+def parse_lesson_file(path: Path) -> Tuple[Optional[Lesson], Optional[str]]:
+    """Process-pool worker: (lesson, None) on success, (None, error) on failure"""
+    try:
+        return load_lesson_file(path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def sync_content(
+    db: Database,
+    content_dir: Path = CONTENT_DIR,
+    dry_run: bool = False,
+    remove_orphans: bool = True,
+    jobs: Optional[int] = 1,
+) -> SyncResult:
+    """
+    Bring the lessons table in line with the content directory.
+
+    Only files whose size/mtime changed are hashed, and only files whose hash
+    changed are parsed, across `jobs` worker processes (None = one per CPU).
+    Files that fail to parse are reported in result.errors and retried on the
+    next run.
+    """
+    content_dir = Path(content_dir)
+    result = SyncResult()
+    now = datetime.utcnow().isoformat()
+
+    with db.reader() as conn:
+        manifest = {
+            row["path"]: row
+            for row in conn.execute(
+                "SELECT path, size, mtime, content_hash, lesson_id FROM content_manifest"
+            )
+        }
+        existing_ids = {row[0] for row in conn.execute("SELECT lesson_id FROM lessons")}
+
+    files = scan_content_dir(content_dir)
+    result.scanned = len(files)
+
+    touched: List[Tuple] = []  # same content, new mtime
+    to_parse: List[Tuple[str, int, float, str]] = []
+    for name in sorted(files):
+        size, mtime = files[name]
+        entry = manifest.get(name)
+        if entry and entry["size"] == size and entry["mtime"] == mtime:
+            result.unchanged += 1
+            continue
+
+        try:
+            content_hash = _hash_file(content_dir / name)
+        except OSError as e:
+            result.errors.append((name, str(e)))
+            continue
+        if entry and entry["content_hash"] == content_hash:
+            touched.append((size, mtime, name))
+            result.unchanged += 1
+            continue
+        to_parse.append((name, size, mtime, content_hash))
+
+    parsed = parallel_map(
+        parse_lesson_file, [content_dir / name for name, _, _, _ in to_parse], jobs
+    )
+
+    changed: List[Tuple[Lesson, Tuple]] = []
+    replaced_ids = set()  # lesson ids a changed/deleted file used to provide
+    for (name, size, mtime, content_hash), (lesson, error) in zip(to_parse, parsed):
+        if error:
+            result.errors.append((name, error))
+            continue
+
+        lesson_id = str(lesson.lesson_id)
+        entry = manifest.get(name)
+        if entry and entry["lesson_id"] and entry["lesson_id"] != lesson_id:
+            replaced_ids.add(entry["lesson_id"])
+
+        if lesson_id in existing_ids:
+            result.updated.append(lesson_id)
+        else:
+            result.new.append(lesson_id)
+        changed.append((lesson, (name, size, mtime, content_hash, lesson_id, now)))
+
+    deleted_paths = [name for name in manifest if name not in files]
+    if remove_orphans:
+        replaced_ids.update(
+            manifest[name]["lesson_id"] for name in deleted_paths if manifest[name]["lesson_id"]
+        )
+        # A lesson that moved to another file is not an orphan
+        changed_paths = {manifest_row[0] for _, manifest_row in changed}
+        still_provided = {
+            row["lesson_id"] for name, row in manifest.items()
+            if name in files and name not in changed_paths
+        }
+        still_provided.update(str(lesson.lesson_id) for lesson, _ in changed)
+        result.removed = sorted(
+            lesson_id for lesson_id in replaced_ids
+            if lesson_id not in still_provided and lesson_id in existing_ids
+        )
+
+    if dry_run or not (changed or touched or deleted_paths):
+        return result
+
+    with db.transaction() as conn:
+        cursor = conn.cursor()
+        if changed:
+            outcomes = db.upsert_lessons(lesson for lesson, _ in changed)
+            # A changed file can still produce identical lesson content
+            result.new = [i for i in result.new if outcomes.get(i) == LESSON_INSERTED]
+            result.updated = [i for i in result.updated if outcomes.get(i) == LESSON_UPDATED]
+            result.unchanged += sum(
+                1 for lesson, _ in changed if outcomes[str(lesson.lesson_id)] == LESSON_UNCHANGED
+            )
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO content_manifest
+                    (path, size, mtime, content_hash, lesson_id, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [manifest_row for _, manifest_row in changed],
+            )
+        if touched:
+            cursor.executemany(
+                "UPDATE content_manifest SET size = ?, mtime = ? WHERE path = ?",
+                touched,
+            )
+        if deleted_paths:
+            cursor.executemany(
+                "DELETE FROM content_manifest WHERE path = ?",
+                [(name,) for name in deleted_paths],
+            )
+        for chunk in _chunked(result.removed):
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"DELETE FROM lesson_tags WHERE lesson_id IN ({placeholders})", chunk)
+            cursor.execute(f"DELETE FROM lessons WHERE lesson_id IN ({placeholders})", chunk)
+
+        if result.removed:
+            refresh_lesson_blocks(conn, result.removed)
+            if db.has_search_index:
+                refresh_search_index(conn, result.removed)
+            refresh_prerequisite_graph(conn)
+            db.pool.on_commit(bump_catalog_version)
+
+    return result
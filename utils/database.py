@@ -3,17 +3,101 @@ Database management for CyberLearn.
 Handles SQLite persistence for users, lessons, and progress tracking.
 """
 
+import hashlib
 import sqlite3
 import json
-from typing import Optional, List, Dict
+import threading
+from typing import Optional, List, Dict, Iterable, Set
 from uuid import UUID
 from datetime import datetime
 from pathlib import Path
 
-from models.user import UserProfile, SkillLevels, LearningPreferences
-from models.lesson import Lesson, LessonMetadata
+from models.user import UserProfile
+from models.lesson import Lesson, LessonMetadata, LessonCard, LessonHeader, ContentBlock
 from models.progress import LessonProgress, DomainProgress
 from models.tag import Tag, LessonTag, TagCreate, TagUpdate, TagFilter
+from migrations import run_migrations
+from utils.schema import SchemaInfo
+from utils.codec import (
+    LESSON_COLUMNS,
+    LESSON_UPDATE_COLUMNS,
+    lesson_from_row,
+    lesson_header_from_row,
+    lesson_to_row,
+    progress_from_row,
+    progress_to_row,
+    user_from_row,
+    user_to_row,
+)
+from utils.db_pool import acquire_pool, release_pool
+from utils.domain_stats import get_domain_stats, rebuild_domain_stats
+from utils.lesson_catalog import LessonCatalog, get_catalog, bump_catalog_version, ensure_catalog_state
+from utils.leaderboard import (
+    BOARDS as LEADERBOARDS,
+    get_around as get_leaderboard_around,
+    get_page as get_leaderboard_page,
+    get_rank as get_snapshot_rank,
+    is_snapshot_fresh,
+    live_rank,
+    refresh_snapshot as refresh_leaderboard_snapshot,
+)
+from utils.read_cache import bump_data_version, cached_read
+from utils.progress_version import bump_progress_version, get_progress_version
+from utils.lesson_blocks import (
+    count_blocks,
+    find_stale_block_lessons,
+    get_block_payloads,
+    refresh_lesson_blocks,
+)
+from utils.prerequisite_graph import (
+    PrerequisiteGraph,
+    compile_stored_lessons,
+    get_open_lesson_ids,
+    is_unlocked,
+    refresh_prerequisite_graph,
+)
+from utils.lesson_search import (
+    ensure_search_index,
+    find_stale_lessons,
+    refresh_search_index,
+    search_lessons,
+)
+
+
+# Keep IN (...) lists well below SQLite's bound-parameter limit
+SQL_IN_CHUNK_SIZE = 500
+
+
+def _chunked(items: List[str], size: int = SQL_IN_CHUNK_SIZE):
+    """Yield successive slices of items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def lesson_content_hash(lesson: Lesson) -> str:
+    """
+    Hash of the fields the lesson source actually set.
+
+    Defaults filled in during validation (generated block ids, created_at /
+    updated_at = now) differ on every parse, so they are left out.
+    """
+    return hashlib.sha256(lesson.model_dump_json(exclude_unset=True).encode("utf-8")).hexdigest()
+
+
+# Written alongside LESSON_COLUMNS by create_lesson/upsert_lessons
+_LESSON_WRITE_COLUMNS = LESSON_COLUMNS + ("content_hash",)
+
+# upsert_lessons() outcomes
+LESSON_INSERTED = "inserted"
+LESSON_UPDATED = "updated"
+LESSON_UNCHANGED = "unchanged"
+LESSON_SKIPPED = "skipped"  # already exists and overwrite=False
+
+# User columns update_user leaves alone
+_USER_IDENTITY_COLUMNS = {"user_id", "username", "created_at"}
+
+# Guards ConnectionPool.leaderboard_rebuilds
+_leaderboard_rebuilds_lock = threading.Lock()
 
 
 class Database:
@@ -21,14 +105,37 @@ class Database:
 
     def __init__(self, db_path: str = "cyberlearn.db"):
         self.db_path = db_path
-        self.conn = None
-        self._initialize_database()
+        # Connections are shared by every Database on the same file
+        self.pool = acquire_pool(db_path)
+        self.conn = self.pool.writer
+        self._closed = False
+
+        with self.pool.write_lock:
+            if not self.pool.initialized:
+                self._initialize_database()
+                self.pool.initialized = True
+
+        self.schema = self.pool.schema
+        self.has_search_index = self.pool.has_search_index
+        # The staleness scans read every lesson, so they run once per pool;
+        # the content maintenance job repeats them for long-running servers
+        if not self.pool.search_index_synced:
+            self.sync_search_index()
+            self.pool.search_index_synced = True
+        if not self.pool.lesson_blocks_synced:
+            self.sync_lesson_blocks()
+            self.pool.lesson_blocks_synced = True
+
+    def transaction(self):
+        """Context manager for writes: commits once at the outermost level"""
+        return self.pool.transaction()
+
+    def reader(self):
+        """Context manager that borrows a read connection from the pool"""
+        return self.pool.reader()
 
     def _initialize_database(self):
-        """Create tables if they don't exist"""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # Enable dict-like access
-
+        """Create tables if they don't exist (once per connection pool)"""
         cursor = self.conn.cursor()
 
         # Users table
@@ -82,7 +189,9 @@ class Database:
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
                 author TEXT,
-                version TEXT DEFAULT '1.0'
+                version TEXT DEFAULT '1.0',
+                hidden INTEGER DEFAULT 0,
+                content_hash TEXT
             )
         """
         )
@@ -269,525 +378,616 @@ class Database:
 
         self.conn.commit()
 
+        # Bring older databases up to date (columns, tables, indexes)
+        run_migrations(self.conn)
+
+        # Column registry, so optional-column checks don't hit PRAGMA per query
+        self.pool.schema = SchemaInfo(self.conn)
+
+        self.pool.has_search_index = ensure_search_index(self.conn)
+        # Lets the catalog see lesson and tag writes from other processes
+        ensure_catalog_state(self.conn)
+        self.conn.commit()
+
+    def sync_lesson_blocks(self) -> int:
+        """Re-split lessons changed by scripts since their blocks were stored. Returns how many."""
+        with self.reader() as conn:
+            stale_ids = find_stale_block_lessons(conn)
+        if stale_ids:
+            with self.transaction() as conn:
+                refresh_lesson_blocks(conn, stale_ids)
+                # Their prerequisites may have changed too
+                refresh_prerequisite_graph(conn)
+                self.pool.on_commit(bump_catalog_version)
+        return len(stale_ids)
+
+    def sync_search_index(self) -> int:
+        """Re-index lessons changed by scripts since the index was built. Returns how many."""
+        if not self.has_search_index:
+            return 0
+        with self.reader() as conn:
+            stale_ids = find_stale_lessons(conn)
+        if stale_ids:
+            with self.transaction() as conn:
+                refresh_search_index(conn, stale_ids)
+        return len(stale_ids)
+
     # USER OPERATIONS
 
     def create_user(self, user: UserProfile) -> bool:
         """Create new user"""
+        values = user_to_row(user)
+        # Optional columns are only written if their migration has run
+        columns = [column for column in values if self.has_column("users", column)]
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO users (
-                    user_id, username, email, created_at, last_login,
-                    skill_levels, total_xp, level, streak_days, longest_streak,
-                    badges, learning_preferences, total_lessons_completed,
-                    total_time_spent, diagnostic_completed
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    str(user.user_id),
-                    user.username,
-                    user.email,
-                    user.created_at.isoformat(),
-                    user.last_login.isoformat(),
-                    user.skill_levels.json(),
-                    user.total_xp,
-                    user.level,
-                    user.streak_days,
-                    user.longest_streak,
-                    json.dumps(user.badges),
-                    user.learning_preferences.json(),
-                    user.total_lessons_completed,
-                    user.total_time_spent,
-                    int(user.diagnostic_completed),
-                ),
-            )
-            self.conn.commit()
-            return True
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"INSERT INTO users ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    [values[column] for column in columns],
+                )
+                self.pool.on_commit(lambda: self._remember_user_columns(user))
+                return True
         except sqlite3.IntegrityError:
             return False
 
     def get_user(self, user_id: UUID) -> Optional[UserProfile]:
         """Retrieve user by ID"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE user_id = ?", (str(user_id),))
-        row = cursor.fetchone()
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users WHERE user_id = ?", (str(user_id),))
+            row = cursor.fetchone()
 
-        if not row:
-            return None
+            if not row:
+                return None
 
-        return self._row_to_user(row)
+            return self._row_to_user(row)
 
     def get_user_by_username(self, username: str) -> Optional[UserProfile]:
         """Retrieve user by username"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-        row = cursor.fetchone()
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
+            row = cursor.fetchone()
+
+            if not row:
+                return None
+
+            return self._row_to_user(row)
+
+    def refresh_schema(self):
+        """Reload the column registry (call after running a migration)"""
+        with self.pool.write_lock:
+            self.schema.refresh()
+
+    def has_column(self, table: str, column: str) -> bool:
+        """Check if an optional column exists (uses the cached registry)"""
+        return self.schema.has_column(table, column)
+
+    def _user_columns(self, user: UserProfile) -> Dict[str, object]:
+        """Writable users columns for a profile (identity columns excluded)"""
+        values = user_to_row(user)
+        # Optional columns are only written if their migration has run
+        return {
+            column: value for column, value in values.items()
+            if column not in _USER_IDENTITY_COLUMNS and self.has_column("users", column)
+        }
 
-        if not row:
-            return None
+    def _remember_user_columns(self, user: UserProfile, values: Optional[Dict[str, object]] = None):
+        """Record values as the user's stored columns (all columns if None)"""
+        stored = dict(user._stored_row or {})
+        stored.update(self._user_columns(user) if values is None else values)
+        user._stored_row = stored
 
-        return self._row_to_user(row)
+    def get_user_changes(self, user: UserProfile) -> Dict[str, tuple]:
+        """
+        Columns whose value differs from the stored row: column -> (stored, new).
 
-    def update_user(self, user: UserProfile) -> bool:
-        """Update existing user"""
-        cursor = self.conn.cursor()
+        Every column counts as changed if the stored row isn't known (a
+        profile not loaded through this class).
+        """
+        stored = user._stored_row or {}
+        return {
+            column: (stored.get(column), value)
+            for column, value in self._user_columns(user).items()
+            if column not in stored or stored[column] != value
+        }
 
-        # Check if new columns exist
-        cursor.execute("PRAGMA table_info(users)")
-        columns = [row[1] for row in cursor.fetchall()]
-        has_new_columns = 'last_username' in columns and 'preferred_tag_filters' in columns
-        has_last_active = 'last_active_lesson_id' in columns and 'last_active_at' in columns
+    def update_user(self, user: UserProfile) -> bool:
+        """Write the user's changed columns (nothing if unchanged)"""
+        changes = self.get_user_changes(user)
+        if not changes:
+            return True
+        values = {column: new for column, (_, new) in changes.items()}
 
-        if has_new_columns and has_last_active:
-            # Use new query with all fields including last_active
+        with self.transaction() as conn:
+            cursor = conn.cursor()
             cursor.execute(
-                """
-                UPDATE users SET
-                    email = ?, last_login = ?, skill_levels = ?, total_xp = ?,
-                    level = ?, streak_days = ?, longest_streak = ?, badges = ?,
-                    learning_preferences = ?, total_lessons_completed = ?,
-                    total_time_spent = ?, diagnostic_completed = ?,
-                    last_username = ?, preferred_tag_filters = ?,
-                    last_active_lesson_id = ?, last_active_at = ?
-                WHERE user_id = ?
-            """,
-                (
-                    user.email,
-                    user.last_login.isoformat(),
-                    user.skill_levels.json(),
-                    user.total_xp,
-                    user.level,
-                    user.streak_days,
-                    user.longest_streak,
-                    json.dumps(user.badges),
-                    user.learning_preferences.json(),
-                    user.total_lessons_completed,
-                    user.total_time_spent,
-                    int(user.diagnostic_completed),
-                    user.last_username,
-                    json.dumps(user.preferred_tag_filters),
-                    str(user.last_active_lesson_id) if user.last_active_lesson_id else None,
-                    user.last_active_at.isoformat() if user.last_active_at else None,
-                    str(user.user_id),
-                ),
-            )
-        elif has_new_columns:
-            # Use query with last_username and preferred_tag_filters but not last_active
-            cursor.execute(
-                """
-                UPDATE users SET
-                    email = ?, last_login = ?, skill_levels = ?, total_xp = ?,
-                    level = ?, streak_days = ?, longest_streak = ?, badges = ?,
-                    learning_preferences = ?, total_lessons_completed = ?,
-                    total_time_spent = ?, diagnostic_completed = ?,
-                    last_username = ?, preferred_tag_filters = ?
-                WHERE user_id = ?
-            """,
-                (
-                    user.email,
-                    user.last_login.isoformat(),
-                    user.skill_levels.json(),
-                    user.total_xp,
-                    user.level,
-                    user.streak_days,
-                    user.longest_streak,
-                    json.dumps(user.badges),
-                    user.learning_preferences.json(),
-                    user.total_lessons_completed,
-                    user.total_time_spent,
-                    int(user.diagnostic_completed),
-                    user.last_username,
-                    json.dumps(user.preferred_tag_filters),
-                    str(user.user_id),
-                ),
-            )
-        else:
-            # Use old query without new fields (backward compatible)
-            cursor.execute(
-                """
-                UPDATE users SET
-                    email = ?, last_login = ?, skill_levels = ?, total_xp = ?,
-                    level = ?, streak_days = ?, longest_streak = ?, badges = ?,
-                    learning_preferences = ?, total_lessons_completed = ?,
-                    total_time_spent = ?, diagnostic_completed = ?
-                WHERE user_id = ?
-            """,
-                (
-                    user.email,
-                    user.last_login.isoformat(),
-                    user.skill_levels.json(),
-                    user.total_xp,
-                    user.level,
-                    user.streak_days,
-                    user.longest_streak,
-                    json.dumps(user.badges),
-                    user.learning_preferences.json(),
-                    user.total_lessons_completed,
-                    user.total_time_spent,
-                    int(user.diagnostic_completed),
-                    str(user.user_id),
-                ),
+                f"UPDATE users SET {', '.join(f'{column} = ?' for column in values)} WHERE user_id = ?",
+                [*values.values(), str(user.user_id)],
             )
+            if cursor.rowcount > 0:
+                self.pool.on_commit(lambda: self._remember_user_columns(user, values))
 
-        self.conn.commit()
-        return cursor.rowcount > 0
+            return cursor.rowcount > 0
 
     def _row_to_user(self, row: sqlite3.Row) -> UserProfile:
         """Convert DB row to UserProfile"""
-        # Handle optional fields (may not exist before migration)
-        try:
-            last_username = row["last_username"]
-        except (IndexError, KeyError):
-            last_username = None
+        user = user_from_row(row)
+        # The values as stored, so a column a script wrote in another form
+        # than user_to_row() would is rewritten on the next update_user
+        keys = row.keys()
+        user._stored_row = {column: row[column] for column in self._user_columns(user) if column in keys}
+        return user
 
-        try:
-            preferred_tag_filters = json.loads(row["preferred_tag_filters"])
-        except (IndexError, KeyError):
-            preferred_tag_filters = []
+    # LEADERBOARDS
 
+    def _fresh_leaderboard(self, board: str):
+        """
+        Start a background rebuild of a board's snapshot if it is older than
+        SNAPSHOT_TTL (one at a time per board). Readers don't wait for it:
+        they are served the current snapshot until the rebuild commits.
+        """
+        with self.reader() as conn:
+            if is_snapshot_fresh(conn, board):
+                return
+        with _leaderboard_rebuilds_lock:
+            if board in self.pool.leaderboard_rebuilds:
+                return
+            self.pool.leaderboard_rebuilds.add(board)
+        threading.Thread(
+            target=self._rebuild_leaderboard, args=(board,), name=f"leaderboard-{board}", daemon=True
+        ).start()
+
+    def _rebuild_leaderboard(self, board: str):
         try:
-            last_active_lesson_id = UUID(row["last_active_lesson_id"]) if row["last_active_lesson_id"] else None
-        except (IndexError, KeyError, ValueError):
-            last_active_lesson_id = None
+            with self.transaction() as conn:
+                # Maintenance may have rebuilt it since
+                if not is_snapshot_fresh(conn, board):
+                    refresh_leaderboard_snapshot(conn, board)
+        except sqlite3.Error as e:
+            print(f"[Leaderboard] Rebuilding {board} failed: {e}")
+        finally:
+            with _leaderboard_rebuilds_lock:
+                self.pool.leaderboard_rebuilds.discard(board)
+
+    def refresh_leaderboards(self, boards: Optional[Iterable[str]] = None):
+        """Rebuild leaderboard snapshots now (all boards by default)"""
+        with self.transaction() as conn:
+            for board in boards or LEADERBOARDS:
+                refresh_leaderboard_snapshot(conn, board)
+
+    def get_leaderboard(self, board: str = "xp", limit: int = 10, offset: int = 0) -> List[Dict]:
+        """
+        A page of a leaderboard ("xp", "streak" or "lessons"), best first.
 
-        try:
-            last_active_at = datetime.fromisoformat(row["last_active_at"]) if row["last_active_at"] else None
-        except (IndexError, KeyError, ValueError):
-            last_active_at = None
-
-        return UserProfile(
-            user_id=UUID(row["user_id"]),
-            username=row["username"],
-            email=row["email"],
-            created_at=datetime.fromisoformat(row["created_at"]),
-            last_login=datetime.fromisoformat(row["last_login"]),
-            skill_levels=SkillLevels.parse_raw(row["skill_levels"]),
-            total_xp=row["total_xp"],
-            level=row["level"],
-            streak_days=row["streak_days"],
-            longest_streak=row["longest_streak"],
-            badges=json.loads(row["badges"]),
-            learning_preferences=LearningPreferences.parse_raw(
-                row["learning_preferences"]
-            ),
-            total_lessons_completed=row["total_lessons_completed"],
-            total_time_spent=row["total_time_spent"],
-            diagnostic_completed=bool(row["diagnostic_completed"]),
-            last_username=last_username,
-            preferred_tag_filters=preferred_tag_filters,
-            last_active_lesson_id=last_active_lesson_id,
-            last_active_at=last_active_at,
-        )
+        Entries have position, rank (shared by ties), user_id, username and
+        value. Served from the latest snapshot; one older than SNAPSHOT_TTL
+        is rebuilt in the background. Empty until the first build.
+        """
+        self._fresh_leaderboard(board)
+        with self.reader() as conn:
+            return get_leaderboard_page(conn, board, limit, offset)
+
+    def get_leaderboard_around(self, user_id: UUID, board: str = "xp", radius: int = 5) -> List[Dict]:
+        """Leaderboard entries from radius places above the user to radius below"""
+        self._fresh_leaderboard(board)
+        with self.reader() as conn:
+            return get_leaderboard_around(conn, board, str(user_id), radius)
+
+    def get_leaderboard_rank(self, user_id: UUID, board: str = "xp") -> Optional[Dict]:
+        """
+        A user's rank, value, total_users and percentile on a board.
+
+        Users who signed up after the snapshot was built get their exact
+        live rank instead.
+        """
+        self._fresh_leaderboard(board)
+        with self.reader() as conn:
+            return get_snapshot_rank(conn, board, str(user_id)) or live_rank(conn, board, str(user_id))
 
     # LESSON OPERATIONS
 
     def create_lesson(self, lesson: Lesson) -> bool:
         """Store lesson in database"""
+        row = lesson_to_row(lesson)
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO lessons (
-                    lesson_id, domain, title, subtitle, difficulty, estimated_time,
-                    order_index, prerequisites, learning_objectives, content_blocks,
-                    pre_assessment, post_assessment, mastery_threshold,
-                    jim_kwik_principles, base_xp_reward, badge_unlock, is_core_concept,
-                    created_at, updated_at, author, version
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    str(lesson.lesson_id),
-                    lesson.domain,
-                    lesson.title,
-                    lesson.subtitle,
-                    lesson.difficulty,
-                    lesson.estimated_time,
-                    lesson.order_index,
-                    json.dumps([str(p) for p in lesson.prerequisites]),
-                    json.dumps(lesson.learning_objectives),
-                    json.dumps([json.loads(block.model_dump_json()) for block in lesson.content_blocks]),
-                    (
-                        json.dumps([json.loads(q.model_dump_json()) for q in lesson.pre_assessment])
-                        if lesson.pre_assessment
-                        else None
-                    ),
-                    json.dumps([json.loads(q.model_dump_json()) for q in lesson.post_assessment]),
-                    lesson.mastery_threshold,
-                    json.dumps(lesson.jim_kwik_principles),
-                    lesson.base_xp_reward,
-                    lesson.badge_unlock,
-                    int(lesson.is_core_concept),
-                    lesson.created_at.isoformat(),
-                    lesson.updated_at.isoformat(),
-                    lesson.author,
-                    lesson.version,
-                ),
-            )
-            self.conn.commit()
-            return True
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"""
+                    INSERT INTO lessons ({", ".join(_LESSON_WRITE_COLUMNS)})
+                    VALUES ({", ".join("?" * len(_LESSON_WRITE_COLUMNS))})
+                """,
+                    row + (lesson_content_hash(lesson),),
+                )
+                refresh_lesson_blocks(conn, [str(lesson.lesson_id)])
+                if self.has_search_index:
+                    refresh_search_index(conn, [str(lesson.lesson_id)])
+                refresh_prerequisite_graph(conn)
+                self.pool.on_commit(bump_catalog_version)
+                return True
         except sqlite3.IntegrityError:
             return False
 
-    def get_lesson(self, lesson_id: UUID) -> Optional[Lesson]:
-        """Retrieve full lesson by ID"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM lessons WHERE lesson_id = ?", (str(lesson_id),))
-        row = cursor.fetchone()
+    def upsert_lessons(
+        self,
+        lessons: Iterable[Lesson],
+        tag_ids: Iterable[str] = (),
+        overwrite: bool = True,
+    ) -> Dict[str, str]:
+        """
+        Insert or update many lessons in one transaction.
 
-        if not row:
-            return None
+        Lessons whose content hash matches the stored one are left untouched.
+        With overwrite=False existing lessons are skipped instead of updated.
+        tag_ids are assigned to every inserted or updated lesson.
+        created_at and the hidden flag of existing lessons are preserved.
 
-        # Parse JSON fields from database
-        row_dict = dict(row)
-        row_dict['prerequisites'] = json.loads(row_dict['prerequisites'])
-        row_dict['learning_objectives'] = json.loads(row_dict['learning_objectives'])
-        row_dict['content_blocks'] = json.loads(row_dict['content_blocks'])
-        row_dict['post_assessment'] = json.loads(row_dict['post_assessment'])
-        row_dict['jim_kwik_principles'] = json.loads(row_dict['jim_kwik_principles'])
-        if row_dict['pre_assessment']:
-            row_dict['pre_assessment'] = json.loads(row_dict['pre_assessment'])
+        Returns lesson_id -> LESSON_INSERTED / LESSON_UPDATED /
+        LESSON_UNCHANGED / LESSON_SKIPPED.
+        """
+        # Last one wins for duplicate ids
+        batch = {str(lesson.lesson_id): lesson for lesson in lessons}
+        if not batch:
+            return {}
+        # Hash before taking the write lock
+        hashes = {lesson_id: lesson_content_hash(lesson) for lesson_id, lesson in batch.items()}
+
+        updates = ", ".join(
+            f"{column} = excluded.{column}"
+            for column in LESSON_UPDATE_COLUMNS + ("content_hash",)
+        )
+        sql = f"""
+            INSERT INTO lessons ({", ".join(_LESSON_WRITE_COLUMNS)})
+            VALUES ({", ".join("?" * len(_LESSON_WRITE_COLUMNS))})
+            ON CONFLICT(lesson_id) DO UPDATE SET {updates}
+        """
 
-        return Lesson(**row_dict)
+        outcomes = {}
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            lesson_ids = list(batch)
+            stored_hashes = {}
+            for chunk in _chunked(lesson_ids):
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT lesson_id, content_hash FROM lessons WHERE lesson_id IN ({placeholders})",
+                    chunk,
+                )
+                stored_hashes.update((row[0], row[1]) for row in cursor.fetchall())
+
+            writes = []
+            for lesson_id, lesson in batch.items():
+                content_hash = hashes[lesson_id]
+                if lesson_id not in stored_hashes:
+                    outcomes[lesson_id] = LESSON_INSERTED
+                elif stored_hashes[lesson_id] == content_hash:
+                    outcomes[lesson_id] = LESSON_UNCHANGED
+                    continue
+                elif overwrite:
+                    outcomes[lesson_id] = LESSON_UPDATED
+                else:
+                    outcomes[lesson_id] = LESSON_SKIPPED
+                    continue
+                # Only serialize lessons that are actually written
+                writes.append(lesson_to_row(lesson) + (content_hash,))
+
+            cursor.executemany(sql, writes)
+
+            tag_ids = list(tag_ids)
+            if writes and tag_ids:
+                now = datetime.utcnow().isoformat()
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO lesson_tags (lesson_id, tag_id, added_at) VALUES (?, ?, ?)",
+                    [(row[0], tag_id, now) for row in writes for tag_id in tag_ids],
+                )
 
-    def get_lessons_by_domain(self, domain: str, include_hidden: bool = False) -> List[LessonMetadata]:
-        """Get all lesson metadata for a domain (excludes hidden by default)"""
-        cursor = self.conn.cursor()
+            if writes:
+                written_ids = [row[0] for row in writes]
+                refresh_lesson_blocks(conn, written_ids)
+                if self.has_search_index:
+                    refresh_search_index(conn, written_ids)
+                refresh_prerequisite_graph(conn)
+                self.pool.on_commit(bump_catalog_version)
+
+        return outcomes
+
+    def get_lesson(self, lesson_id: UUID) -> Optional[Lesson]:
+        """Retrieve full lesson by ID"""
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM lessons WHERE lesson_id = ?", (str(lesson_id),))
+            row = cursor.fetchone()
 
-        # Check if hidden column exists
-        cursor.execute("PRAGMA table_info(lessons)")
-        columns = [row[1] for row in cursor.fetchall()]
-        has_hidden = 'hidden' in columns
+            if not row:
+                return None
 
-        if has_hidden and not include_hidden:
+            return lesson_from_row(row)
+
+    def get_lesson_header(self, lesson_id: UUID) -> Optional[LessonHeader]:
+        """Retrieve a lesson without its content blocks (see get_lesson_blocks)"""
+        with self.reader() as conn:
+            cursor = conn.cursor()
             cursor.execute(
                 """
-                SELECT lesson_id, domain, title, difficulty, estimated_time,
-                       order_index, is_core_concept, prerequisites
-                FROM lessons WHERE domain = ? AND (hidden = 0 OR hidden IS NULL)
-                ORDER BY order_index
-            """,
-                (domain,),
+                SELECT lesson_id, domain, title, subtitle, difficulty, estimated_time,
+                       order_index, prerequisites, learning_objectives, pre_assessment,
+                       post_assessment, mastery_threshold, jim_kwik_principles,
+                       base_xp_reward, badge_unlock, is_core_concept, created_at,
+                       updated_at, author, version
+                FROM lessons WHERE lesson_id = ?
+                """,
+                (str(lesson_id),),
             )
-        else:
-            cursor.execute(
-                """
-                SELECT lesson_id, domain, title, difficulty, estimated_time,
-                       order_index, is_core_concept, prerequisites
-                FROM lessons WHERE domain = ? ORDER BY order_index
-            """,
-                (domain,),
+            row = cursor.fetchone()
+
+            if not row:
+                return None
+
+            return lesson_header_from_row(row, count_blocks(conn, str(lesson_id)))
+
+    def get_lesson_blocks(self, lesson_id: UUID, start_index: int = 0, count: int = 1) -> List[ContentBlock]:
+        """Retrieve count content blocks of a lesson starting at start_index"""
+        with self.reader() as conn:
+            payloads = get_block_payloads(conn, str(lesson_id), start_index, count)
+        return [ContentBlock(**json.loads(payload)) for payload in payloads]
+
+    def get_lesson_block(self, lesson_id: UUID, block_index: int) -> Optional[ContentBlock]:
+        """Retrieve a single content block of a lesson"""
+        blocks = self.get_lesson_blocks(lesson_id, block_index, 1)
+        return blocks[0] if blocks else None
+
+    def search_lessons(
+        self,
+        search_text: str = "",
+        domain: Optional[str] = None,
+        difficulty: Optional[int] = None,
+        tag_name: Optional[str] = None,
+        include_hidden: bool = False,
+        sort: str = "relevance",
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Full-text lesson search (BM25 ranked, prefix matching, snippets)"""
+        with self.reader() as conn:
+            return search_lessons(
+                conn,
+                search_text,
+                domain=domain,
+                difficulty=difficulty,
+                tag_name=tag_name,
+                include_hidden=include_hidden,
+                sort=sort,
+                limit=limit,
+                use_fts=self.has_search_index,
             )
 
-        lessons = []
-        for row in cursor.fetchall():
-            # Parse prerequisites safely, filtering out invalid UUIDs
-            prereqs_raw = json.loads(row["prerequisites"])
-            prereqs = []
-            for p in prereqs_raw:
-                if p and isinstance(p, str):
-                    try:
-                        prereqs.append(UUID(p))
-                    except (ValueError, AttributeError):
-                        # Skip invalid UUIDs
-                        continue
-
-            lessons.append(
-                LessonMetadata(
-                    lesson_id=UUID(row["lesson_id"]),
-                    domain=row["domain"],
-                    title=row["title"],
-                    difficulty=row["difficulty"],
-                    estimated_time=row["estimated_time"],
-                    order_index=row["order_index"],
-                    is_core_concept=bool(row["is_core_concept"]),
-                    prerequisites=prereqs,
-                )
-            )
+    def refresh_search_index(self, lesson_ids: Optional[List[str]] = None):
+        """Re-index the given lessons (or all lessons) after external writes"""
+        if self.has_search_index:
+            with self.transaction() as conn:
+                refresh_search_index(conn, lesson_ids)
+
+    def get_lesson_catalog(self) -> LessonCatalog:
+        """Get the process-wide lesson catalog (rebuilt only after writes)"""
+        with self.reader() as conn:
+            return get_catalog(conn, self.db_path)
+
+    def get_lessons_by_domain(self, domain: str, include_hidden: bool = False) -> List[LessonMetadata]:
+        """Get all lesson metadata for a domain (excludes hidden by default)"""
+        return self.get_lesson_catalog().get_domain(domain, include_hidden)
 
-        return lessons
+    def get_lesson_cards(self, domain: str, include_hidden: bool = False) -> List[LessonCard]:
+        """Get display cards for a domain without loading lesson content"""
+        return self.get_lesson_catalog().get_domain_cards(domain, include_hidden)
 
     def get_all_lessons_metadata(self) -> List[LessonMetadata]:
         """Get metadata for all lessons"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT lesson_id, domain, title, difficulty, estimated_time,
-                   order_index, is_core_concept, prerequisites
-            FROM lessons ORDER BY domain, order_index
-        """
-        )
+        return list(self.get_lesson_catalog().lessons)
+
+    def refresh_prerequisite_graph(self) -> PrerequisiteGraph:
+        """Recompile lesson prerequisites after external lesson writes"""
+        with self.transaction() as conn:
+            graph = refresh_prerequisite_graph(conn)
+            self.pool.on_commit(bump_catalog_version)
+            return graph
+
+    def check_prerequisites(self) -> PrerequisiteGraph:
+        """Compile lesson prerequisites without storing them (for reports)"""
+        with self.reader() as conn:
+            return compile_stored_lessons(conn)
+
+    def get_open_lessons(
+        self, user_id: UUID, domain: Optional[str] = None, include_hidden: bool = False
+    ) -> List[LessonMetadata]:
+        """Lessons the user has unlocked and not yet completed, in curriculum order"""
+        with self.reader() as conn:
+            lesson_ids = get_open_lesson_ids(conn, str(user_id), domain, include_hidden)
+        by_id = self.get_lesson_catalog().by_id
+        return [by_id[UUID(lesson_id)] for lesson_id in lesson_ids if UUID(lesson_id) in by_id]
+
+    def get_open_lesson_ids(self, user_id: UUID, include_hidden: bool = False) -> Set[UUID]:
+        """Ids of the lessons the user has unlocked and not yet completed"""
+        with self.reader() as conn:
+            return {
+                UUID(lesson_id)
+                for lesson_id in get_open_lesson_ids(conn, str(user_id), include_hidden=include_hidden)
+            }
 
-        lessons = []
-        for row in cursor.fetchall():
-            # Parse prerequisites safely, filtering out invalid UUIDs
-            prereqs_raw = json.loads(row["prerequisites"])
-            prereqs = []
-            for p in prereqs_raw:
-                if p and isinstance(p, str):
-                    try:
-                        prereqs.append(UUID(p))
-                    except (ValueError, AttributeError):
-                        # Skip invalid UUIDs
-                        continue
-
-            lessons.append(
-                LessonMetadata(
-                    lesson_id=UUID(row["lesson_id"]),
-                    domain=row["domain"],
-                    title=row["title"],
-                    difficulty=row["difficulty"],
-                    estimated_time=row["estimated_time"],
-                    order_index=row["order_index"],
-                    is_core_concept=bool(row["is_core_concept"]),
-                    prerequisites=prereqs,
-                )
+    def is_lesson_unlocked(self, user_id: UUID, lesson_id: UUID) -> bool:
+        """True if the lesson has no prerequisites or the user completed them all"""
+        with self.reader() as conn:
+            return is_unlocked(conn, str(user_id), str(lesson_id))
+
+    def set_lesson_hidden(self, lesson_id: str, hidden: bool = True) -> bool:
+        """Hide or unhide a lesson"""
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE lessons SET hidden = ? WHERE lesson_id = ?",
+                (int(hidden), str(lesson_id)),
             )
+            self.pool.on_commit(bump_catalog_version)
+            return cursor.rowcount > 0
 
-        return lessons
+    def unhide_all_lessons(self) -> int:
+        """Unhide every hidden lesson, returns number of lessons changed"""
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE lessons SET hidden = 0 WHERE hidden = 1")
+            self.pool.on_commit(bump_catalog_version)
+            return cursor.rowcount
 
     # PROGRESS OPERATIONS
 
     def create_progress(self, progress: LessonProgress) -> bool:
         """Create progress record"""
+        values = progress_to_row(progress)
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO progress (
-                    progress_id, user_id, lesson_id, status, started_at, completed_at,
-                    attempts, quiz_scores, best_score, time_spent, retention_checks,
-                    next_review_date, mastery_level, interactive_blocks_completed,
-                    reflection_submitted, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    str(progress.progress_id),
-                    str(progress.user_id),
-                    str(progress.lesson_id),
-                    progress.status,
-                    progress.started_at.isoformat() if progress.started_at else None,
-                    (
-                        progress.completed_at.isoformat()
-                        if progress.completed_at
-                        else None
-                    ),
-                    progress.attempts,
-                    json.dumps(progress.quiz_scores),
-                    progress.best_score,
-                    progress.time_spent,
-                    json.dumps([c.dict() for c in progress.retention_checks]),
-                    (
-                        progress.next_review_date.isoformat()
-                        if progress.next_review_date
-                        else None
-                    ),
-                    progress.mastery_level,
-                    json.dumps([str(b) for b in progress.interactive_blocks_completed]),
-                    int(progress.reflection_submitted),
-                    progress.notes,
-                ),
-            )
-            self.conn.commit()
-            return True
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"INSERT INTO progress ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                    list(values.values()),
+                )
+                self._bump_progress_version(progress.user_id)
+                return True
         except sqlite3.IntegrityError:
             return False
 
     def update_progress(self, progress: LessonProgress) -> bool:
         """Update progress record"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            UPDATE progress SET
-                status = ?, started_at = ?, completed_at = ?, attempts = ?,
-                quiz_scores = ?, best_score = ?, time_spent = ?, retention_checks = ?,
-                next_review_date = ?, mastery_level = ?, interactive_blocks_completed = ?,
-                reflection_submitted = ?, notes = ?
-            WHERE progress_id = ?
-        """,
-            (
-                progress.status,
-                progress.started_at.isoformat() if progress.started_at else None,
-                progress.completed_at.isoformat() if progress.completed_at else None,
-                progress.attempts,
-                json.dumps(progress.quiz_scores),
-                progress.best_score,
-                progress.time_spent,
-                json.dumps([c.dict() for c in progress.retention_checks]),
-                (
-                    progress.next_review_date.isoformat()
-                    if progress.next_review_date
-                    else None
-                ),
-                progress.mastery_level,
-                json.dumps([str(b) for b in progress.interactive_blocks_completed]),
-                int(progress.reflection_submitted),
-                progress.notes,
-                str(progress.progress_id),
-            ),
-        )
-        self.conn.commit()
-        return cursor.rowcount > 0
+        values = progress_to_row(progress)
+        progress_id = values.pop("progress_id")
+        # A progress row never moves to another user or lesson
+        del values["user_id"], values["lesson_id"]
+
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"UPDATE progress SET {', '.join(f'{column} = ?' for column in values)} WHERE progress_id = ?",
+                [*values.values(), progress_id],
+            )
+            self._bump_progress_version(progress.user_id)
+            return cursor.rowcount > 0
+
+    def _bump_progress_version(self, user_id: UUID):
+        self.pool.on_commit(lambda: bump_progress_version(self.db_path, user_id))
+
+    def get_progress_version(self, user_id: UUID) -> int:
+        """Version of a user's progress, changes after each progress write"""
+        return get_progress_version(self.db_path, user_id)
 
     def get_user_progress(self, user_id: UUID) -> List[LessonProgress]:
         """Get all progress records for user"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM progress WHERE user_id = ?", (str(user_id),))
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM progress WHERE user_id = ?", (str(user_id),))
 
-        progress_list = []
-        for row in cursor.fetchall():
-            progress_list.append(self._row_to_progress(row))
+            progress_list = []
+            for row in cursor.fetchall():
+                progress_list.append(self._row_to_progress(row))
 
-        return progress_list
+            return progress_list
 
     def get_lesson_progress(
         self, user_id: UUID, lesson_id: UUID
     ) -> Optional[LessonProgress]:
         """Get progress for specific lesson"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT * FROM progress WHERE user_id = ? AND lesson_id = ?",
-            (str(user_id), str(lesson_id)),
-        )
-        row = cursor.fetchone()
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT * FROM progress WHERE user_id = ? AND lesson_id = ?",
+                (str(user_id), str(lesson_id)),
+            )
+            row = cursor.fetchone()
+
+            if not row:
+                return None
+
+            return self._row_to_progress(row)
+
+    def get_progress_for_lessons(
+        self, user_id: UUID, lesson_ids: List[UUID]
+    ) -> Dict[str, LessonProgress]:
+        """Get a user's progress for many lessons, keyed by lesson_id string"""
+        ids = list(dict.fromkeys(str(lesson_id) for lesson_id in lesson_ids))
+        progress_map = {}
+        with self.reader() as conn:
+            cursor = conn.cursor()
+
+            for chunk in _chunked(ids):
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT * FROM progress WHERE user_id = ? AND lesson_id IN ({placeholders})",
+                    [str(user_id), *chunk],
+                )
+                for row in cursor.fetchall():
+                    progress_map[row["lesson_id"]] = self._row_to_progress(row)
 
-        if not row:
-            return None
+            return progress_map
 
-        return self._row_to_progress(row)
+    def get_due_reviews(
+        self, user_id: UUID, limit: Optional[int] = 10, now: Optional[datetime] = None
+    ) -> List[LessonProgress]:
+        """
+        Lessons due for spaced-repetition review, most overdue first.
+
+        Ties (same review date) go to the lower mastery level. Mastered
+        lessons and progress for deleted lessons are left out. Reads only the
+        due rows through idx_progress_user_review, however long the user's
+        history is.
+        """
+        now = now or datetime.now()
+        sql = """
+            SELECT * FROM progress p
+            WHERE p.user_id = ? AND p.next_review_date <= ? AND p.status != 'mastered'
+              AND EXISTS (SELECT 1 FROM lessons l WHERE l.lesson_id = p.lesson_id)
+            ORDER BY p.next_review_date, p.mastery_level
+        """
+        params = [str(user_id), now.isoformat()]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return [self._row_to_progress(row) for row in cursor.fetchall()]
+
+    def get_due_review_counts(
+        self, user_ids: Optional[List[UUID]] = None, now: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        Number of due reviews per user (all users, or the given ones), in one
+        query, e.g. for reminders. Users with nothing due are left out.
+        """
+        now = now or datetime.now()
+        sql = """
+            SELECT p.user_id, COUNT(*) FROM progress p
+            WHERE p.next_review_date <= ? AND p.status != 'mastered'
+              AND EXISTS (SELECT 1 FROM lessons l WHERE l.lesson_id = p.lesson_id)
+        """
+        counts = {}
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            if user_ids is None:
+                cursor.execute(f"{sql} GROUP BY p.user_id", (now.isoformat(),))
+                counts.update(cursor.fetchall())
+            else:
+                ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+                for chunk in _chunked(ids):
+                    placeholders = ",".join("?" * len(chunk))
+                    cursor.execute(
+                        f"{sql} AND p.user_id IN ({placeholders}) GROUP BY p.user_id",
+                        [now.isoformat(), *chunk],
+                    )
+                    counts.update(cursor.fetchall())
+        return counts
 
     def _row_to_progress(self, row: sqlite3.Row) -> LessonProgress:
         """Convert DB row to LessonProgress"""
-        data = dict(row)
-
-        def parse_datetime(value):
-            return datetime.fromisoformat(value) if value else None
-
-        data["progress_id"] = UUID(data["progress_id"])
-        data["user_id"] = UUID(data["user_id"])
-        data["lesson_id"] = UUID(data["lesson_id"])
-
-        data["started_at"] = parse_datetime(data.get("started_at"))
-        data["completed_at"] = parse_datetime(data.get("completed_at"))
-        data["next_review_date"] = parse_datetime(data.get("next_review_date"))
-
-        quiz_scores = data.get("quiz_scores")
-        data["quiz_scores"] = json.loads(quiz_scores) if quiz_scores else []
-
-        retention_raw = data.get("retention_checks")
-        data["retention_checks"] = (
-            json.loads(retention_raw) if retention_raw else []
-        )
-
-        interactive_raw = data.get("interactive_blocks_completed")
-        interactive_ids = json.loads(interactive_raw) if interactive_raw else []
-        data["interactive_blocks_completed"] = [
-            UUID(val) for val in interactive_ids if val
-        ]
-
-        data["reflection_submitted"] = bool(data.get("reflection_submitted"))
-
-        return LessonProgress.model_validate(data)
+        return progress_from_row(row)
 
     def get_lesson_stats_by_domain(self, user_id: Optional[UUID] = None) -> Dict[str, Dict]:
         """
@@ -796,154 +996,81 @@ class Database:
         {
             'domain_name': {
                 'total': int,  # Total lessons in domain
-                'completed': int,  # Completed by user (if user_id provided)
+                'visible': int,  # Lessons in domain that aren't hidden
+                'completed': int,  # Completed or mastered by user (if user_id provided)
+                'mastered': int,  # Mastered by user (if user_id provided)
                 'in_progress': int,  # In progress by user (if user_id provided)
                 'not_started': int  # Not started by user (if user_id provided)
             }
         }
+        Reads the counters kept by triggers (see utils/domain_stats.py).
         """
-        cursor = self.conn.cursor()
-
-        # Get total lessons per domain
-        cursor.execute("""
-            SELECT domain, COUNT(*) as total
-            FROM lessons
-            GROUP BY domain
-            ORDER BY domain
-        """)
-
-        stats = {}
-        for row in cursor.fetchall():
-            domain = row['domain']
-            stats[domain] = {
-                'total': row['total'],
-                'completed': 0,
-                'in_progress': 0,
-                'not_started': 0
-            }
-
-        # If user_id provided, get completion stats
-        if user_id:
-            # Completed lessons
-            cursor.execute("""
-                SELECT l.domain, COUNT(*) as count
-                FROM lessons l
-                JOIN progress p ON l.lesson_id = p.lesson_id
-                WHERE p.user_id = ? AND p.status IN ('completed', 'mastered')
-                GROUP BY l.domain
-            """, (str(user_id),))
-
-            for row in cursor.fetchall():
-                if row['domain'] in stats:
-                    stats[row['domain']]['completed'] = row['count']
-
-            # In progress lessons
-            cursor.execute("""
-                SELECT l.domain, COUNT(*) as count
-                FROM lessons l
-                JOIN progress p ON l.lesson_id = p.lesson_id
-                WHERE p.user_id = ? AND p.status = 'in_progress'
-                GROUP BY l.domain
-            """, (str(user_id),))
-
-            for row in cursor.fetchall():
-                if row['domain'] in stats:
-                    stats[row['domain']]['in_progress'] = row['count']
-
-            # Calculate not_started
-            for domain in stats:
-                stats[domain]['not_started'] = (
-                    stats[domain]['total']
-                    - stats[domain]['completed']
-                    - stats[domain]['in_progress']
-                )
+        with self.reader() as conn:
+            return get_domain_stats(conn, str(user_id) if user_id else None)
 
-        return stats
+    def rebuild_domain_stats(self, user_ids: Optional[List[str]] = None):
+        """Recompute the per-domain counters (all users, or the given ones)"""
+        with self.transaction() as conn:
+            rebuild_domain_stats(conn, user_ids)
 
     def get_total_lesson_count(self) -> int:
         """Get total number of lessons in database"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) as count FROM lessons")
-        return cursor.fetchone()['count']
+        return len(self.get_lesson_catalog().lessons)
+
+    # ASSESSMENT OPERATIONS
+
+    @cached_read
+    def get_assessment_domains(self) -> List[Dict]:
+        """Domains that have assessment questions, with their question counts"""
+        with self.reader() as conn:
+            rows = conn.execute("""
+                SELECT domain, COUNT(*) as question_count
+                FROM assessment_questions
+                GROUP BY domain
+                ORDER BY domain
+            """).fetchall()
+            return [{"domain": row["domain"], "question_count": row["question_count"]} for row in rows]
 
     # TAG OPERATIONS
 
     def create_tag(self, tag: Tag) -> bool:
         """Create a new tag"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO tags (id, name, category, color, icon, description, created_at, is_system, user_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    tag.tag_id,
-                    tag.name,
-                    tag.category,
-                    tag.color,
-                    tag.icon,
-                    tag.description,
-                    tag.created_at.isoformat(),
-                    int(tag.is_system),
-                    tag.user_id
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    INSERT INTO tags (id, name, category, color, icon, description, created_at, is_system, user_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        tag.tag_id,
+                        tag.name,
+                        tag.category,
+                        tag.color,
+                        tag.icon,
+                        tag.description,
+                        tag.created_at.isoformat(),
+                        int(tag.is_system),
+                        tag.user_id
+                    )
                 )
-            )
-            self.conn.commit()
-            return True
+                self.pool.on_commit(bump_data_version)
+                return True
         except sqlite3.IntegrityError:
             return False
 
     def get_tag(self, tag_id: str) -> Optional[Tag]:
         """Get tag by ID"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM tags WHERE id = ?", (tag_id,))
-        row = cursor.fetchone()
-
-        if not row:
-            return None
-
-        return Tag(
-            tag_id=row['id'],
-            name=row['name'],
-            category=row['category'],
-            color=row['color'],
-            icon=row['icon'],
-            description=row['description'],
-            created_at=datetime.fromisoformat(row['created_at']),
-            is_system=bool(row['is_system']),
-            user_id=row['user_id'] if 'user_id' in row.keys() else None
-        )
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM tags WHERE id = ?", (tag_id,))
+            row = cursor.fetchone()
 
-    def get_tag_by_name(self, name: str) -> Optional[Tag]:
-        """Get tag by name"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM tags WHERE name = ?", (name,))
-        row = cursor.fetchone()
-
-        if not row:
-            return None
-
-        return Tag(
-            tag_id=row['id'],
-            name=row['name'],
-            category=row['category'],
-            color=row['color'],
-            icon=row['icon'],
-            description=row['description'],
-            created_at=datetime.fromisoformat(row['created_at']),
-            is_system=bool(row['is_system']),
-            user_id=row['user_id'] if 'user_id' in row.keys() else None
-        )
-
-    def get_all_tags(self) -> List[Tag]:
-        """Get all tags"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM tags ORDER BY name")
+            if not row:
+                return None
 
-        tags = []
-        for row in cursor.fetchall():
-            tags.append(Tag(
+            return Tag(
                 tag_id=row['id'],
                 name=row['name'],
                 category=row['category'],
@@ -953,34 +1080,19 @@ class Database:
                 created_at=datetime.fromisoformat(row['created_at']),
                 is_system=bool(row['is_system']),
                 user_id=row['user_id'] if 'user_id' in row.keys() else None
-            ))
+            )
 
-        return tags
+    def get_tag_by_name(self, name: str) -> Optional[Tag]:
+        """Get tag by name"""
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM tags WHERE name = ?", (name,))
+            row = cursor.fetchone()
 
-    def get_user_tags(self, user_id: str) -> List[Tag]:
-        """
-        Get tags visible to user:
-        - Tags created by this user (user_id = current user)
-        - All system tags (is_system = 1)
-        - Excludes auto-generated tags that have no user_id and aren't system
-        """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT * FROM tags
-            WHERE user_id = ? OR is_system = 1
-            ORDER BY
-                CASE category
-                    WHEN 'Career Path' THEN 1
-                    WHEN 'Course' THEN 2
-                    WHEN 'Package' THEN 3
-                    ELSE 4
-                END,
-                name
-        """, (user_id,))
-
-        tags = []
-        for row in cursor.fetchall():
-            tags.append(Tag(
+            if not row:
+                return None
+
+            return Tag(
                 tag_id=row['id'],
                 name=row['name'],
                 category=row['category'],
@@ -990,10 +1102,71 @@ class Database:
                 created_at=datetime.fromisoformat(row['created_at']),
                 is_system=bool(row['is_system']),
                 user_id=row['user_id'] if 'user_id' in row.keys() else None
-            ))
+            )
 
-        return tags
+    @cached_read
+    def get_all_tags(self) -> List[Tag]:
+        """Get all tags"""
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM tags ORDER BY name")
 
+            tags = []
+            for row in cursor.fetchall():
+                tags.append(Tag(
+                    tag_id=row['id'],
+                    name=row['name'],
+                    category=row['category'],
+                    color=row['color'],
+                    icon=row['icon'],
+                    description=row['description'],
+                    created_at=datetime.fromisoformat(row['created_at']),
+                    is_system=bool(row['is_system']),
+                    user_id=row['user_id'] if 'user_id' in row.keys() else None
+                ))
+
+            return tags
+
+    @cached_read
+    def get_user_tags(self, user_id: str) -> List[Tag]:
+        """
+        Get tags visible to user:
+        - Tags created by this user (user_id = current user)
+        - All system tags (is_system = 1)
+        - Excludes auto-generated tags that have no user_id and aren't system
+        """
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM tags
+                WHERE user_id = ? OR is_system = 1
+                ORDER BY
+                    CASE category
+                        WHEN 'Career Path' THEN 1
+                        WHEN 'Course' THEN 2
+                        WHEN 'Package' THEN 3
+                        ELSE 4
+                    END,
+                    name
+            """, (user_id,))
+
+            tags = []
+            for row in cursor.fetchall():
+                tags.append(Tag(
+                    tag_id=row['id'],
+                    name=row['name'],
+                    category=row['category'],
+                    color=row['color'],
+                    icon=row['icon'],
+                    description=row['description'],
+                    created_at=datetime.fromisoformat(row['created_at']),
+                    is_system=bool(row['is_system']),
+                    user_id=row['user_id'] if 'user_id' in row.keys() else None
+                ))
+
+            return tags
+
+    @cached_read
     def get_filterable_tags(self, user_id: str) -> List[Tag]:
         """
         Get tags for filtering lessons:
@@ -1003,144 +1176,183 @@ class Database:
         - User-created custom tags only
         - Excludes: System-generated Custom tags, Content category system tags
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT * FROM tags
-            WHERE user_id = ?
-            OR (is_system = 1 AND category IN ('Career Path', 'Course', 'Package'))
-            ORDER BY
-                CASE category
-                    WHEN 'Career Path' THEN 1
-                    WHEN 'Course' THEN 2
-                    WHEN 'Package' THEN 3
-                    ELSE 4
-                END,
-                name
-        """, (user_id,))
-
-        tags = []
-        for row in cursor.fetchall():
-            tags.append(Tag(
-                tag_id=row['id'],
-                name=row['name'],
-                category=row['category'],
-                color=row['color'],
-                icon=row['icon'],
-                description=row['description'],
-                created_at=datetime.fromisoformat(row['created_at']),
-                is_system=bool(row['is_system']),
-                user_id=row['user_id'] if 'user_id' in row.keys() else None
-            ))
-
-        return tags
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM tags
+                WHERE user_id = ?
+                OR (is_system = 1 AND category IN ('Career Path', 'Course', 'Package'))
+                ORDER BY
+                    CASE category
+                        WHEN 'Career Path' THEN 1
+                        WHEN 'Course' THEN 2
+                        WHEN 'Package' THEN 3
+                        ELSE 4
+                    END,
+                    name
+            """, (user_id,))
+
+            tags = []
+            for row in cursor.fetchall():
+                tags.append(Tag(
+                    tag_id=row['id'],
+                    name=row['name'],
+                    category=row['category'],
+                    color=row['color'],
+                    icon=row['icon'],
+                    description=row['description'],
+                    created_at=datetime.fromisoformat(row['created_at']),
+                    is_system=bool(row['is_system']),
+                    user_id=row['user_id'] if 'user_id' in row.keys() else None
+                ))
+
+            return tags
 
     def update_tag(self, tag_id: str, update: TagUpdate) -> bool:
         """Update tag fields"""
-        cursor = self.conn.cursor()
-
-        # Build dynamic UPDATE query based on provided fields
-        fields = []
-        values = []
-
-        if update.name is not None:
-            fields.append("name = ?")
-            values.append(update.name)
-        if update.color is not None:
-            fields.append("color = ?")
-            values.append(update.color)
-        if update.icon is not None:
-            fields.append("icon = ?")
-            values.append(update.icon)
-        if update.description is not None:
-            fields.append("description = ?")
-            values.append(update.description)
-
-        if not fields:
-            return False
-
-        values.append(tag_id)
-        query = f"UPDATE tags SET {', '.join(fields)} WHERE id = ?"
-
-        cursor.execute(query, values)
-        self.conn.commit()
-        return cursor.rowcount > 0
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+
+            # Build dynamic UPDATE query based on provided fields
+            fields = []
+            values = []
+
+            if update.name is not None:
+                fields.append("name = ?")
+                values.append(update.name)
+            if update.color is not None:
+                fields.append("color = ?")
+                values.append(update.color)
+            if update.icon is not None:
+                fields.append("icon = ?")
+                values.append(update.icon)
+            if update.description is not None:
+                fields.append("description = ?")
+                values.append(update.description)
+
+            if not fields:
+                return False
+
+            values.append(tag_id)
+            query = f"UPDATE tags SET {', '.join(fields)} WHERE id = ?"
+
+            cursor.execute(query, values)
+            self.pool.on_commit(bump_data_version)
+            return cursor.rowcount > 0
 
     def delete_tag(self, tag_id: str) -> bool:
         """
         Delete tag (only if not system tag).
         Cascade deletes lesson_tags associations.
         """
-        cursor = self.conn.cursor()
+        with self.transaction() as conn:
+            cursor = conn.cursor()
 
-        # Check if system tag
-        cursor.execute("SELECT is_system FROM tags WHERE id = ?", (tag_id,))
-        row = cursor.fetchone()
+            # Check if system tag
+            cursor.execute("SELECT is_system FROM tags WHERE id = ?", (tag_id,))
+            row = cursor.fetchone()
 
-        if not row:
-            return False
+            if not row:
+                return False
 
-        if row['is_system']:
-            raise ValueError("Cannot delete system tags")
+            if row['is_system']:
+                raise ValueError("Cannot delete system tags")
 
-        # Delete tag (cascade handles lesson_tags)
-        cursor.execute("DELETE FROM tags WHERE id = ?", (tag_id,))
-        self.conn.commit()
-        return cursor.rowcount > 0
+            # Delete tag (cascade handles lesson_tags)
+            cursor.execute("DELETE FROM tags WHERE id = ?", (tag_id,))
+            self.pool.on_commit(bump_catalog_version)
+            self.pool.on_commit(bump_data_version)
+            return cursor.rowcount > 0
 
     def add_tag_to_lesson(self, lesson_id: str, tag_id: str) -> bool:
         """Add tag to lesson (many-to-many)"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO lesson_tags (lesson_id, tag_id, added_at)
-                VALUES (?, ?, ?)
-                """,
-                (lesson_id, tag_id, datetime.utcnow().isoformat())
-            )
-            self.conn.commit()
-            return True
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    INSERT INTO lesson_tags (lesson_id, tag_id, added_at)
+                    VALUES (?, ?, ?)
+                    """,
+                    (lesson_id, tag_id, datetime.utcnow().isoformat())
+                )
+                self.pool.on_commit(bump_catalog_version)
+                return True
         except sqlite3.IntegrityError:
             # Already tagged
             return False
 
     def remove_tag_from_lesson(self, lesson_id: str, tag_id: str) -> bool:
         """Remove tag from lesson"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "DELETE FROM lesson_tags WHERE lesson_id = ? AND tag_id = ?",
-            (lesson_id, tag_id)
-        )
-        self.conn.commit()
-        return cursor.rowcount > 0
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM lesson_tags WHERE lesson_id = ? AND tag_id = ?",
+                (lesson_id, tag_id)
+            )
+            self.pool.on_commit(bump_catalog_version)
+            return cursor.rowcount > 0
 
     def get_lesson_tags(self, lesson_id: str) -> List[Tag]:
         """Get all tags for a lesson"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT t.* FROM tags t
-            JOIN lesson_tags lt ON t.id = lt.tag_id
-            WHERE lt.lesson_id = ?
-            ORDER BY t.name
-            """,
-            (lesson_id,)
-        )
-
-        tags = []
-        for row in cursor.fetchall():
-            tags.append(Tag(
-                tag_id=row['id'],
-                name=row['name'],
-                category=row['category'],
-                color=row['color'],
-                icon=row['icon'],
-                description=row['description'],
-                created_at=datetime.fromisoformat(row['created_at']),
-                is_system=bool(row['is_system'])
-            ))
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT t.* FROM tags t
+                JOIN lesson_tags lt ON t.id = lt.tag_id
+                WHERE lt.lesson_id = ?
+                ORDER BY t.name
+                """,
+                (lesson_id,)
+            )
 
-        return tags
+            tags = []
+            for row in cursor.fetchall():
+                tags.append(Tag(
+                    tag_id=row['id'],
+                    name=row['name'],
+                    category=row['category'],
+                    color=row['color'],
+                    icon=row['icon'],
+                    description=row['description'],
+                    created_at=datetime.fromisoformat(row['created_at']),
+                    is_system=bool(row['is_system'])
+                ))
+
+            return tags
+
+    def get_tags_for_lessons(self, lesson_ids: List[str]) -> Dict[str, List[Tag]]:
+        """Get tags for many lessons, keyed by lesson_id string (every id present)"""
+        ids = list(dict.fromkeys(str(lesson_id) for lesson_id in lesson_ids))
+        tags_by_lesson: Dict[str, List[Tag]] = {lesson_id: [] for lesson_id in ids}
+        with self.reader() as conn:
+            cursor = conn.cursor()
+
+            for chunk in _chunked(ids):
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    f"""
+                    SELECT lt.lesson_id, t.* FROM tags t
+                    JOIN lesson_tags lt ON t.id = lt.tag_id
+                    WHERE lt.lesson_id IN ({placeholders})
+                    ORDER BY t.name
+                    """,
+                    chunk,
+                )
+                for row in cursor.fetchall():
+                    tags_by_lesson[row['lesson_id']].append(Tag(
+                        tag_id=row['id'],
+                        name=row['name'],
+                        category=row['category'],
+                        color=row['color'],
+                        icon=row['icon'],
+                        description=row['description'],
+                        created_at=datetime.fromisoformat(row['created_at']),
+                        is_system=bool(row['is_system'])
+                    ))
+
+            return tags_by_lesson
 
     def get_lessons_by_tags(self, tag_filter: TagFilter) -> List[LessonMetadata]:
         """
@@ -1149,94 +1361,37 @@ class Database:
         If match_all=True: lesson must have ALL specified tags
         If match_all=False: lesson must have ANY of the specified tags
         """
-        if not tag_filter.tag_ids:
-            return self.get_all_lessons_metadata()
-
-        cursor = self.conn.cursor()
-
-        if tag_filter.match_all:
-            # Lesson must have ALL tags
-            placeholders = ','.join(['?' for _ in tag_filter.tag_ids])
-            query = f"""
-                SELECT DISTINCT l.lesson_id, l.domain, l.title, l.difficulty,
-                       l.estimated_time, l.order_index, l.is_core_concept, l.prerequisites
-                FROM lessons l
-                JOIN lesson_tags lt ON l.lesson_id = lt.lesson_id
-                WHERE lt.tag_id IN ({placeholders})
-                GROUP BY l.lesson_id
-                HAVING COUNT(DISTINCT lt.tag_id) = ?
-                ORDER BY l.domain, l.order_index
-            """
-            cursor.execute(query, tag_filter.tag_ids + [len(tag_filter.tag_ids)])
-        else:
-            # Lesson must have ANY tag
-            placeholders = ','.join(['?' for _ in tag_filter.tag_ids])
-            query = f"""
-                SELECT DISTINCT l.lesson_id, l.domain, l.title, l.difficulty,
-                       l.estimated_time, l.order_index, l.is_core_concept, l.prerequisites
-                FROM lessons l
-                JOIN lesson_tags lt ON l.lesson_id = lt.lesson_id
-                WHERE lt.tag_id IN ({placeholders})
-                ORDER BY l.domain, l.order_index
-            """
-            cursor.execute(query, tag_filter.tag_ids)
-
-        lessons = []
-        for row in cursor.fetchall():
-            # Parse prerequisites safely
-            prereqs_raw = json.loads(row["prerequisites"])
-            prereqs = []
-            for p in prereqs_raw:
-                if p and isinstance(p, str):
-                    try:
-                        prereqs.append(UUID(p))
-                    except (ValueError, AttributeError):
-                        continue
-
-            # Get tags for this lesson
-            lesson_tags = self.get_lesson_tags(row["lesson_id"])
-            tag_ids = [tag.tag_id for tag in lesson_tags]
-
-            lessons.append(
-                LessonMetadata(
-                    lesson_id=UUID(row["lesson_id"]),
-                    domain=row["domain"],
-                    title=row["title"],
-                    difficulty=row["difficulty"],
-                    estimated_time=row["estimated_time"],
-                    order_index=row["order_index"],
-                    is_core_concept=bool(row["is_core_concept"]),
-                    prerequisites=prereqs,
-                    tags=tag_ids
-                )
-            )
-
-        return lessons
+        return self.get_lesson_catalog().filter_by_tags(
+            tag_filter.tag_ids, tag_filter.match_all
+        )
 
+    @cached_read
     def get_tag_stats(self) -> Dict[str, int]:
         """Get statistics about tag usage (excluding auto-generated Custom tags)"""
-        cursor = self.conn.cursor()
+        with self.reader() as conn:
+            cursor = conn.cursor()
 
-        stats = {}
+            stats = {}
 
-        # Lesson count per tag (exclude only auto-generated "Custom" category tags)
-        # Show Career Path, Course, Package, Content, and user-created tags
-        cursor.execute("""
-            SELECT t.name, COUNT(lt.lesson_id) as lesson_count
-            FROM tags t
-            LEFT JOIN lesson_tags lt ON t.id = lt.tag_id
-            WHERE t.category != 'Custom' OR t.user_id IS NOT NULL
-            GROUP BY t.id, t.name
-            HAVING lesson_count > 0
-            ORDER BY lesson_count DESC
-        """)
+            # Lesson count per tag (exclude only auto-generated "Custom" category tags)
+            # Show Career Path, Course, Package, Content, and user-created tags
+            cursor.execute("""
+                SELECT t.name, COUNT(lt.lesson_id) as lesson_count
+                FROM tags t
+                LEFT JOIN lesson_tags lt ON t.id = lt.tag_id
+                WHERE t.category != 'Custom' OR t.user_id IS NOT NULL
+                GROUP BY t.id, t.name
+                HAVING lesson_count > 0
+                ORDER BY lesson_count DESC
+            """)
 
-        for row in cursor.fetchall():
-            stats[row['name']] = row['lesson_count']
+            for row in cursor.fetchall():
+                stats[row['name']] = row['lesson_count']
 
-        return stats
+            return stats
 
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        """Release this Database's reference to the shared connection pool"""
+        if not self._closed:
+            self._closed = True
+            release_pool(self.pool)
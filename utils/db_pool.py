@@ -0,0 +1,227 @@
+"""
+Shared SQLite connection pool for CyberLearn.
+
+Every Streamlit session used to open its own connection in rollback-journal
+mode, so one session's write blocked every other session's reads and
+concurrent writers failed with "database is locked". Instead, each database
+file gets one process-wide pool with:
+
+- WAL journaling, synchronous=NORMAL, memory-mapped I/O and a busy timeout
+- a small set of reader connections (WAL readers never block on the writer)
+- a single writer connection serialized by an RLock, used through
+  transaction(), which nests via SAVEPOINTs and commits once at the outermost
+  level
+
+":memory:" databases exist per connection, so they get a private pool whose
+only connection serves both reads and writes.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+
+READ_POOL_SIZE = 4
+BUSY_TIMEOUT_MS = 5000
+MMAP_SIZE = 256 * 1024 * 1024  # 256 MB
+
+_pools: Dict[str, "ConnectionPool"] = {}
+_pools_lock = threading.Lock()
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection with the standard pragmas applied"""
+    conn = sqlite3.connect(
+        db_path,
+        check_same_thread=False,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    return conn
+
+
+class ConnectionPool:
+    """Reader connections plus one serialized writer for a database file"""
+
+    def __init__(self, db_path: str, read_pool_size: int = READ_POOL_SIZE):
+        self.db_path = db_path
+        self.in_memory = db_path == ":memory:"
+        self.refcount = 0
+
+        self.writer = _connect(db_path)
+        if not self.in_memory:
+            self.writer.execute("PRAGMA journal_mode = WAL")
+
+        self.write_lock = threading.RLock()
+        self._depth = 0
+        self._owner: Optional[int] = None
+        self._after_commit: List[Callable[[], None]] = []
+
+        self._read_pool_size = 0 if self.in_memory else read_pool_size
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._readers_created = 0
+        self._readers_lock = threading.Lock()
+
+        # Shared per-database state, set up by the first Database to open it
+        self.schema = None
+        self.has_search_index = False
+        self.initialized = False
+        # Set once the first Database caught up on script-written lessons
+        self.search_index_synced = False
+        self.lesson_blocks_synced = False
+        # Leaderboards whose snapshot is being rebuilt in the background
+        self.leaderboard_rebuilds: Set[str] = set()
+
+    def in_transaction(self) -> bool:
+        """True if the calling thread has an open transaction()"""
+        return self._owner == threading.get_ident()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run writes on the shared writer connection.
+
+        The outermost block begins an IMMEDIATE transaction and commits on
+        exit (rolls back on error). Nested blocks use SAVEPOINTs, so a failed
+        inner block only undoes its own statements.
+        """
+        with self.write_lock:
+            conn = self.writer
+            depth = self._depth
+            savepoint = f"sp_{depth}"
+
+            if depth == 0:
+                # Commit anything left open by code writing through db.conn directly
+                if conn.in_transaction:
+                    conn.commit()
+                conn.execute("BEGIN IMMEDIATE")
+                self._owner = threading.get_ident()
+            else:
+                conn.execute(f"SAVEPOINT {savepoint}")
+
+            self._depth = depth + 1
+            try:
+                yield conn
+            except BaseException:
+                self._depth = depth
+                if depth == 0:
+                    conn.rollback()
+                    self._owner = None
+                    self._after_commit.clear()
+                else:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                raise
+
+            self._depth = depth
+            if depth == 0:
+                conn.commit()
+                self._owner = None
+                callbacks, self._after_commit = self._after_commit, []
+                for callback in callbacks:
+                    callback()
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+
+    @contextmanager
+    def exclusive(self) -> Iterator[sqlite3.Connection]:
+        """
+        The writer connection outside any transaction, for statements that
+        can't run inside one (VACUUM, wal_checkpoint). Blocks other writers.
+        """
+        with self.write_lock:
+            if self._depth:
+                raise RuntimeError("exclusive() can't be used inside transaction()")
+            conn = self.writer
+            # Commit anything left open by code writing through db.conn directly
+            if conn.in_transaction:
+                conn.commit()
+            yield conn
+
+    def on_commit(self, callback: Callable[[], None]):
+        """Run callback after the current transaction commits (now if none)"""
+        with self.write_lock:
+            if self._depth:
+                self._after_commit.append(callback)
+                return
+        callback()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read connection.
+
+        Inside a transaction() on the same thread this yields the writer, so
+        reads see the transaction's own uncommitted writes.
+        """
+        if self.in_transaction() or not self._read_pool_size:
+            with self.write_lock:
+                yield self.writer
+            return
+
+        conn = self._checkout_reader()
+        try:
+            yield conn
+        finally:
+            # Never hand back a connection with an open read transaction
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    def _checkout_reader(self) -> sqlite3.Connection:
+        """Get an idle reader, opening a new one while under the pool size"""
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._readers_lock:
+            if self._readers_created < self._read_pool_size:
+                self._readers_created += 1
+                return _connect(self.db_path)
+
+        return self._readers.get()
+
+    def close(self):
+        """Close every connection in the pool"""
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        self.writer.close()
+
+
+def acquire_pool(db_path: str) -> ConnectionPool:
+    """Get (or create) the shared pool for a database and add a reference"""
+    if db_path == ":memory:":
+        pool = ConnectionPool(db_path)
+        pool.refcount = 1
+        return pool
+
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            _pools[key] = pool
+        pool.refcount += 1
+        return pool
+
+
+def release_pool(pool: ConnectionPool):
+    """Drop a reference; the pool is closed when the last user releases it"""
+    with _pools_lock:
+        pool.refcount -= 1
+        if pool.refcount > 0:
+            return
+        key = os.path.abspath(pool.db_path)
+        if _pools.get(key) is pool:
+            del _pools[key]
+    pool.close()
@@ -0,0 +1,326 @@
+"""
+Incrementally maintained per-domain lesson statistics for CyberLearn.
+
+The dashboard's lesson stats and the domain badges used to aggregate
+lessons JOIN progress on every render. Instead, two tables hold the counts:
+
+- domain_lesson_counts: lessons (and hidden lessons) per domain
+- domain_progress: per user and domain, lessons in progress, completed
+  (completed or mastered) and mastered
+
+Both are kept current by triggers (migration 9), so every writer -
+Database, content sync and the scripts that insert or delete lessons with
+raw SQL - updates them in the same transaction as the row it changes:
+
+- progress insert/update/delete adjusts the user's counters by the status
+  change (the hot path: one indexed upsert)
+- lesson insert/delete/domain change recounts the affected domain, and the
+  counters of users with progress on that lesson
+- lesson hide/unhide recounts the domain's lesson counts
+
+rebuild_domain_stats() recomputes everything from lessons and progress, for
+repairing drift (scripts/rebuild_domain_stats.py).
+"""
+
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Status -> counter expressions; anything else (not_started, needs_review)
+# counts as not started, as the dashboard always has
+def _in_progress(status: str) -> str:
+    return f"({status} = 'in_progress')"
+
+
+def _completed(status: str) -> str:
+    return f"({status} IN ('completed', 'mastered'))"
+
+
+def _mastered(status: str) -> str:
+    return f"({status} = 'mastered')"
+
+
+def _counted(status: str) -> str:
+    return f"{status} IN ('in_progress', 'completed', 'mastered')"
+
+
+def _add_progress_sql(row: str) -> str:
+    """Add progress row NEW/OLD to its user's domain counters"""
+    return f"""
+        INSERT INTO domain_progress
+            (user_id, domain, lessons_in_progress, lessons_completed, lessons_mastered)
+        SELECT {row}.user_id, domain, {_in_progress(f"{row}.status")},
+               {_completed(f"{row}.status")}, {_mastered(f"{row}.status")}
+        FROM lessons WHERE lesson_id = {row}.lesson_id AND {_counted(f"{row}.status")}
+        ON CONFLICT(user_id, domain) DO UPDATE SET
+            lessons_in_progress = lessons_in_progress + excluded.lessons_in_progress,
+            lessons_completed = lessons_completed + excluded.lessons_completed,
+            lessons_mastered = lessons_mastered + excluded.lessons_mastered;
+    """
+
+
+def _remove_progress_sql(row: str) -> str:
+    """Take progress row NEW/OLD out of its user's domain counters"""
+    return f"""
+        UPDATE domain_progress SET
+            lessons_in_progress = lessons_in_progress - {_in_progress(f"{row}.status")},
+            lessons_completed = lessons_completed - {_completed(f"{row}.status")},
+            lessons_mastered = lessons_mastered - {_mastered(f"{row}.status")}
+        WHERE {_counted(f"{row}.status")}
+          AND user_id = {row}.user_id
+          AND domain = (SELECT domain FROM lessons WHERE lesson_id = {row}.lesson_id);
+    """
+
+
+def _recount_lessons_sql(domain: str) -> str:
+    """Recount a domain's lessons"""
+    return f"""
+        INSERT INTO domain_lesson_counts (domain, total_lessons, hidden_lessons)
+        SELECT {domain}, COUNT(*), COALESCE(SUM(hidden), 0) FROM lessons WHERE domain = {domain}
+        ON CONFLICT(domain) DO UPDATE SET
+            total_lessons = excluded.total_lessons,
+            hidden_lessons = excluded.hidden_lessons;
+    """
+
+
+def _recount_users_sql(domain: str, lesson_id: str) -> str:
+    """Recount a domain's counters for every user with progress on a lesson"""
+    return f"""
+        INSERT OR IGNORE INTO domain_progress (user_id, domain)
+        SELECT user_id, {domain} FROM progress WHERE lesson_id = {lesson_id};
+
+        UPDATE domain_progress SET
+            (lessons_in_progress, lessons_completed, lessons_mastered) = (
+                SELECT COALESCE(SUM({_in_progress("p.status")}), 0),
+                       COALESCE(SUM({_completed("p.status")}), 0),
+                       COALESCE(SUM({_mastered("p.status")}), 0)
+                FROM progress p JOIN lessons l ON l.lesson_id = p.lesson_id
+                WHERE p.user_id = domain_progress.user_id AND l.domain = {domain}
+            )
+        WHERE domain = {domain}
+          AND user_id IN (SELECT user_id FROM progress WHERE lesson_id = {lesson_id});
+    """
+
+
+# Recounting on lesson insert (rather than adding) also keeps the counts right
+# after INSERT OR REPLACE, whose implicit delete doesn't fire the delete trigger
+_TRIGGERS = {
+    "domain_stats_progress_insert": f"""
+        AFTER INSERT ON progress
+        BEGIN {_add_progress_sql("NEW")} END
+    """,
+    "domain_stats_progress_update": f"""
+        AFTER UPDATE OF status, user_id, lesson_id ON progress
+        WHEN OLD.status IS NOT NEW.status
+          OR OLD.user_id IS NOT NEW.user_id
+          OR OLD.lesson_id IS NOT NEW.lesson_id
+        BEGIN {_remove_progress_sql("OLD")} {_add_progress_sql("NEW")} END
+    """,
+    "domain_stats_progress_delete": f"""
+        AFTER DELETE ON progress
+        BEGIN {_remove_progress_sql("OLD")} END
+    """,
+    "domain_stats_lesson_insert": f"""
+        AFTER INSERT ON lessons
+        BEGIN
+            {_recount_lessons_sql("NEW.domain")}
+            {_recount_users_sql("NEW.domain", "NEW.lesson_id")}
+        END
+    """,
+    "domain_stats_lesson_delete": f"""
+        AFTER DELETE ON lessons
+        BEGIN
+            {_recount_lessons_sql("OLD.domain")}
+            {_recount_users_sql("OLD.domain", "OLD.lesson_id")}
+        END
+    """,
+    "domain_stats_lesson_domain": f"""
+        AFTER UPDATE OF domain ON lessons
+        WHEN OLD.domain IS NOT NEW.domain
+        BEGIN
+            {_recount_lessons_sql("OLD.domain")}
+            {_recount_lessons_sql("NEW.domain")}
+            {_recount_users_sql("OLD.domain", "NEW.lesson_id")}
+            {_recount_users_sql("NEW.domain", "NEW.lesson_id")}
+        END
+    """,
+    "domain_stats_lesson_hidden": f"""
+        AFTER UPDATE OF hidden ON lessons
+        WHEN OLD.hidden IS NOT NEW.hidden
+        BEGIN {_recount_lessons_sql("NEW.domain")} END
+    """,
+}
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def ensure_domain_stats(conn: sqlite3.Connection):
+    """Create the counter columns, domain_lesson_counts and the triggers"""
+    if "lessons_in_progress" not in _columns(conn, "domain_progress"):
+        conn.execute(
+            "ALTER TABLE domain_progress ADD COLUMN lessons_in_progress INTEGER DEFAULT 0"
+        )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS domain_lesson_counts (
+            domain TEXT PRIMARY KEY,
+            total_lessons INTEGER NOT NULL DEFAULT 0,
+            hidden_lessons INTEGER NOT NULL DEFAULT 0
+        )
+    """
+    )
+    # Lesson triggers look up the users with progress on a lesson
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_progress_lesson ON progress(lesson_id)")
+
+    for name, body in _TRIGGERS.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+def rebuild_domain_stats(conn: sqlite3.Connection, user_ids: Optional[Iterable[str]] = None):
+    """
+    Recompute domain_lesson_counts and the domain_progress counters.
+
+    user_ids=None rebuilds every user. Other domain_progress columns
+    (skill_level, started_at, ...) are kept. Does not commit.
+    """
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM domain_lesson_counts")
+    cursor.execute(
+        """
+        INSERT INTO domain_lesson_counts (domain, total_lessons, hidden_lessons)
+        SELECT domain, COUNT(*), COALESCE(SUM(hidden), 0) FROM lessons GROUP BY domain
+        """
+    )
+
+    reset = "UPDATE domain_progress SET lessons_in_progress = 0, lessons_completed = 0, lessons_mastered = 0"
+    recount = f"""
+        INSERT INTO domain_progress
+            (user_id, domain, lessons_in_progress, lessons_completed, lessons_mastered)
+        SELECT p.user_id, l.domain,
+               SUM({_in_progress("p.status")}), SUM({_completed("p.status")}),
+               SUM({_mastered("p.status")})
+        FROM progress p JOIN lessons l ON l.lesson_id = p.lesson_id
+        WHERE {{where}}
+        GROUP BY p.user_id, l.domain
+        ON CONFLICT(user_id, domain) DO UPDATE SET
+            lessons_in_progress = excluded.lessons_in_progress,
+            lessons_completed = excluded.lessons_completed,
+            lessons_mastered = excluded.lessons_mastered
+    """
+
+    if user_ids is None:
+        cursor.execute(reset)
+        cursor.execute(recount.format(where=_counted("p.status")))
+        return
+
+    ids = [str(user_id) for user_id in user_ids]
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(f"{reset} WHERE user_id IN ({placeholders})", chunk)
+        cursor.execute(
+            recount.format(where=f"{_counted('p.status')} AND p.user_id IN ({placeholders})"),
+            chunk,
+        )
+
+
+def find_domain_stats_drift(conn: sqlite3.Connection) -> List[Tuple[Optional[str], str]]:
+    """
+    (user_id, domain) pairs whose stored counters differ from a recount.
+
+    user_id is None for a domain whose lesson counts are off.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT domain FROM (
+            SELECT domain, COUNT(*), COALESCE(SUM(hidden), 0) FROM lessons GROUP BY domain
+            EXCEPT
+            SELECT domain, total_lessons, hidden_lessons FROM domain_lesson_counts
+        )
+        UNION
+        SELECT domain FROM (
+            SELECT domain, total_lessons, hidden_lessons FROM domain_lesson_counts
+            WHERE total_lessons != 0
+            EXCEPT
+            SELECT domain, COUNT(*), COALESCE(SUM(hidden), 0) FROM lessons GROUP BY domain
+        )
+        """
+    )
+    drift = [(None, row[0]) for row in cursor.fetchall()]
+
+    expected = f"""
+        SELECT p.user_id, l.domain,
+               SUM({_in_progress("p.status")}), SUM({_completed("p.status")}),
+               SUM({_mastered("p.status")})
+        FROM progress p JOIN lessons l ON l.lesson_id = p.lesson_id
+        WHERE {_counted("p.status")}
+        GROUP BY p.user_id, l.domain
+    """
+    stored = """
+        SELECT user_id, domain, lessons_in_progress, lessons_completed, lessons_mastered
+        FROM domain_progress
+    """
+    cursor.execute(
+        f"""
+        SELECT user_id, domain FROM ({expected} EXCEPT {stored})
+        UNION
+        SELECT user_id, domain FROM (
+            {stored}
+            WHERE lessons_in_progress != 0 OR lessons_completed != 0 OR lessons_mastered != 0
+            EXCEPT {expected}
+        )
+        """
+    )
+    drift.extend((row[0], row[1]) for row in cursor.fetchall())
+    return drift
+
+
+def get_domain_stats(conn: sqlite3.Connection, user_id: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Lesson stats per domain, from the precomputed counters.
+
+    Same shape as Database.get_lesson_stats_by_domain(); the user fields
+    stay 0 without a user_id.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT domain, total_lessons, hidden_lessons FROM domain_lesson_counts
+        WHERE total_lessons > 0 ORDER BY domain
+        """
+    )
+    stats = {
+        row[0]: {
+            'total': row[1],
+            'visible': row[1] - row[2],
+            'completed': 0,
+            'mastered': 0,
+            'in_progress': 0,
+            'not_started': 0,
+        }
+        for row in cursor.fetchall()
+    }
+
+    if user_id:
+        cursor.execute(
+            """
+            SELECT domain, lessons_in_progress, lessons_completed, lessons_mastered
+            FROM domain_progress WHERE user_id = ?
+            """,
+            (str(user_id),),
+        )
+        for domain, in_progress, completed, mastered in cursor.fetchall():
+            if domain in stats:
+                stats[domain]['in_progress'] = in_progress or 0
+                stats[domain]['completed'] = completed or 0
+                stats[domain]['mastered'] = mastered or 0
+
+        for domain_stats in stats.values():
+            domain_stats['not_started'] = (
+                domain_stats['total'] - domain_stats['completed'] - domain_stats['in_progress']
+            )
+
+    return stats
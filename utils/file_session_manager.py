@@ -1,34 +1,33 @@
 """
-File-based Session Manager for Streamlit
-Stores session tokens in a local JSON file keyed by browser fingerprint
-This is the ONLY reliable way to persist sessions across page refreshes in Streamlit
+Browser-fingerprint Session Manager for Streamlit
+Stores session tokens keyed by browser fingerprint in the shared session store
+(utils/session_store.py), so sessions survive page refreshes
 """
 
 import streamlit as st
-import json
-import hashlib
-from pathlib import Path
-from datetime import datetime, timedelta
+from typing import Optional
+
+from utils.session_store import SessionStore, get_session_store
 
 
 class FileSessionManager:
     """
-    Manages sessions using a local JSON file for persistence.
+    Manages sessions keyed by a stable browser fingerprint.
 
-    Uses Streamlit's experimental_get_query_params to generate a stable
-    browser fingerprint from the initial connection info.
+    Records used to live in data/browser_sessions.json; they are now kept in
+    a SessionStore (SQLite by default), which other session managers can share.
     """
 
-    def __init__(self, db):
+    def __init__(self, db, store: Optional[SessionStore] = None):
         """
         Initialize session manager
 
         Args:
             db: Database instance
+            store: Session store to use (default: get_session_store(db), SQLite)
         """
         self.db = db
-        self.sessions_file = Path("data/browser_sessions.json")
-        self.sessions_file.parent.mkdir(exist_ok=True)
+        self.store = store or get_session_store(db)
 
         # Generate stable browser fingerprint
         if "_browser_fingerprint" not in st.session_state:
@@ -51,21 +50,6 @@ class FileSessionManager:
                 import secrets
                 st.session_state._browser_fingerprint = secrets.token_urlsafe(16)
 
-    def _load_sessions(self) -> dict:
-        """Load all sessions from file"""
-        if self.sessions_file.exists():
-            try:
-                with open(self.sessions_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-
-    def _save_sessions(self, sessions: dict):
-        """Save all sessions to file"""
-        with open(self.sessions_file, 'w') as f:
-            json.dump(sessions, f, indent=2)
-
     def create_session(self, user_id: str, auth_manager) -> str:
         """
         Create a new session for the user
@@ -80,17 +64,9 @@ class FileSessionManager:
         # Create session in database
         session_token = auth_manager.create_session(user_id)
 
-        # Store in file keyed by browser fingerprint
-        sessions = self._load_sessions()
+        # Store keyed by browser fingerprint
         fingerprint = st.session_state._browser_fingerprint
-
-        sessions[fingerprint] = {
-            "token": session_token,
-            "user_id": str(user_id),  # Convert UUID to string for JSON
-            "created_at": datetime.utcnow().isoformat()
-        }
-
-        self._save_sessions(sessions)
+        self.store.put(fingerprint, session_token, user_id)
 
         # Also store in session state for current tab
         st.session_state._current_session_token = session_token
@@ -112,19 +88,18 @@ class FileSessionManager:
                 print(f"[FileSessionManager] Using cached session from tab state")
                 return st.session_state._current_session_token
 
-        # Load from file using browser fingerprint
-        sessions = self._load_sessions()
+        # Look up the store using browser fingerprint
         fingerprint = st.session_state._browser_fingerprint
+        session_data = self.store.get(fingerprint)
 
-        if fingerprint in sessions:
-            session_data = sessions[fingerprint]
+        if session_data:
             token = session_data["token"]
 
             # Cache in session state
             st.session_state._current_session_token = token
             st.session_state._session_validated = True
 
-            print(f"[FileSessionManager] Loaded session from file for fingerprint {fingerprint[:16]}...")
+            print(f"[FileSessionManager] Loaded session from store for fingerprint {fingerprint[:16]}...")
             return token
 
         print(f"[FileSessionManager] No session found for fingerprint {fingerprint[:16]}...")
@@ -142,14 +117,11 @@ class FileSessionManager:
             auth_manager.revoke_session(st.session_state._current_session_token)
             print(f"[FileSessionManager] Revoked session from database")
 
-        # Remove from file
-        sessions = self._load_sessions()
+        # Remove from store
         fingerprint = st.session_state._browser_fingerprint
 
-        if fingerprint in sessions:
-            del sessions[fingerprint]
-            self._save_sessions(sessions)
-            print(f"[FileSessionManager] Removed session from file")
+        if self.store.delete(fingerprint):
+            print(f"[FileSessionManager] Removed session from store")
 
         # Clear from tab state
         st.session_state._current_session_token = None
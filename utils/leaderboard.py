@@ -0,0 +1,198 @@
+"""
+SQLite-backed leaderboards for CyberLearn.
+
+GamificationEngine ranked users by sorting lists of UserProfile, which meant
+loading and validating every user first. Leaderboards are computed in SQL
+instead:
+
+- users.total_xp, streak_days and total_lessons_completed are indexed, so a
+  live rank is one index range count and a top page is an index walk
+- leaderboard_snapshot materializes every board with RANK() (shared rank for
+  ties) and a dense position for paging, keyed by (board, position) and
+  (board, user_id). Rank and "around me" lookups read it with two index
+  probes. The leaderboards maintenance job rebuilds stale snapshots, and a
+  reader that finds one older than SNAPSHOT_TTL starts a background rebuild.
+  Readers never rebuild in their own request: they are served the previous
+  snapshot until the new one commits, so heavy traffic costs at most one
+  rebuild per TTL.
+
+Snapshots lag writes by about SNAPSHOT_TTL (more while a rebuild runs);
+live_rank() is exact.
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+
+# Board name -> users column
+BOARDS = {
+    "xp": "total_xp",
+    "streak": "streak_days",
+    "lessons": "total_lessons_completed",
+}
+
+SNAPSHOT_TTL = timedelta(seconds=60)
+
+
+def _column(board: str) -> str:
+    try:
+        return BOARDS[board]
+    except KeyError:
+        raise ValueError(f"Unknown leaderboard: {board}") from None
+
+
+def ensure_leaderboard_tables(conn: sqlite3.Connection):
+    """Create the board indexes and snapshot tables"""
+    for column in BOARDS.values():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_users_{column} ON users({column})")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_snapshot (
+            board TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            user_id TEXT NOT NULL,
+            username TEXT NOT NULL,
+            value INTEGER NOT NULL,
+            PRIMARY KEY (board, position)
+        )
+    """
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_leaderboard_snapshot_user "
+        "ON leaderboard_snapshot(board, user_id)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_snapshot_info (
+            board TEXT PRIMARY KEY,
+            built_at TEXT NOT NULL,
+            total_users INTEGER NOT NULL
+        )
+    """
+    )
+
+
+def snapshot_age(conn: sqlite3.Connection, board: str, now: Optional[datetime] = None) -> Optional[timedelta]:
+    """Age of a board's snapshot (None if it was never built)"""
+    row = conn.execute(
+        "SELECT built_at FROM leaderboard_snapshot_info WHERE board = ?", (board,)
+    ).fetchone()
+    if not row:
+        return None
+    return (now or datetime.now()) - datetime.fromisoformat(row[0])
+
+
+def is_snapshot_fresh(conn: sqlite3.Connection, board: str, ttl: timedelta = SNAPSHOT_TTL) -> bool:
+    age = snapshot_age(conn, board)
+    return age is not None and age < ttl
+
+
+def refresh_snapshot(conn: sqlite3.Connection, board: str):
+    """Rebuild one board's snapshot. Does not commit."""
+    column = _column(board)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM leaderboard_snapshot WHERE board = ?", (board,))
+    cursor.execute(
+        f"""
+        INSERT INTO leaderboard_snapshot (board, position, rank, user_id, username, value)
+        SELECT ?,
+               ROW_NUMBER() OVER (ORDER BY {column} DESC, username, user_id),
+               RANK() OVER (ORDER BY {column} DESC),
+               user_id, username, COALESCE({column}, 0)
+        FROM users
+        """,
+        (board,),
+    )
+    total = cursor.rowcount
+    cursor.execute(
+        """
+        INSERT INTO leaderboard_snapshot_info (board, built_at, total_users) VALUES (?, ?, ?)
+        ON CONFLICT(board) DO UPDATE SET
+            built_at = excluded.built_at, total_users = excluded.total_users
+        """,
+        (board, datetime.now().isoformat(), total),
+    )
+
+
+def _entry(row) -> Dict:
+    return {
+        "position": row["position"],
+        "rank": row["rank"],
+        "user_id": row["user_id"],
+        "username": row["username"],
+        "value": row["value"],
+    }
+
+
+def get_page(conn: sqlite3.Connection, board: str, limit: int = 10, offset: int = 0) -> List[Dict]:
+    """Snapshot rows offset+1 .. offset+limit, best first"""
+    _column(board)
+    cursor = conn.execute(
+        """
+        SELECT * FROM leaderboard_snapshot
+        WHERE board = ? AND position > ? AND position <= ?
+        ORDER BY position
+        """,
+        (board, offset, offset + limit),
+    )
+    return [_entry(row) for row in cursor.fetchall()]
+
+
+def get_around(conn: sqlite3.Connection, board: str, user_id: str, radius: int = 5) -> List[Dict]:
+    """Snapshot rows from radius places above the user to radius below"""
+    _column(board)
+    row = conn.execute(
+        "SELECT position FROM leaderboard_snapshot WHERE board = ? AND user_id = ?",
+        (board, user_id),
+    ).fetchone()
+    if not row:
+        return []
+    position = row[0]
+    cursor = conn.execute(
+        """
+        SELECT * FROM leaderboard_snapshot
+        WHERE board = ? AND position BETWEEN ? AND ?
+        ORDER BY position
+        """,
+        (board, position - radius, position + radius),
+    )
+    return [_entry(row) for row in cursor.fetchall()]
+
+
+def _rank_result(rank: int, value: int, total: int) -> Dict:
+    return {
+        "rank": rank,
+        "value": value,
+        "total_users": total,
+        "percentile": round((total - rank + 1) / total * 100, 1) if total else 100.0,
+    }
+
+
+def get_rank(conn: sqlite3.Connection, board: str, user_id: str) -> Optional[Dict]:
+    """A user's rank from the snapshot (None if the user isn't in it)"""
+    _column(board)
+    row = conn.execute(
+        """
+        SELECT s.rank, s.value, i.total_users
+        FROM leaderboard_snapshot s JOIN leaderboard_snapshot_info i ON i.board = s.board
+        WHERE s.board = ? AND s.user_id = ?
+        """,
+        (board, user_id),
+    ).fetchone()
+    if not row:
+        return None
+    return _rank_result(row[0], row[1], row[2])
+
+
+def live_rank(conn: sqlite3.Connection, board: str, user_id: str) -> Optional[Dict]:
+    """A user's exact current rank, counted through the column index"""
+    column = _column(board)
+    row = conn.execute(f"SELECT COALESCE({column}, 0) FROM users WHERE user_id = ?", (user_id,)).fetchone()
+    if not row:
+        return None
+    value = row[0]
+    ahead = conn.execute(f"SELECT COUNT(*) FROM users WHERE {column} > ?", (value,)).fetchone()[0]
+    total = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    return _rank_result(ahead + 1, value, total)
@@ -0,0 +1,129 @@
+"""
+Per-block lesson content storage for CyberLearn.
+
+The lesson viewer shows one content block at a time, so loading the whole
+content_blocks JSON blob (up to ~100 KB) and validating every ContentBlock on
+each page view is wasted work. lesson_blocks keeps one row per block, keyed
+by (lesson_id, block_index), so a block is one small indexed read.
+
+Like the search index, the table is derived from lessons.content_blocks.
+Database.create_lesson/upsert_lessons keep it current; lessons changed by
+other writers are detected by lesson_id/updated_at and re-split when the
+next Database is opened, so anything that rewrites content_blocks with raw
+SQL must also set updated_at (or call refresh_lesson_blocks itself).
+"""
+
+import json
+import sqlite3
+from typing import Iterable, List, Optional
+
+
+def ensure_lesson_blocks_table(conn: sqlite3.Connection):
+    """Create the lesson_blocks table"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lesson_blocks (
+            lesson_id TEXT NOT NULL,
+            block_index INTEGER NOT NULL,
+            block_id TEXT,
+            type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (lesson_id, block_index)
+        )
+    """
+    )
+
+
+def refresh_lesson_blocks(conn: sqlite3.Connection, lesson_ids: Optional[Iterable[str]] = None):
+    """
+    Re-split lessons' content_blocks into lesson_blocks rows.
+
+    lesson_ids=None rebuilds every lesson. Ids that no longer exist in the
+    lessons table lose their blocks. Does not commit.
+    """
+    cursor = conn.cursor()
+    query = "SELECT lesson_id, updated_at, content_blocks FROM lessons"
+
+    if lesson_ids is None:
+        cursor.execute("DELETE FROM lesson_blocks")
+        cursor.execute(query)
+        rows = cursor.fetchall()
+    else:
+        ids = [str(lesson_id) for lesson_id in lesson_ids]
+        rows = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"DELETE FROM lesson_blocks WHERE lesson_id IN ({placeholders})", chunk)
+            cursor.execute(f"{query} WHERE lesson_id IN ({placeholders})", chunk)
+            rows.extend(cursor.fetchall())
+
+    block_rows = []
+    for lesson_id, updated_at, raw_blocks in rows:
+        try:
+            blocks = json.loads(raw_blocks or "[]")
+        except (TypeError, ValueError):
+            continue
+        for index, block in enumerate(blocks):
+            block_rows.append((
+                lesson_id,
+                index,
+                block.get("block_id"),
+                block.get("type", ""),
+                json.dumps(block),
+                updated_at,
+            ))
+
+    cursor.executemany(
+        """
+        INSERT INTO lesson_blocks (lesson_id, block_index, block_id, type, payload, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        block_rows,
+    )
+
+
+def find_stale_block_lessons(conn: sqlite3.Connection) -> List[str]:
+    """Lesson ids whose blocks are missing, outdated or orphaned"""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT lesson_id FROM (
+            SELECT lesson_id, updated_at FROM lessons
+            WHERE content_blocks IS NOT NULL AND content_blocks != '[]'
+            EXCEPT
+            SELECT lesson_id, updated_at FROM lesson_blocks WHERE block_index = 0
+        )
+        UNION
+        SELECT lesson_id FROM (
+            SELECT lesson_id, updated_at FROM lesson_blocks WHERE block_index = 0
+            EXCEPT
+            SELECT lesson_id, updated_at FROM lessons
+        )
+        """
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_block_payloads(
+    conn: sqlite3.Connection, lesson_id: str, start_index: int = 0, count: int = 1
+) -> List[str]:
+    """Raw JSON of blocks start_index .. start_index + count - 1, in order"""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT payload FROM lesson_blocks
+        WHERE lesson_id = ? AND block_index >= ? AND block_index < ?
+        ORDER BY block_index
+        """,
+        (str(lesson_id), start_index, start_index + count),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def count_blocks(conn: sqlite3.Connection, lesson_id: str) -> int:
+    """Number of content blocks stored for a lesson"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM lesson_blocks WHERE lesson_id = ?", (str(lesson_id),))
+    return cursor.fetchone()[0]
@@ -0,0 +1,237 @@
+"""
+Process-wide lesson catalog for CyberLearn.
+
+Lesson metadata, the tag-to-lesson mapping and per-domain counts are loaded
+once per process and shared by every Streamlit session. The catalog is
+invalidated by a version counter that the Database write methods bump, so
+most page renders become dictionary lookups instead of SQL + pydantic work.
+
+Writes by other processes (scripts, other server workers) don't bump that
+counter. For those, triggers on lessons, lesson_tags, lesson_prerequisites
+and tags bump the version row in catalog_state, and get_catalog() compares
+it with the one the catalog was built from on every call (a primary-key
+read on the caller's connection, a few microseconds). utils/read_cache.py
+stamps its entries with the same row.
+
+Catalog objects are shared between sessions - treat them as read-only.
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+
+from models.lesson import LessonMetadata, LessonCard
+from utils.prerequisite_graph import load_prerequisite_edges
+
+
+_version_lock = threading.Lock()
+_build_lock = threading.Lock()
+_catalog_version = 0
+_catalogs: Dict[str, "LessonCatalog"] = {}
+
+_BUMP_SQL = "UPDATE catalog_state SET version = version + 1;"
+
+# Every change to what LessonCatalog.load() reads, plus tags (for read_cache)
+_TRIGGERS = {
+    "catalog_lesson_insert": f"AFTER INSERT ON lessons BEGIN {_BUMP_SQL} END",
+    "catalog_lesson_delete": f"AFTER DELETE ON lessons BEGIN {_BUMP_SQL} END",
+    "catalog_lesson_update": f"""
+        AFTER UPDATE OF lesson_id, domain, title, subtitle, difficulty,
+            estimated_time, order_index, is_core_concept, hidden,
+            base_xp_reward, learning_objectives
+        ON lessons BEGIN {_BUMP_SQL} END
+    """,
+    "catalog_lesson_tag_insert": f"AFTER INSERT ON lesson_tags BEGIN {_BUMP_SQL} END",
+    "catalog_lesson_tag_delete": f"AFTER DELETE ON lesson_tags BEGIN {_BUMP_SQL} END",
+    "catalog_lesson_tag_update": f"AFTER UPDATE ON lesson_tags BEGIN {_BUMP_SQL} END",
+    "catalog_prerequisite_insert": f"AFTER INSERT ON lesson_prerequisites BEGIN {_BUMP_SQL} END",
+    "catalog_prerequisite_delete": f"AFTER DELETE ON lesson_prerequisites BEGIN {_BUMP_SQL} END",
+    "catalog_tag_insert": f"AFTER INSERT ON tags BEGIN {_BUMP_SQL} END",
+    "catalog_tag_delete": f"AFTER DELETE ON tags BEGIN {_BUMP_SQL} END",
+    "catalog_tag_update": f"AFTER UPDATE ON tags BEGIN {_BUMP_SQL} END",
+}
+
+
+def ensure_catalog_state(conn: sqlite3.Connection):
+    """Create the catalog_state version row and the triggers that bump it"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalog_state (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            version INTEGER NOT NULL
+        )
+    """
+    )
+    conn.execute("INSERT OR IGNORE INTO catalog_state (id, version) VALUES (0, 0)")
+    for name, body in _TRIGGERS.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+def get_stored_catalog_version(conn: sqlite3.Connection) -> Optional[int]:
+    """The catalog_state version (None before ensure_catalog_state() has run)"""
+    try:
+        row = conn.execute("SELECT version FROM catalog_state WHERE id = 0").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def bump_catalog_version() -> int:
+    """Invalidate every cached catalog (call after any lesson/tag write)"""
+    global _catalog_version
+    with _version_lock:
+        _catalog_version += 1
+        return _catalog_version
+
+
+def get_catalog_version() -> int:
+    """Current catalog version number"""
+    return _catalog_version
+
+
+class LessonCatalog:
+    """Immutable in-memory snapshot of lesson metadata and tag assignments"""
+
+    def __init__(
+        self,
+        version: int,
+        lessons: List[LessonMetadata],
+        hidden_ids: Set[UUID],
+        cards: Optional[Dict[UUID, LessonCard]] = None,
+        stored_version: Optional[int] = None,
+    ):
+        self.version = version
+        self.stored_version = stored_version  # catalog_state version at load
+        self.lessons = lessons  # All lessons, ordered by domain, order_index
+        self.hidden_ids = hidden_ids
+        self.by_id: Dict[UUID, LessonMetadata] = {l.lesson_id: l for l in lessons}
+        self.cards: Dict[UUID, LessonCard] = cards or {}
+
+        self.by_domain: Dict[str, List[LessonMetadata]] = {}
+        self.visible_by_domain: Dict[str, List[LessonMetadata]] = {}
+        self.tag_lessons: Dict[str, Set[UUID]] = {}
+        self.domain_counts: Dict[str, int] = {}
+
+        for lesson in lessons:
+            self.by_domain.setdefault(lesson.domain, []).append(lesson)
+            self.domain_counts[lesson.domain] = self.domain_counts.get(lesson.domain, 0) + 1
+            if lesson.lesson_id not in hidden_ids:
+                self.visible_by_domain.setdefault(lesson.domain, []).append(lesson)
+            for tag_id in lesson.tags:
+                self.tag_lessons.setdefault(tag_id, set()).add(lesson.lesson_id)
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection, version: int) -> "LessonCatalog":
+        """Build a catalog from the lessons and lesson_tags tables"""
+        # Read first: a write landing during the load only causes a reload
+        stored_version = get_stored_catalog_version(conn)
+        cursor = conn.cursor()
+
+        lesson_tags: Dict[str, List[str]] = {}
+        cursor.execute("SELECT lesson_id, tag_id FROM lesson_tags ORDER BY added_at")
+        for lesson_id, tag_id in cursor.fetchall():
+            lesson_tags.setdefault(lesson_id, []).append(tag_id)
+
+        # Resolved prerequisite ids (see utils/prerequisite_graph.py)
+        prerequisites = load_prerequisite_edges(conn)
+
+        cursor.execute(
+            """
+            SELECT lesson_id, domain, title, difficulty, estimated_time,
+                   order_index, is_core_concept, hidden,
+                   subtitle, base_xp_reward, learning_objectives
+            FROM lessons ORDER BY domain, order_index
+        """
+        )
+
+        lessons = []
+        hidden_ids = set()
+        cards = {}
+        for row in cursor.fetchall():
+            lesson_id = UUID(row[0])
+            tags = lesson_tags.get(row[0], [])
+            lessons.append(
+                LessonMetadata(
+                    lesson_id=lesson_id,
+                    domain=row[1],
+                    title=row[2],
+                    difficulty=row[3],
+                    estimated_time=row[4],
+                    order_index=row[5],
+                    is_core_concept=bool(row[6]),
+                    prerequisites=[UUID(p) for p in prerequisites.get(row[0], ())],
+                    tags=tags,
+                )
+            )
+            cards[lesson_id] = LessonCard(
+                lesson_id=lesson_id,
+                domain=row[1],
+                title=row[2],
+                subtitle=row[8],
+                difficulty=row[3],
+                estimated_time=row[4],
+                order_index=row[5],
+                is_core_concept=bool(row[6]),
+                base_xp_reward=row[9] if row[9] is not None else 100,
+                learning_objectives=json.loads(row[10] or "[]"),
+                tags=tags,
+            )
+            if row[7]:
+                hidden_ids.add(lesson_id)
+
+        return cls(version, lessons, hidden_ids, cards, stored_version)
+
+    def get_domain(self, domain: str, include_hidden: bool = False) -> List[LessonMetadata]:
+        """Lessons for a domain in order_index order"""
+        source = self.by_domain if include_hidden else self.visible_by_domain
+        return list(source.get(domain, []))
+
+    def get_domain_cards(self, domain: str, include_hidden: bool = False) -> List[LessonCard]:
+        """Display cards for a domain in order_index order"""
+        return [self.cards[l.lesson_id] for l in self.get_domain(domain, include_hidden)]
+
+    def filter_by_tags(self, tag_ids: List[str], match_all: bool = False) -> List[LessonMetadata]:
+        """Lessons carrying ALL (match_all) or ANY of the given tags"""
+        tag_sets = [self.tag_lessons.get(tag_id, set()) for tag_id in tag_ids]
+        if not tag_sets:
+            return list(self.lessons)
+
+        if match_all:
+            matching = set.intersection(*tag_sets)
+        else:
+            matching = set.union(*tag_sets)
+
+        return [lesson for lesson in self.lessons if lesson.lesson_id in matching]
+
+
+def get_catalog(conn: sqlite3.Connection, db_path: str) -> LessonCatalog:
+    """Return the shared catalog for a database, rebuilding it if stale"""
+    version = _catalog_version
+    catalog = _catalogs.get(db_path)
+    if (
+        catalog is not None
+        and catalog.version == version
+        and catalog.stored_version == get_stored_catalog_version(conn)
+    ):
+        return catalog
+
+    with _build_lock:
+        # Another session may have rebuilt it while we waited
+        version = _catalog_version
+        catalog = _catalogs.get(db_path)
+        if (
+            catalog is not None
+            and catalog.version == version
+            and catalog.stored_version != get_stored_catalog_version(conn)
+        ):
+            # Changed by another process. Bumped so caches stamped with the
+            # catalog version (read_cache, next-lesson recommendations) drop
+            # their entries too
+            version = bump_catalog_version()
+        if catalog is None or catalog.version != version:
+            catalog = LessonCatalog.load(conn, version)
+            _catalogs[db_path] = catalog
+
+    return catalog
@@ -0,0 +1,284 @@
+"""
+Full-text lesson search for CyberLearn.
+
+Maintains an SQLite FTS5 index (lessons_fts) over lesson title, subtitle,
+learning objectives, content block text and assessment text, and runs
+BM25-ranked prefix searches against it. Falls back to LIKE matching when the
+SQLite build has no FTS5 support.
+
+The index is derived from the lessons table. Database.create_lesson keeps it
+current; lessons changed by other writers (the sync/update scripts use raw
+SQL) are detected by lesson_id/updated_at and re-indexed when the next
+Database is opened.
+"""
+
+import json
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# Column weights for bm25(): lesson_id and updated_at (unindexed), title,
+# subtitle, objectives, content, assessment
+BM25_WEIGHTS = (0.0, 0.0, 10.0, 5.0, 4.0, 1.0, 2.0)
+
+# Structural keys inside content/question JSON that hold no searchable text
+_SKIP_KEYS = {"block_id", "question_id", "type", "correct_answer", "difficulty", "points", "xp_reward"}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# snippet() re-tokenizes the whole document, so only the top hits get one
+DEFAULT_SNIPPET_COUNT = 10
+
+
+def ensure_search_index(conn: sqlite3.Connection) -> bool:
+    """Create the FTS5 table if needed. Returns False if FTS5 is unavailable."""
+    try:
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS lessons_fts USING fts5(
+                lesson_id UNINDEXED,
+                updated_at UNINDEXED,
+                title,
+                subtitle,
+                objectives,
+                content,
+                assessment,
+                tokenize = 'porter unicode61'
+            )
+        """
+        )
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _collect_text(value: Any, parts: List[str]):
+    """Append every string leaf of a JSON value to parts"""
+    if isinstance(value, str):
+        if value.strip():
+            parts.append(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key not in _SKIP_KEYS:
+                _collect_text(item, parts)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_text(item, parts)
+
+
+def _json_text(raw: Optional[str]) -> str:
+    """Extract searchable text from a stored JSON column"""
+    if not raw:
+        return ""
+    try:
+        value = json.loads(raw)
+    except (TypeError, ValueError):
+        return ""
+    parts = []
+    _collect_text(value, parts)
+    return "\n".join(parts)
+
+
+def refresh_search_index(conn: sqlite3.Connection, lesson_ids: Optional[Iterable[str]] = None):
+    """
+    Re-index lessons from the lessons table.
+
+    lesson_ids=None rebuilds the whole index. Ids that no longer exist in the
+    lessons table are removed from the index. Does not commit.
+    """
+    cursor = conn.cursor()
+    query = """
+        SELECT lesson_id, updated_at, title, subtitle, learning_objectives,
+               content_blocks, pre_assessment, post_assessment
+        FROM lessons
+    """
+
+    if lesson_ids is None:
+        cursor.execute("DELETE FROM lessons_fts")
+        cursor.execute(query)
+        rows = cursor.fetchall()
+    else:
+        ids = [str(lesson_id) for lesson_id in lesson_ids]
+        rows = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"DELETE FROM lessons_fts WHERE lesson_id IN ({placeholders})", chunk)
+            cursor.execute(f"{query} WHERE lesson_id IN ({placeholders})", chunk)
+            rows.extend(cursor.fetchall())
+
+    cursor.executemany(
+        """
+        INSERT INTO lessons_fts (
+            lesson_id, updated_at, title, subtitle, objectives, content, assessment
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                row[0],
+                row[1],
+                row[2],
+                row[3] or "",
+                _json_text(row[4]),
+                _json_text(row[5]),
+                "\n".join(filter(None, [_json_text(row[6]), _json_text(row[7])])),
+            )
+            for row in rows
+        ],
+    )
+
+
+def find_stale_lessons(conn: sqlite3.Connection) -> List[str]:
+    """Lesson ids whose index entry is missing, outdated or orphaned"""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT lesson_id FROM (
+            SELECT lesson_id, updated_at FROM lessons
+            EXCEPT
+            SELECT lesson_id, updated_at FROM lessons_fts
+        )
+        UNION
+        SELECT lesson_id FROM (
+            SELECT lesson_id, updated_at FROM lessons_fts
+            EXCEPT
+            SELECT lesson_id, updated_at FROM lessons
+        )
+    """
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def build_match_query(search_text: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term ("kerb"*), so FTS operators typed
+    by the user cannot cause syntax errors. Terms are AND-ed.
+    """
+    tokens = _TOKEN_RE.findall(search_text or "")
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_lessons(
+    conn: sqlite3.Connection,
+    search_text: str = "",
+    domain: Optional[str] = None,
+    difficulty: Optional[int] = None,
+    tag_name: Optional[str] = None,
+    include_hidden: bool = False,
+    sort: str = "relevance",
+    limit: Optional[int] = None,
+    use_fts: bool = True,
+    snippet_count: int = DEFAULT_SNIPPET_COUNT,
+) -> List[Dict]:
+    """
+    Search lessons with optional filters.
+
+    Returns dicts with lesson_id, title, domain, difficulty, order_index,
+    learning_objectives (JSON text) and snippet (markdown, may be empty).
+    sort is one of relevance, title, difficulty, domain. Only the first
+    snippet_count results get a snippet.
+    """
+    match_query = build_match_query(search_text)
+    select = """
+        SELECT l.lesson_id, l.title, l.domain, l.difficulty,
+               l.order_index, l.learning_objectives
+    """
+    params: List[Any] = []
+
+    if match_query and use_fts:
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        query = select + f""",
+               lessons_fts.rowid AS fts_rowid,
+               bm25(lessons_fts, {weights}) AS rank
+            FROM lessons_fts
+            JOIN lessons l ON l.lesson_id = lessons_fts.lesson_id
+            WHERE lessons_fts MATCH ?
+        """
+        params.append(match_query)
+    else:
+        query = select + """,
+               NULL AS fts_rowid,
+               0 AS rank
+            FROM lessons l
+            WHERE 1=1
+        """
+        if search_text:
+            # No FTS5 available: plain substring match over the stored text
+            like = f"%{search_text}%"
+            query += """
+                AND (
+                    l.title LIKE ?
+                    OR l.subtitle LIKE ?
+                    OR l.learning_objectives LIKE ?
+                    OR l.content_blocks LIKE ?
+                )
+            """
+            params.extend([like, like, like, like])
+
+    if not include_hidden:
+        query += " AND (l.hidden = 0 OR l.hidden IS NULL)"
+
+    if domain:
+        query += " AND l.domain = ?"
+        params.append(domain)
+
+    if difficulty:
+        query += " AND l.difficulty = ?"
+        params.append(difficulty)
+
+    if tag_name:
+        query += """
+            AND EXISTS (
+                SELECT 1 FROM lesson_tags lt
+                JOIN tags t ON lt.tag_id = t.id
+                WHERE lt.lesson_id = l.lesson_id
+                AND t.name = ?
+            )
+        """
+        params.append(tag_name)
+
+    if sort == "title":
+        query += " ORDER BY l.title"
+    elif sort == "difficulty":
+        query += " ORDER BY l.difficulty, l.order_index"
+    elif sort == "domain":
+        query += " ORDER BY l.domain, l.order_index"
+    elif match_query and use_fts:
+        query += " ORDER BY rank, l.order_index"
+    elif search_text:
+        # Prioritize title matches
+        query += " ORDER BY CASE WHEN l.title LIKE ? THEN 1 ELSE 2 END, l.order_index"
+        params.append(f"%{search_text}%")
+    else:
+        query += " ORDER BY l.domain, l.order_index"
+
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    columns = [col[0] for col in cursor.description]
+    results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    snippets = {}
+    snippet_rowids = [r["fts_rowid"] for r in results[:snippet_count] if r["fts_rowid"] is not None]
+    if snippet_rowids:
+        placeholders = ",".join("?" * len(snippet_rowids))
+        cursor.execute(
+            f"""
+            SELECT rowid, snippet(lessons_fts, -1, '**', '**', '…', 12)
+            FROM lessons_fts
+            WHERE lessons_fts MATCH ? AND rowid IN ({placeholders})
+            """,
+            [match_query, *snippet_rowids],
+        )
+        snippets = dict(cursor.fetchall())
+
+    for result in results:
+        result["snippet"] = snippets.get(result.pop("fts_rowid"), "")
+
+    return results
@@ -0,0 +1,281 @@
+"""
+Background database maintenance for CyberLearn.
+
+Nothing used to clean up after the app: expired user_sessions rows were
+only deleted on the next Streamlit rerun, query planner statistics were
+never gathered, the WAL file was only checkpointed automatically, and the
+space freed by deleted sessions, notes and progress rows was never returned.
+
+JOBS lists the maintenance jobs, each with an interval and a time budget:
+
+- sessions: delete expired user_sessions and browser_sessions rows and
+  write pending last_accessed touches
+- optimize: PRAGMA optimize (a first ANALYZE if the database has no stats),
+  with analysis_limit so large tables are sampled
+- checkpoint: PRAGMA wal_checkpoint(TRUNCATE), so the WAL file doesn't grow
+- vacuum: VACUUM, only when at least VACUUM_FREE_RATIO of the pages are free
+- content: re-index and re-split lessons that scripts wrote directly to
+  the database (a Database only checks for them when it opens the pool)
+- leaderboards: rebuild leaderboard snapshots older than SNAPSHOT_TTL, one
+  board per transaction, so page views don't have to
+
+Budgets are enforced with a SQLite progress handler: a statement still
+running when its budget is spent is interrupted (and its transaction rolled
+back), so maintenance never holds the write lock for long.
+
+start_maintenance() runs the jobs on a daemon thread, once per database per
+process (not per Streamlit session), at jittered intervals so several
+server processes don't run them in lockstep. run_maintenance() runs them
+once; scripts/run_maintenance.py is its command-line entry.
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from utils.database import Database
+from utils.leaderboard import BOARDS, is_snapshot_fresh, refresh_snapshot
+from utils.session_cache import flush_touches
+from utils.session_store import SQLiteSessionStore
+
+
+# Fraction of an interval added or removed at random
+JITTER = 0.1
+# First runs happen within this many seconds of start (jittered)
+STARTUP_DELAY = 300
+# Rows ANALYZE samples per index
+ANALYSIS_LIMIT = 1000
+# VACUUM once this share of the database file is free pages
+VACUUM_FREE_RATIO = 0.25
+# SQLite VM instructions between budget checks
+_PROGRESS_STEPS = 10000
+
+
+class MaintenanceJob(NamedTuple):
+    """A maintenance task run every interval seconds (0 disables it)"""
+    name: str
+    run: Callable[..., str]  # (db, budget seconds) -> summary
+    interval: float
+    budget: float
+
+
+class MaintenanceResult(NamedTuple):
+    """What one job run did"""
+    name: str
+    ok: bool
+    summary: str
+    seconds: float
+
+
+@contextmanager
+def _budget(conn: sqlite3.Connection, seconds: float) -> Iterator[None]:
+    """Interrupt statements on conn that run past seconds from now"""
+    deadline = time.monotonic() + seconds
+    conn.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, _PROGRESS_STEPS)
+    try:
+        yield
+    finally:
+        conn.set_progress_handler(None, 0)
+
+
+def cleanup_expired_sessions(db, budget: float = 5.0) -> int:
+    """Delete expired user_sessions rows. Returns the number removed."""
+    with db.transaction() as conn, _budget(conn, budget):
+        cursor = conn.execute(
+            "DELETE FROM user_sessions WHERE expires_at < ?",
+            (datetime.utcnow().isoformat(),),
+        )
+        return cursor.rowcount
+
+
+def _sessions_job(db, budget: float) -> str:
+    sessions = cleanup_expired_sessions(db, budget)
+    with db.transaction() as conn, _budget(conn, budget):
+        browsers = SQLiteSessionStore(db).compact()
+    touches = flush_touches(db)
+    return f"{sessions} expired sessions, {browsers} browser records removed; {touches} touches written"
+
+
+def _optimize_job(db, budget: float) -> str:
+    with db.transaction() as conn, _budget(conn, budget):
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).fetchone()
+        if not has_stats:
+            conn.execute("ANALYZE")
+            return "ANALYZE (first run)"
+        conn.execute("PRAGMA optimize")
+    return "PRAGMA optimize"
+
+
+def _checkpoint_job(db, budget: float) -> str:
+    if db.db_path == ":memory:":
+        return "skipped (in-memory database)"
+    with db.pool.exclusive() as conn, _budget(conn, budget):
+        busy, log_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    if busy:
+        return f"partial: {checkpointed}/{log_pages} WAL pages (readers active)"
+    return f"{checkpointed} WAL pages checkpointed, WAL truncated"
+
+
+def _vacuum_job(db, budget: float) -> str:
+    with db.reader() as conn:
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if not pages or free / pages < VACUUM_FREE_RATIO:
+        return f"skipped ({free}/{pages} pages free)"
+
+    with db.pool.exclusive() as conn, _budget(conn, budget):
+        conn.execute("VACUUM")
+    return f"reclaimed {free} of {pages} pages"
+
+
+def _content_job(db, budget: float) -> str:
+    with db.transaction() as conn, _budget(conn, budget):
+        reindexed = db.sync_search_index()
+        resplit = db.sync_lesson_blocks()
+    return f"{reindexed} lessons re-indexed, {resplit} re-split into blocks"
+
+
+def _leaderboards_job(db, budget: float) -> str:
+    rebuilt = []
+    for board in BOARDS:
+        with db.transaction() as conn, _budget(conn, budget):
+            if not is_snapshot_fresh(conn, board):
+                refresh_snapshot(conn, board)
+                rebuilt.append(board)
+    return f"rebuilt {', '.join(rebuilt)}" if rebuilt else "all snapshots fresh"
+
+
+JOBS: List[MaintenanceJob] = [
+    MaintenanceJob("sessions", _sessions_job, interval=3600, budget=5.0),
+    MaintenanceJob("optimize", _optimize_job, interval=6 * 3600, budget=10.0),
+    MaintenanceJob("checkpoint", _checkpoint_job, interval=15 * 60, budget=5.0),
+    MaintenanceJob("vacuum", _vacuum_job, interval=24 * 3600, budget=60.0),
+    MaintenanceJob("content", _content_job, interval=15 * 60, budget=10.0),
+    MaintenanceJob("leaderboards", _leaderboards_job, interval=5 * 60, budget=10.0),
+]
+
+
+def configure_jobs(
+    intervals: Optional[Dict[str, float]] = None, budgets: Optional[Dict[str, float]] = None
+) -> List[MaintenanceJob]:
+    """JOBS with intervals / budgets overridden by job name"""
+    intervals = intervals or {}
+    budgets = budgets or {}
+    for name in set(intervals) | set(budgets):
+        if name not in {job.name for job in JOBS}:
+            raise ValueError(f"Unknown maintenance job: {name}")
+    return [
+        job._replace(
+            interval=intervals.get(job.name, job.interval),
+            budget=budgets.get(job.name, job.budget),
+        )
+        for job in JOBS
+    ]
+
+
+def run_job(db, job: MaintenanceJob) -> MaintenanceResult:
+    """Run one job and log what it did. Never raises."""
+    start = time.perf_counter()
+    try:
+        summary = job.run(db, job.budget)
+        ok = True
+    except sqlite3.OperationalError as e:
+        ok = False
+        summary = "over budget, interrupted" if "interrupt" in str(e) else f"failed: {e}"
+    except Exception as e:
+        ok = False
+        summary = f"failed: {e}"
+    result = MaintenanceResult(job.name, ok, summary, time.perf_counter() - start)
+    print(f"[Maintenance] {job.name}: {summary} ({result.seconds * 1000:.0f}ms)")
+    return result
+
+
+def run_maintenance(db, names: Optional[List[str]] = None, jobs: Optional[List[MaintenanceJob]] = None) -> List[MaintenanceResult]:
+    """Run the named jobs (default: all enabled) once, in JOBS order"""
+    jobs = jobs if jobs is not None else JOBS
+    if names:
+        unknown = set(names) - {job.name for job in jobs}
+        if unknown:
+            raise ValueError(f"Unknown maintenance job: {', '.join(sorted(unknown))}")
+        selected = [job for job in jobs if job.name in names]
+    else:
+        selected = [job for job in jobs if job.interval > 0]
+    return [run_job(db, job) for job in selected]
+
+
+class MaintenanceScheduler:
+    """Runs maintenance jobs for one database on a daemon thread"""
+
+    def __init__(self, db_path: str, jobs: List[MaintenanceJob], jitter: float = JITTER):
+        self.db_path = db_path
+        self.jobs = [job for job in jobs if job.interval > 0]
+        self.jitter = jitter
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _delay(self, seconds: float) -> float:
+        return seconds * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def start(self):
+        if self._thread is None and self.jobs:
+            self._thread = threading.Thread(target=self._run, name="cyberlearn-maintenance", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        db = Database(self.db_path)
+        try:
+            now = time.monotonic()
+            due = {
+                job.name: now + random.uniform(0.5, 1.0) * min(job.interval, STARTUP_DELAY)
+                for job in self.jobs
+            }
+            while not self._stop.is_set():
+                job = min(self.jobs, key=lambda j: due[j.name])
+                wait = due[job.name] - time.monotonic()
+                if wait > 0:
+                    self._stop.wait(wait)
+                    continue
+                run_job(db, job)
+                due[job.name] = time.monotonic() + self._delay(job.interval)
+        finally:
+            db.close()
+
+
+_schedulers_lock = threading.Lock()
+_schedulers: Dict[str, MaintenanceScheduler] = {}
+
+
+def start_maintenance(
+    db_path: str,
+    intervals: Optional[Dict[str, float]] = None,
+    budgets: Optional[Dict[str, float]] = None,
+) -> MaintenanceScheduler:
+    """
+    Start the maintenance thread for a database (once per process).
+
+    Later calls return the running scheduler; their intervals are ignored.
+    """
+    key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None or not scheduler.running:
+            scheduler = _schedulers[key] = MaintenanceScheduler(db_path, configure_jobs(intervals, budgets))
+            scheduler.start()
+        return scheduler
@@ -0,0 +1,61 @@
+"""
+Process-pool helpers for CPU-bound content work.
+
+JSON parsing, pydantic validation and the regex-heavy content checks are
+CPU-bound, so threads don't help. parallel_map() fans a picklable,
+module-level function out over a process pool in chunks and returns the
+results in input order, so reports stay deterministic whatever the job
+count. Database writes stay in the calling process (single writer).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Aim for this many chunks per worker so a slow chunk doesn't leave cores idle
+CHUNKS_PER_JOB = 4
+
+
+def resolve_jobs(jobs: Optional[int] = None) -> int:
+    """Number of worker processes to use (None or 0 means one per CPU)"""
+    if not jobs or jobs < 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def parallel_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    jobs: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> List[R]:
+    """
+    Apply func to every item across worker processes, preserving order.
+
+    func must be defined at module level (it is pickled by name). With one
+    job, or a single item, everything runs in-process.
+    """
+    items = list(items)
+    jobs = min(resolve_jobs(jobs), len(items))
+    if jobs <= 1:
+        return [func(item) for item in items]
+
+    if chunksize is None:
+        chunksize = max(1, len(items) // (jobs * CHUNKS_PER_JOB))
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
+
+
+def add_jobs_argument(parser):
+    """Add the standard --jobs/-j option to an argparse parser"""
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=0,
+        help="Worker processes (default: one per CPU, 1 = serial)",
+    )
@@ -7,6 +7,9 @@ No cookies, no query params, no JavaScript - just Python
 import streamlit as st
 from datetime import datetime
 import sqlite3
+from typing import Optional
+
+from utils.session_store import SessionStore
 
 
 class PersistentSessionManager:
@@ -18,16 +21,22 @@ class PersistentSessionManager:
     When they close and reopen, they'll need to log in again.
 
     This is actually the NORMAL behavior for most web apps without "remember me".
+    Given a session store and a browser key, sessions are also recorded there
+    and survive a reload of the tab.
     """
 
-    def __init__(self, db):
+    def __init__(self, db, store: Optional[SessionStore] = None, browser_key: Optional[str] = None):
         """
         Initialize session manager
 
         Args:
             db: Database instance
+            store: Optional shared session store
+            browser_key: Key for this browser in the store
         """
         self.db = db
+        self.store = store if browser_key else None
+        self.browser_key = browser_key
 
         # Check if we already validated a session in this tab
         if "_session_validated" not in st.session_state:
@@ -54,6 +63,9 @@ class PersistentSessionManager:
         st.session_state._current_session_token = session_token
         st.session_state._session_validated = True
 
+        if self.store:
+            self.store.put(self.browser_key, session_token, user_id)
+
         print(f"[PersistentSessionManager] Created session for user {user_id}")
         return session_token
 
@@ -68,6 +80,13 @@ class PersistentSessionManager:
             print(f"[PersistentSessionManager] Returning existing session from tab state")
             return st.session_state._current_session_token
 
+        session_data = self.store.get(self.browser_key) if self.store else None
+        if session_data:
+            st.session_state._current_session_token = session_data["token"]
+            st.session_state._session_validated = True
+            print(f"[PersistentSessionManager] Restored session from store")
+            return session_data["token"]
+
         print(f"[PersistentSessionManager] No active session in this tab")
         return None
 
@@ -83,6 +102,9 @@ class PersistentSessionManager:
             auth_manager.revoke_session(st.session_state._current_session_token)
             print(f"[PersistentSessionManager] Revoked session from database")
 
+        if self.store:
+            self.store.delete(self.browser_key)
+
         # Clear from tab state
         st.session_state._current_session_token = None
         st.session_state._session_validated = False
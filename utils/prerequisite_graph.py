@@ -0,0 +1,364 @@
+"""
+Compiled lesson prerequisite graph for CyberLearn.
+
+Lesson.prerequisites holds free-form strings: lesson ids, lesson titles and
+"<domain>_<order>" references. The catalog used to keep only the strings
+that parsed as UUIDs (titles were silently dropped, and ids of lessons that
+don't exist locked a lesson forever), and the recommender re-checked every
+lesson's prerequisites against the learner's completed set on each call.
+
+compile_prerequisites() resolves every reference to a lesson id, reports
+dangling references and breaks cycles, and refresh_prerequisite_graph()
+stores the result as edges in lesson_prerequisites. Database runs it
+whenever lessons are written or removed (and content sync through it), so
+the graph is rebuilt from lesson content, never edited by hand.
+
+Per learner, user_unlocked_lessons holds the lessons that have
+prerequisites and whose prerequisites are all completed (lessons without
+prerequisites are always unlocked). Triggers on progress keep it current:
+when a lesson becomes completed or mastered only its dependents are
+checked, and when it stops being completed its dependents are locked again.
+"""
+
+import json
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+
+_COMPLETED = "('completed', 'mastered')"
+
+# "pentest_10", "lesson_pentest_05"
+_DOMAIN_ORDER_RE = re.compile(r"^(?:lesson_)?([a-z_]+?)_0*(\d+)$")
+
+
+class PrerequisiteGraph:
+    """Resolved prerequisite edges plus what could not be resolved"""
+
+    def __init__(self):
+        self.edges: Dict[str, List[str]] = {}  # lesson_id -> prerequisite ids
+        self.dangling: List[Tuple[str, str]] = []  # (lesson_id, reference)
+        self.cycles: List[List[str]] = []  # lesson ids, the last one's edge to the first was dropped
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(prereqs) for prereqs in self.edges.values())
+
+    def dependents(self) -> Dict[str, List[str]]:
+        """prerequisite id -> lessons that require it"""
+        result: Dict[str, List[str]] = {}
+        for lesson_id, prereqs in self.edges.items():
+            for prereq in prereqs:
+                result.setdefault(prereq, []).append(lesson_id)
+        return result
+
+
+def _normalize_title(title: str) -> str:
+    return " ".join(title.lower().split())
+
+
+def compile_prerequisites(
+    lessons: Sequence[Tuple[str, str, int, str, Optional[str]]]
+) -> PrerequisiteGraph:
+    """
+    Resolve prerequisite references and break cycles.
+
+    lessons are (lesson_id, domain, order_index, title, prerequisites JSON)
+    rows. A reference resolves as a lesson id, else a title (case and
+    whitespace insensitive), else "<domain>_<order_index>". Cycles are broken
+    by dropping the edge that closes them, walking lessons in
+    (domain, order_index) order.
+    """
+    graph = PrerequisiteGraph()
+    ids = {row[0] for row in lessons}
+    by_title: Dict[str, str] = {}
+    by_domain_order: Dict[Tuple[str, int], str] = {}
+    ordered = sorted(lessons, key=lambda row: (row[1], row[2] if row[2] is not None else 0, row[0]))
+    for lesson_id, domain, order_index, title, _ in ordered:
+        by_title.setdefault(_normalize_title(title or ""), lesson_id)
+        if order_index is not None:
+            by_domain_order.setdefault((domain, order_index), lesson_id)
+
+    for lesson_id, domain, order_index, title, raw in ordered:
+        try:
+            references = json.loads(raw or "[]")
+        except (TypeError, ValueError):
+            references = []
+
+        prereqs: List[str] = []
+        for reference in references:
+            if not reference or not isinstance(reference, str):
+                continue
+            resolved = _resolve(reference, ids, by_title, by_domain_order)
+            if resolved is None:
+                graph.dangling.append((lesson_id, reference))
+            elif resolved not in prereqs:
+                prereqs.append(resolved)
+        if prereqs:
+            graph.edges[lesson_id] = prereqs
+
+    _break_cycles(graph, [row[0] for row in ordered])
+    return graph
+
+
+def _resolve(
+    reference: str,
+    ids: Set[str],
+    by_title: Dict[str, str],
+    by_domain_order: Dict[Tuple[str, int], str],
+) -> Optional[str]:
+    reference = reference.strip()
+    try:
+        lesson_id = str(UUID(reference))
+    except ValueError:
+        lesson_id = None
+    if lesson_id in ids:
+        return lesson_id
+
+    resolved = by_title.get(_normalize_title(reference))
+    if resolved:
+        return resolved
+
+    match = _DOMAIN_ORDER_RE.match(reference.lower())
+    if match:
+        return by_domain_order.get((match.group(1), int(match.group(2))))
+    return None
+
+
+def _break_cycles(graph: PrerequisiteGraph, order: List[str]):
+    """Drop back edges found by a depth-first walk, recording each cycle"""
+    visiting, done = set(), set()
+    for root in order:
+        if root in done:
+            continue
+        path = [root]
+        stack = [iter(list(graph.edges.get(root, ())))]
+        visiting.add(root)
+        while stack:
+            lesson_id = path[-1]
+            prereq = next(stack[-1], None)
+            if prereq is None:
+                stack.pop()
+                visiting.discard(path.pop())
+                done.add(lesson_id)
+                continue
+            if prereq in visiting:
+                graph.cycles.append(path[path.index(prereq):])
+                graph.edges[lesson_id].remove(prereq)
+                if not graph.edges[lesson_id]:
+                    del graph.edges[lesson_id]
+            elif prereq not in done:
+                visiting.add(prereq)
+                path.append(prereq)
+                stack.append(iter(list(graph.edges.get(prereq, ()))))
+
+
+# STORAGE
+
+def _unlock_dependents_sql(row: str) -> str:
+    """Unlock dependents of progress row NEW/OLD whose prerequisites are all completed"""
+    return f"""
+        INSERT OR IGNORE INTO user_unlocked_lessons (user_id, lesson_id)
+        SELECT {row}.user_id, e.lesson_id FROM lesson_prerequisites e
+        WHERE e.prerequisite_id = {row}.lesson_id
+          AND NOT EXISTS (
+              SELECT 1 FROM lesson_prerequisites r
+              WHERE r.lesson_id = e.lesson_id
+                AND NOT EXISTS (
+                    SELECT 1 FROM progress p
+                    WHERE p.user_id = {row}.user_id AND p.lesson_id = r.prerequisite_id
+                      AND p.status IN {_COMPLETED}
+                )
+          );
+    """
+
+
+def _lock_dependents_sql(row: str) -> str:
+    """Lock every dependent of progress row NEW/OLD's lesson again"""
+    return f"""
+        DELETE FROM user_unlocked_lessons
+        WHERE user_id = {row}.user_id
+          AND lesson_id IN (
+              SELECT lesson_id FROM lesson_prerequisites WHERE prerequisite_id = {row}.lesson_id
+          );
+    """
+
+
+_TRIGGERS = {
+    "unlocks_progress_insert": f"""
+        AFTER INSERT ON progress
+        WHEN NEW.status IN {_COMPLETED}
+        BEGIN {_unlock_dependents_sql("NEW")} END
+    """,
+    "unlocks_progress_completed": f"""
+        AFTER UPDATE OF status ON progress
+        WHEN NEW.status IN {_COMPLETED} AND OLD.status NOT IN {_COMPLETED}
+        BEGIN {_unlock_dependents_sql("NEW")} END
+    """,
+    "unlocks_progress_uncompleted": f"""
+        AFTER UPDATE OF status ON progress
+        WHEN OLD.status IN {_COMPLETED} AND NEW.status NOT IN {_COMPLETED}
+        BEGIN {_lock_dependents_sql("NEW")} END
+    """,
+    "unlocks_progress_delete": f"""
+        AFTER DELETE ON progress
+        WHEN OLD.status IN {_COMPLETED}
+        BEGIN {_lock_dependents_sql("OLD")} END
+    """,
+}
+
+
+def ensure_prerequisite_tables(conn: sqlite3.Connection):
+    """Create lesson_prerequisites, user_unlocked_lessons and the unlock triggers"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lesson_prerequisites (
+            lesson_id TEXT NOT NULL,
+            prerequisite_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (lesson_id, prerequisite_id)
+        )
+    """
+    )
+    # Completing a lesson visits its dependents
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lesson_prerequisites_prerequisite "
+        "ON lesson_prerequisites(prerequisite_id)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_unlocked_lessons (
+            user_id TEXT NOT NULL,
+            lesson_id TEXT NOT NULL,
+            PRIMARY KEY (user_id, lesson_id)
+        )
+    """
+    )
+    for name, body in _TRIGGERS.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+def load_prerequisite_edges(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """Stored edges, lesson_id -> prerequisite ids in source order"""
+    edges: Dict[str, List[str]] = {}
+    for lesson_id, prereq in conn.execute(
+        "SELECT lesson_id, prerequisite_id FROM lesson_prerequisites ORDER BY lesson_id, position"
+    ):
+        edges.setdefault(lesson_id, []).append(prereq)
+    return edges
+
+
+def compile_stored_lessons(conn: sqlite3.Connection) -> PrerequisiteGraph:
+    """Compile the prerequisites of every lesson in the lessons table"""
+    rows = conn.execute(
+        "SELECT lesson_id, domain, order_index, title, prerequisites FROM lessons"
+    ).fetchall()
+    return compile_prerequisites([tuple(row) for row in rows])
+
+
+def refresh_prerequisite_graph(conn: sqlite3.Connection) -> PrerequisiteGraph:
+    """
+    Recompile the graph from the lessons table and store changed edges.
+
+    Unlocks are recomputed only for lessons whose prerequisites changed.
+    Does not commit.
+    """
+    graph = compile_stored_lessons(conn)
+    stored = load_prerequisite_edges(conn)
+    changed = [
+        lesson_id for lesson_id in set(stored) | set(graph.edges)
+        if stored.get(lesson_id) != graph.edges.get(lesson_id)
+    ]
+    if not changed:
+        return graph
+
+    cursor = conn.cursor()
+    for start in range(0, len(changed), 500):
+        chunk = changed[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(f"DELETE FROM lesson_prerequisites WHERE lesson_id IN ({placeholders})", chunk)
+    cursor.executemany(
+        "INSERT INTO lesson_prerequisites (lesson_id, prerequisite_id, position) VALUES (?, ?, ?)",
+        [
+            (lesson_id, prereq, position)
+            for lesson_id in changed
+            for position, prereq in enumerate(graph.edges.get(lesson_id, ()))
+        ],
+    )
+    rebuild_unlocks(conn, changed)
+    return graph
+
+
+def rebuild_unlocks(conn: sqlite3.Connection, lesson_ids: Optional[Iterable[str]] = None):
+    """Recompute user_unlocked_lessons (every lesson, or the given ones). Does not commit."""
+    cursor = conn.cursor()
+    insert = f"""
+        INSERT INTO user_unlocked_lessons (user_id, lesson_id)
+        SELECT p.user_id, e.lesson_id
+        FROM lesson_prerequisites e
+        JOIN progress p ON p.lesson_id = e.prerequisite_id AND p.status IN {_COMPLETED}
+        {{where}}
+        GROUP BY p.user_id, e.lesson_id
+        HAVING COUNT(*) = (
+            SELECT COUNT(*) FROM lesson_prerequisites r WHERE r.lesson_id = e.lesson_id
+        )
+    """
+
+    if lesson_ids is None:
+        cursor.execute("DELETE FROM user_unlocked_lessons")
+        cursor.execute(insert.format(where=""))
+        return
+
+    ids = [str(lesson_id) for lesson_id in lesson_ids]
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(f"DELETE FROM user_unlocked_lessons WHERE lesson_id IN ({placeholders})", chunk)
+        cursor.execute(insert.format(where=f"WHERE e.lesson_id IN ({placeholders})"), chunk)
+
+
+def get_open_lesson_ids(
+    conn: sqlite3.Connection,
+    user_id: str,
+    domain: Optional[str] = None,
+    include_hidden: bool = False,
+) -> List[str]:
+    """
+    Lessons the user has unlocked and not completed, in domain and
+    order_index order
+    """
+    sql = f"""
+        SELECT l.lesson_id FROM lessons l
+        WHERE (
+            NOT EXISTS (SELECT 1 FROM lesson_prerequisites e WHERE e.lesson_id = l.lesson_id)
+            OR EXISTS (
+                SELECT 1 FROM user_unlocked_lessons u
+                WHERE u.user_id = ? AND u.lesson_id = l.lesson_id
+            )
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM progress p
+            WHERE p.user_id = ? AND p.lesson_id = l.lesson_id AND p.status IN {_COMPLETED}
+        )
+    """
+    params: List[object] = [user_id, user_id]
+    if domain is not None:
+        sql += " AND l.domain = ?"
+        params.append(domain)
+    if not include_hidden:
+        sql += " AND COALESCE(l.hidden, 0) = 0"
+    sql += " ORDER BY l.domain, l.order_index"
+    return [row[0] for row in conn.execute(sql, params)]
+
+
+def is_unlocked(conn: sqlite3.Connection, user_id: str, lesson_id: str) -> bool:
+    """True if the lesson has no prerequisites or the user completed them all"""
+    row = conn.execute(
+        """
+        SELECT NOT EXISTS (SELECT 1 FROM lesson_prerequisites WHERE lesson_id = ?)
+            OR EXISTS (SELECT 1 FROM user_unlocked_lessons WHERE user_id = ? AND lesson_id = ?)
+        """,
+        (lesson_id, user_id, lesson_id),
+    ).fetchone()
+    return bool(row[0])
@@ -0,0 +1,38 @@
+"""
+Per-user progress version counters for CyberLearn.
+
+Anything derived from one learner's progress rows (next lesson per domain,
+due counts, ...) can be cached against get_progress_version(): Database
+bumps the user's version after every committed progress write, the same
+way lesson writes bump the catalog version.
+
+Versions are process-wide and come from one counter, so a value is never
+reused, even across databases. Writes made by other processes (scripts)
+are not seen.
+"""
+
+import itertools
+import os
+import threading
+from typing import Dict, Tuple
+
+
+_lock = threading.Lock()
+_counter = itertools.count(1)
+_versions: Dict[Tuple[str, str], int] = {}
+
+
+def _key(db_path: str, user_id) -> Tuple[str, str]:
+    return (db_path if db_path == ":memory:" else os.path.abspath(db_path), str(user_id))
+
+
+def bump_progress_version(db_path: str, user_id) -> int:
+    """Invalidate everything cached for a user's progress"""
+    with _lock:
+        version = _versions[_key(db_path, user_id)] = next(_counter)
+        return version
+
+
+def get_progress_version(db_path: str, user_id) -> int:
+    """Current progress version of a user (0 if never written in this process)"""
+    return _versions.get(_key(db_path, user_id), 0)
@@ -0,0 +1,107 @@
+"""
+Version-keyed cache for read-heavy Database queries.
+
+Pages call the tag queries (get_filterable_tags, get_all_tags,
+get_tag_stats, ...) and the assessment domain counts on every Streamlit
+rerun, each a SQL query plus model construction for data that almost never
+changes.
+
+@cached_read memoizes such a Database method in one process-wide LRU, keyed
+by database file, method and arguments. Every entry is stamped with the
+data version (bumped by Database tag writes via bump_data_version), the
+lesson catalog version (bumped by lesson and lesson_tags writes) and the
+database's catalog_state version (bumped by triggers on lessons, tags and
+lesson_tags, whichever process writes them), and is only served while all
+three still match, so a write is visible to the very next read. Entries
+also expire after READ_CACHE_TTL, so results nothing stamps can't outlive
+it.
+
+The cache is process-wide rather than st.cache_data: it is shared by every
+session like the lesson catalog, needs no Streamlit import, and hands out
+shallow copies instead of unpickling a fresh result on each hit. Cached
+objects are shared between sessions - treat them as read-only.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from utils.lesson_catalog import get_catalog_version, get_stored_catalog_version
+
+
+READ_CACHE_SIZE = 512
+READ_CACHE_TTL = 300.0  # seconds
+
+_version_lock = threading.Lock()
+_data_version = 0
+
+_cache_lock = threading.Lock()
+# key -> (stamp, expires at (monotonic), value)
+_cache: "OrderedDict[Hashable, Tuple[Tuple[int, int, Optional[int]], float, Any]]" = OrderedDict()
+
+
+def bump_data_version() -> int:
+    """Invalidate every cached read (call after any tag write)"""
+    global _data_version
+    with _version_lock:
+        _data_version += 1
+        return _data_version
+
+
+def get_data_version() -> int:
+    """Current data version number"""
+    return _data_version
+
+
+def clear_read_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _copy(value):
+    """Shallow copy of list / dict results, so callers can't resize the cached one"""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def cached_read(method: Callable) -> Callable:
+    """Cache a Database method's result until the data or catalog changes"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.db_path == ":memory:":
+            # Each in-memory database is private to its connection pool
+            db_key = f":memory:{id(self.pool)}"
+        else:
+            db_key = os.path.abspath(self.db_path)
+        key = (db_key, method.__name__, args, tuple(sorted(kwargs.items())))
+        with self.reader() as conn:
+            stored_version = get_stored_catalog_version(conn)
+        stamp = (get_data_version(), get_catalog_version(), stored_version)
+        now = time.monotonic()
+
+        with _cache_lock:
+            entry = _cache.get(key)
+            if entry is not None and entry[0] == stamp and entry[1] > now:
+                _cache.move_to_end(key)
+                return _copy(entry[2])
+
+        value = method(self, *args, **kwargs)
+
+        # Reads inside a transaction may see uncommitted writes
+        if not self.pool.in_transaction():
+            with _cache_lock:
+                _cache[key] = (stamp, now + READ_CACHE_TTL, value)
+                _cache.move_to_end(key)
+                while len(_cache) > READ_CACHE_SIZE:
+                    _cache.popitem(last=False)
+        return _copy(value)
+
+    wrapper.uncached = method
+    return wrapper
@@ -0,0 +1,40 @@
+"""
+Schema capability registry for CyberLearn.
+
+Older databases may be missing optional columns (added later by migrations),
+so code needs to know which columns exist. SchemaInfo reads sqlite_master and
+PRAGMA table_info once when a connection is opened instead of on every
+query; call refresh() after running a migration.
+"""
+
+import sqlite3
+from typing import Dict, FrozenSet
+
+
+class SchemaInfo:
+    """Snapshot of the tables and columns present in a database"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.tables: Dict[str, FrozenSet[str]] = {}
+        self.refresh()
+
+    def refresh(self):
+        """Re-read table and column names (call after schema changes)"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        table_names = [row[0] for row in cursor.fetchall()]
+
+        tables = {}
+        for table in table_names:
+            cursor.execute(f'PRAGMA table_info("{table}")')
+            tables[table] = frozenset(row[1] for row in cursor.fetchall())
+        self.tables = tables
+
+    def has_table(self, table: str) -> bool:
+        """Check if a table exists"""
+        return table in self.tables
+
+    def has_column(self, table: str, column: str) -> bool:
+        """Check if a column exists on a table"""
+        return column in self.tables.get(table, frozenset())
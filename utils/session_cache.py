@@ -0,0 +1,153 @@
+"""
+Validated session token cache for AuthManager.
+
+AuthManager.validate_session() runs on every Streamlit rerun. It used to
+SELECT the session row, then UPDATE last_accessed and commit, so every page
+interaction of every logged-in user took the database write lock.
+
+ValidatedTokenCache keeps, per database and process-wide (each browser tab
+has its own AuthManager), a bounded LRU of recently validated token hashes
+with their user and expiry:
+
+- a hit skips the SELECT; entries are re-read from the database after
+  RECHECK_INTERVAL so sessions deleted by other processes drop out
+- revoke_session() / revoke_all_user_sessions() invalidate entries at once,
+  and a generation counter stops a validation that raced a revocation from
+  re-caching the revoked token
+- last_accessed touches are recorded at most once per touch interval per
+  token and written in one executemany batch when FLUSH_INTERVAL has passed
+  or FLUSH_BATCH_SIZE touches are pending, so last_accessed may lag by up
+  to the touch interval plus FLUSH_INTERVAL
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+VALIDATED_CACHE_SIZE = 4096
+RECHECK_INTERVAL = timedelta(seconds=60)
+FLUSH_INTERVAL = timedelta(seconds=30)
+FLUSH_BATCH_SIZE = 256
+
+# token hash -> (user_id, expires_at, checked_at, touched_at)
+_Entry = Tuple[str, datetime, datetime, Optional[datetime]]
+
+
+class ValidatedTokenCache:
+    """Recently validated token hashes plus pending last_accessed writes"""
+
+    def __init__(self, max_size: int = VALIDATED_CACHE_SIZE, recheck_interval: timedelta = RECHECK_INTERVAL):
+        self.max_size = max_size
+        self.recheck_interval = recheck_interval
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._pending: Dict[str, datetime] = {}
+        self._last_flush = datetime.utcnow()
+
+    def get(self, token_hash: str, now: datetime) -> Optional[Tuple[str, datetime]]:
+        """(user_id, expires_at) if the hash was validated recently enough"""
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None or now - entry[2] >= self.recheck_interval:
+                return None
+            self._entries.move_to_end(token_hash)
+            return entry[0], entry[1]
+
+    def put(self, token_hash: str, user_id: str, expires_at: datetime, now: datetime, generation: int) -> bool:
+        """
+        Cache a validation read from the database.
+
+        generation is self.generation from before the read; if anything was
+        invalidated since, the read may be stale and is not cached.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return False
+            previous = self._entries.get(token_hash)
+            touched_at = previous[3] if previous else None
+            self._entries[token_hash] = (user_id, expires_at, now, touched_at)
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, token_hash: str):
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(token_hash, None)
+            self._pending.pop(token_hash, None)
+
+    def invalidate_user(self, user_id: str):
+        with self._lock:
+            self.generation += 1
+            for token_hash in [h for h, entry in self._entries.items() if entry[0] == user_id]:
+                del self._entries[token_hash]
+                self._pending.pop(token_hash, None)
+
+    def touch(self, token_hash: str, now: datetime, interval: timedelta) -> bool:
+        """
+        Record an access to a cached token. Returns True if pending touches
+        should be flushed now.
+        """
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None:
+                return False
+            if entry[3] is None or now - entry[3] >= interval:
+                self._entries[token_hash] = entry[:3] + (now,)
+                self._pending[token_hash] = now
+            return bool(self._pending) and (
+                len(self._pending) >= FLUSH_BATCH_SIZE or now - self._last_flush >= FLUSH_INTERVAL
+            )
+
+    def take_pending(self) -> List[Tuple[str, str]]:
+        """Pending touches as (last_accessed, token_hash) rows, clearing them"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = datetime.utcnow()
+        return [(accessed.isoformat(), token_hash) for token_hash, accessed in pending.items()]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._pending.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_caches_lock = threading.Lock()
+_caches: Dict[str, ValidatedTokenCache] = {}
+
+
+def get_token_cache(db_path: str) -> ValidatedTokenCache:
+    """Process-wide token cache for a database file"""
+    key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = ValidatedTokenCache()
+        return cache
+
+
+def flush_touches(db) -> int:
+    """Write a database's pending last_accessed updates. Returns the number written."""
+    pending = get_token_cache(db.db_path).take_pending()
+    if not pending:
+        return 0
+
+    with db.transaction() as conn:
+        conn.executemany(
+            """
+            UPDATE user_sessions
+            SET last_accessed = ?
+            WHERE session_token = ?
+            """,
+            pending,
+        )
+    return len(pending)
@@ -0,0 +1,510 @@
+"""
+Browser session stores for CyberLearn.
+
+FileSessionManager used to keep every browser's session in
+data/browser_sessions.json, re-reading the whole file on each lookup and
+rewriting it (indented) on each login or logout, without locking or expiry.
+Concurrent tabs and workers lost each other's updates and the file only grew.
+
+SessionStore is the interface the browser session managers share: browser
+key -> (token, user_id) records that expire SESSION_TTL after they are
+written. It only remembers which auth token a browser holds; the auth
+sessions themselves are created, validated and revoked by AuthManager in
+the user_sessions table.
+Expired records are ignored on read and deleted by compact(), which put()
+starts on a background thread at most once per COMPACT_INTERVAL. Backends:
+
+- SQLiteSessionStore: the browser_sessions table of the app database.
+  Lookups are one primary-key probe; writes are single-row upserts/deletes
+  in a pool transaction, so concurrent writers (threads or processes) are
+  serialized, never lost. The default.
+- MemorySessionStore: a dict per process. Fastest, but sessions are lost on
+  restart and not shared between server processes.
+- FileSessionStore: an append-only JSON-lines log replayed into a dict.
+  Writes append one line; readers pick up lines appended by other processes
+  before each lookup; compact() rewrites the live records to a new file and
+  swaps it in atomically. Writers and compact() hold an exclusive lock on a
+  sidecar <log>.lock file, so processes sharing the log never lose writes.
+
+get_session_store() returns the process-wide store for the backend
+selected by config.session_store_backend.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Matches AuthManager.COOKIE_EXPIRY_DAYS: a browser record is useless once
+# its auth session has expired
+SESSION_TTL = timedelta(days=30)
+COMPACT_INTERVAL = timedelta(minutes=10)
+
+_compact_lock = threading.Lock()
+_last_compacted: Dict[str, datetime] = {}
+
+
+def ensure_session_store_table(conn: sqlite3.Connection):
+    """Create the browser_sessions table"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS browser_sessions (
+            browser_key TEXT PRIMARY KEY,
+            token TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL
+        )
+    """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_browser_sessions_expires_at ON browser_sessions(expires_at)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_browser_sessions_user_id ON browser_sessions(user_id)"
+    )
+
+
+def _lock_file(f):
+    """Block until this process holds an exclusive lock on the open file f"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _record(token: str, user_id, now: datetime, ttl: timedelta) -> Dict:
+    return {
+        "token": token,
+        "user_id": str(user_id),
+        "created_at": now.isoformat(),
+        "expires_at": (now + ttl).isoformat(),
+    }
+
+
+class SessionStore(ABC):
+    """Browser key -> session token records with a TTL"""
+
+    def __init__(self, ttl: timedelta = SESSION_TTL, compact_interval: timedelta = COMPACT_INTERVAL):
+        """
+        Args:
+            ttl: How long a record stays valid after it is written
+            compact_interval: Minimum time between background compactions
+        """
+        self.ttl = ttl
+        self.compact_interval = compact_interval
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Record for a browser key (None if missing or expired)
+
+        Returns:
+            Dict with token, user_id, created_at and expires_at
+        """
+
+    @abstractmethod
+    def _put(self, key: str, record: Dict) -> None:
+        """Store a record built by put()"""
+
+    def put(self, key: str, token: str, user_id) -> None:
+        """Store (or replace) the session token for a browser key"""
+        self._put(key, _record(token, user_id, datetime.utcnow(), self.ttl))
+        self.maybe_compact()
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Remove a browser key's record. Returns True if one existed."""
+
+    @abstractmethod
+    def delete_user(self, user_id) -> int:
+        """Remove every browser record of a user. Returns the number removed."""
+
+    @abstractmethod
+    def compact(self, now: Optional[datetime] = None) -> int:
+        """Delete expired records. Returns the number removed."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of unexpired records"""
+
+    def _compact_key(self) -> str:
+        """Identifies the storage compact() cleans, across store instances"""
+        return f"{type(self).__name__}:{id(self)}"
+
+    def maybe_compact(self) -> bool:
+        """Start a background compact() if none ran in the last compact_interval"""
+        key = self._compact_key()
+        now = datetime.utcnow()
+        with _compact_lock:
+            last = _last_compacted.get(key)
+            if last is not None and now - last < self.compact_interval:
+                return False
+            _last_compacted[key] = now
+
+        threading.Thread(target=self._compact_quietly, name="session-store-compact", daemon=True).start()
+        return True
+
+    def _compact_quietly(self):
+        try:
+            removed = self.compact()
+            if removed:
+                print(f"[SessionStore] Compacted {removed} expired browser sessions")
+        except Exception as e:
+            # The database may have been closed under us; retried next interval
+            print(f"[SessionStore] Compaction failed: {e}")
+
+
+class SQLiteSessionStore(SessionStore):
+    """Records in the browser_sessions table of the app database"""
+
+    def __init__(self, db, ttl: timedelta = SESSION_TTL, compact_interval: timedelta = COMPACT_INTERVAL):
+        """
+        Args:
+            db: Database instance
+        """
+        super().__init__(ttl, compact_interval)
+        self.db = db
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self.db.reader() as conn:
+            row = conn.execute(
+                """
+                SELECT token, user_id, created_at, expires_at
+                FROM browser_sessions
+                WHERE browser_key = ? AND expires_at > ?
+                """,
+                (key, datetime.utcnow().isoformat()),
+            ).fetchone()
+
+        if not row:
+            return None
+        return {
+            "token": row[0],
+            "user_id": row[1],
+            "created_at": row[2],
+            "expires_at": row[3],
+        }
+
+    def _put(self, key: str, record: Dict) -> None:
+        with self.db.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO browser_sessions (browser_key, token, user_id, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(browser_key) DO UPDATE SET
+                    token = excluded.token,
+                    user_id = excluded.user_id,
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at
+                """,
+                (key, record["token"], record["user_id"], record["created_at"], record["expires_at"]),
+            )
+
+    def delete(self, key: str) -> bool:
+        with self.db.transaction() as conn:
+            cursor = conn.execute("DELETE FROM browser_sessions WHERE browser_key = ?", (key,))
+            return cursor.rowcount > 0
+
+    def delete_user(self, user_id) -> int:
+        with self.db.transaction() as conn:
+            cursor = conn.execute("DELETE FROM browser_sessions WHERE user_id = ?", (str(user_id),))
+            return cursor.rowcount
+
+    def compact(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.utcnow()
+        with self.db.transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM browser_sessions WHERE expires_at <= ?", (now.isoformat(),)
+            )
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self.db.reader() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM browser_sessions WHERE expires_at > ?",
+                (datetime.utcnow().isoformat(),),
+            ).fetchone()[0]
+
+    def _compact_key(self) -> str:
+        path = self.db.db_path
+        return path if path == ":memory:" else os.path.abspath(path)
+
+
+class MemorySessionStore(SessionStore):
+    """Records in a process-local dict"""
+
+    def __init__(self, ttl: timedelta = SESSION_TTL, compact_interval: timedelta = COMPACT_INTERVAL):
+        super().__init__(ttl, compact_interval)
+        self._lock = threading.Lock()
+        self._records: Dict[str, Tuple[Dict, datetime]] = {}
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._records.get(key)
+        if entry is None or entry[1] <= datetime.utcnow():
+            return None
+        return dict(entry[0])
+
+    def _put(self, key: str, record: Dict) -> None:
+        with self._lock:
+            self._records[key] = (record, datetime.fromisoformat(record["expires_at"]))
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._records.pop(key, None) is not None
+
+    def delete_user(self, user_id) -> int:
+        user_id = str(user_id)
+        with self._lock:
+            keys = [key for key, (record, _) in self._records.items() if record["user_id"] == user_id]
+            for key in keys:
+                del self._records[key]
+            return len(keys)
+
+    def compact(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.utcnow()
+        with self._lock:
+            keys = [key for key, (_, expires) in self._records.items() if expires <= now]
+            for key in keys:
+                del self._records[key]
+            return len(keys)
+
+    def count(self) -> int:
+        now = datetime.utcnow()
+        return sum(1 for _, expires in list(self._records.values()) if expires > now)
+
+
+class FileSessionStore(SessionStore):
+    """Records in an append-only JSON-lines log, replayed into a dict"""
+
+    def __init__(self, path, ttl: timedelta = SESSION_TTL, compact_interval: timedelta = COMPACT_INTERVAL):
+        """
+        Args:
+            path: Log file (created if missing); path + ".lock" is its lock file
+        """
+        super().__init__(ttl, compact_interval)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_handle = None
+        self._records: Dict[str, Tuple[Dict, datetime]] = {}
+        self._inode: Optional[int] = None
+        self._offset = 0
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """
+        The thread lock plus the inter-process lock file (re-entrant).
+
+        Held around every append and the whole of compact(), so no process
+        appends to a log that compact() is about to replace.
+        """
+        with self._lock:
+            if self._lock_depth == 0:
+                handle = open(self._lock_path, "a+b")
+                try:
+                    _lock_file(handle)
+                except BaseException:
+                    handle.close()
+                    raise
+                self._lock_handle = handle
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    handle, self._lock_handle = self._lock_handle, None
+                    try:
+                        _unlock_file(handle)
+                    finally:
+                        handle.close()
+
+    def _apply(self, entry: Dict):
+        op = entry.get("op")
+        if op == "put":
+            record = entry["record"]
+            self._records[entry["key"]] = (record, datetime.fromisoformat(record["expires_at"]))
+        elif op == "delete":
+            self._records.pop(entry["key"], None)
+        elif op == "delete_user":
+            for key in [k for k, (record, _) in self._records.items() if record["user_id"] == entry["user_id"]]:
+                del self._records[key]
+
+    def _sync(self):
+        """Replay log lines not seen yet (reloading if the file was replaced)"""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            self._records.clear()
+            self._inode, self._offset = None, 0
+            return
+
+        with f:
+            # Stat the open file, not the path: compact() may swap the path
+            # to a new file at any time
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._records.clear()
+                self._inode, self._offset = stat.st_ino, 0
+            if stat.st_size == self._offset:
+                return
+            f.seek(self._offset)
+            data = f.read()
+
+        # A writer may be mid-line; leave a partial last line for next time
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError):
+                continue
+        self._offset += end
+
+    def _append(self, entry: Dict):
+        with self._write_lock():
+            # One write() of a whole line in append mode, so lines from
+            # concurrent processes don't interleave
+            with open(self.path, "ab") as f:
+                f.write(json.dumps(entry, separators=(",", ":")).encode() + b"\n")
+            self._sync()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            self._sync()
+            entry = self._records.get(key)
+        if entry is None or entry[1] <= datetime.utcnow():
+            return None
+        return dict(entry[0])
+
+    def _put(self, key: str, record: Dict) -> None:
+        self._append({"op": "put", "key": key, "record": record})
+
+    def delete(self, key: str) -> bool:
+        with self._write_lock():
+            self._sync()
+            if key not in self._records:
+                return False
+            self._append({"op": "delete", "key": key})
+            return True
+
+    def delete_user(self, user_id) -> int:
+        user_id = str(user_id)
+        with self._write_lock():
+            self._sync()
+            removed = sum(1 for record, _ in self._records.values() if record["user_id"] == user_id)
+            if removed:
+                self._append({"op": "delete_user", "user_id": user_id})
+            return removed
+
+    def compact(self, now: Optional[datetime] = None) -> int:
+        """Drop expired records and rewrite the log as one line per live record"""
+        now = now or datetime.utcnow()
+        with self._write_lock():
+            self._sync()
+            live = {key: entry for key, entry in self._records.items() if entry[1] > now}
+            removed = len(self._records) - len(live)
+
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for key, (record, _) in live.items():
+                        f.write(json.dumps({"op": "put", "key": key, "record": record}, separators=(",", ":")).encode() + b"\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+
+            self._records.clear()
+            self._inode, self._offset = None, 0
+            self._sync()
+            return removed
+
+    def count(self) -> int:
+        now = datetime.utcnow()
+        with self._lock:
+            self._sync()
+            return sum(1 for _, expires in self._records.values() if expires > now)
+
+    def _compact_key(self) -> str:
+        return os.path.abspath(self.path)
+
+
+BACKENDS = ("sqlite", "memory", "file")
+DEFAULT_FILE_PATH = Path("data/browser_sessions.log")
+
+_stores_lock = threading.Lock()
+_stores: Dict[Tuple[str, str], SessionStore] = {}
+
+
+def create_session_store(db, backend: str = "sqlite", path=None) -> SessionStore:
+    """
+    A new store of the given backend.
+
+    Args:
+        db: Database instance (used by the sqlite backend)
+        backend: "sqlite", "memory" or "file"
+        path: Log file for the file backend (default: data/browser_sessions.log)
+    """
+    if backend == "sqlite":
+        return SQLiteSessionStore(db)
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "file":
+        return FileSessionStore(path or DEFAULT_FILE_PATH)
+    raise ValueError(f"Unknown session store backend: {backend} (expected one of {', '.join(BACKENDS)})")
+
+
+def get_session_store(db, backend: str = "sqlite", path=None) -> SessionStore:
+    """
+    The store every session manager in this process should use.
+
+    Stores are created once per process (per database / log file and
+    backend) and shared. A shared SQLite store opens its own Database on
+    db's path, so it outlives the session that first asked for it; a
+    private :memory: database can't be shared and gets a store of its own.
+    """
+    if backend == "file":
+        key = (backend, os.path.abspath(path or DEFAULT_FILE_PATH))
+    elif backend == "sqlite" and db.db_path == ":memory:":
+        return SQLiteSessionStore(db)
+    else:
+        key = (backend, db.db_path if db.db_path == ":memory:" else os.path.abspath(db.db_path))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if backend == "sqlite":
+                store = SQLiteSessionStore(type(db)(db.db_path))
+            else:
+                store = create_session_store(db, backend, path)
+            _stores[key] = store
+        return store
@@ -7,13 +7,26 @@ No cookies, no localStorage, no JavaScript complexity
 import streamlit as st
 import hashlib
 import json
+from typing import Optional
+
+from utils.session_cache import get_token_cache
+from utils.session_store import SessionStore
 
 
 class SimpleSessionManager:
     """Manages sessions using browser fingerprint stored in query params"""
 
-    def __init__(self):
-        """Initialize session manager"""
+    def __init__(self, store: Optional[SessionStore] = None):
+        """
+        Initialize session manager
+
+        Args:
+            store: Optional shared session store. When given, tokens are
+                looked up there by browser_id instead of scanning user_sessions
+                by user_agent.
+        """
+        self.store = store
+
         # ALWAYS check query params first, as they persist across refreshes
         query_params = st.query_params
         url_browser_id = query_params.get('bid', None)
@@ -62,28 +75,26 @@ class SimpleSessionManager:
         """
         browser_id = self.get_browser_id()
 
+        if self.store:
+            session_data = self.store.get(browser_id)
+            return session_data["token"] if session_data else None
+
         # Query database for active session with this browser_id
         try:
-            import sqlite3
             from datetime import datetime
 
-            conn = sqlite3.connect(db.db_path)
-            cursor = conn.cursor()
-
             # Get current time for comparison
             now = datetime.utcnow().isoformat()
 
-            cursor.execute("""
-                SELECT session_token, user_id, expires_at
-                FROM user_sessions
-                WHERE user_agent = ?
-                AND expires_at > ?
-                ORDER BY created_at DESC
-                LIMIT 1
-            """, (browser_id, now))
-
-            result = cursor.fetchone()
-            conn.close()
+            with db.reader() as conn:
+                result = conn.execute("""
+                    SELECT session_token, user_id, expires_at
+                    FROM user_sessions
+                    WHERE user_agent = ?
+                    AND expires_at > ?
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                """, (browser_id, now)).fetchone()
 
             if result:
                 print(f"[SessionManager] Found session for browser {browser_id[:8]}...")
@@ -107,9 +118,10 @@ class SimpleSessionManager:
             user_id: User ID
             db: Database instance
         """
-        # The token is already saved in database by AuthManager.create_session()
-        # with user_agent = browser_id, so nothing to do here
-        pass
+        # Without a store, the token is already saved in database by
+        # AuthManager.create_session() with user_agent = browser_id
+        if self.store:
+            self.store.put(self.get_browser_id(), token, user_id)
 
     def clear_session(self, db):
         """
@@ -120,19 +132,24 @@ class SimpleSessionManager:
         """
         browser_id = self.get_browser_id()
 
-        try:
-            import sqlite3
-            conn = sqlite3.connect(db.db_path)
-            cursor = conn.cursor()
+        if self.store:
+            self.store.delete(browser_id)
 
+        try:
             # Delete all sessions for this browser
-            cursor.execute("""
-                DELETE FROM user_sessions
-                WHERE user_agent = ?
-            """, (browser_id,))
-
-            conn.commit()
-            conn.close()
+            with db.transaction() as conn:
+                hashes = [row[0] for row in conn.execute(
+                    "SELECT session_token FROM user_sessions WHERE user_agent = ?", (browser_id,)
+                )]
+                conn.execute("""
+                    DELETE FROM user_sessions
+                    WHERE user_agent = ?
+                """, (browser_id,))
+
+            # Revoked tokens must not validate from AuthManager's cache
+            token_cache = get_token_cache(db.db_path)
+            for token_hash in hashes:
+                token_cache.invalidate(token_hash)
 
         except Exception as e:
             print(f"Error clearing session: {e}")